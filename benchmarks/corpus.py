@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Generate a synthetic corpus of media files with known capture dates.
+
+Usage: python -m benchmarks.corpus DIRECTORY [-n COUNT] [--seed SEED]
+
+JPEG, TIFF and HEIC files carry an EXIF DateTimeOriginal tag, MP4 files an
+`mvhd` creation time and MOV files additionally the QuickTime creation date
+key. A share of the files is taken in same-second bursts, so name collisions
+are part of every run.
+"""
+
+import argparse
+import io
+import random
+import struct
+from datetime import datetime, timedelta, timezone
+from os import makedirs
+from os.path import join
+
+# every encoded template carries this date, it's replaced per file
+_PLACEHOLDER_DATE = "2000:01:01 00:00:00"
+_EXIF_DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIMEORIGINAL = 0x9003
+
+_MAC_EPOCH = datetime(1904, 1, 1, tzinfo=timezone.utc)
+_TIMEZONE = timezone(timedelta(hours=2))
+_START_DATE = datetime(2023, 7, 1, 8, 0, 0)
+
+# share of the files per kind, the rest are JPEG files
+_SHARES = {"tiff": 0.05, "heic": 0.05, "mp4": 0.05, "mov": 0.05}
+
+
+def _pillow_template(image_format: str) -> bytes:
+    """Encode a small image with Pillow once, the date is patched in per file."""
+    from PIL import Image
+
+    if image_format == "HEIF":
+        from pillow_heif import register_heif_opener
+
+        register_heif_opener()
+
+    image = Image.new("RGB", (64, 48), (200, 120, 40))
+    exif = Image.Exif()
+    exif.get_ifd(_TAG_EXIF_IFD)[_TAG_DATETIMEORIGINAL] = _PLACEHOLDER_DATE
+
+    buffer = io.BytesIO()
+    image.save(buffer, format=image_format, exif=exif)
+    data = buffer.getvalue()
+
+    if data.count(_PLACEHOLDER_DATE.encode()) != 1:
+        raise RuntimeError(f"Can't locate the EXIF date in the encoded {image_format} template")
+
+    return data
+
+
+def _box(box_type: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def _isobmff(date: datetime, quicktime: bool) -> bytes:
+    """Build a minimal MP4 or MOV container with a creation date and a small `mdat`."""
+    local_date = date.replace(tzinfo=_TIMEZONE)
+    seconds = int((local_date - _MAC_EPOCH).total_seconds())
+    moov = _box(b"mvhd", struct.pack(">B3xIIII", 0, seconds, seconds, 1000, 0) + bytes(80))
+
+    if quicktime:
+        key = b"com.apple.quicktime.creationdate"
+        value = local_date.strftime("%Y-%m-%dT%H:%M:%S%z").encode()
+        keys = _box(b"keys", struct.pack(">4xI", 1) + struct.pack(">I4s", 8 + len(key), b"mdta") + key)
+        ilst = _box(b"ilst", _box(struct.pack(">I", 1), _box(b"data", struct.pack(">II", 1, 0) + value)))
+        moov += _box(b"meta", _box(b"hdlr", bytes(24)) + keys + ilst)
+
+    ftyp = _box(b"ftyp", b"qt  \x00\x00\x00\x00qt  " if quicktime else b"isom\x00\x00\x02\x00isommp41")
+
+    return ftyp + _box(b"moov", moov) + _box(b"mdat", bytes(4096))
+
+
+def _dates(count: int, burst_share: float, rng: random.Random):
+    date = _START_DATE
+
+    for i in range(count):
+        # a burst keeps the second of the previous file
+        if i == 0 or rng.random() >= burst_share:
+            date += timedelta(seconds=rng.randint(1, 120))
+
+        yield date
+
+
+def generate(
+    directory: str, count: int, burst_share: float = 0.2, seed: int = 0
+) -> dict[str, int]:
+    """Write `count` files into `directory` and return the number of files per kind."""
+    makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+
+    kinds = list(_SHARES)
+    weights = list(_SHARES.values())
+    kinds.append("jpg")
+    weights.append(1 - sum(weights))
+
+    templates = {}
+    counts = dict.fromkeys(kinds, 0)
+
+    for i, date in enumerate(_dates(count, burst_share, rng)):
+        kind = rng.choices(kinds, weights)[0]
+        counts[kind] += 1
+
+        if kind in ("mp4", "mov"):
+            data = _isobmff(date, quicktime=kind == "mov")
+        else:
+            if kind not in templates:
+                templates[kind] = _pillow_template(
+                    {"jpg": "JPEG", "tiff": "TIFF", "heic": "HEIF"}[kind]
+                )
+
+            data = templates[kind].replace(
+                _PLACEHOLDER_DATE.encode(), date.strftime(_EXIF_DATE_FORMAT).encode()
+            )
+
+        with open(join(directory, f"IMG_{i:06d}.{kind}"), "wb") as file_handle:
+            file_handle.write(data)
+
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=str)
+    parser.add_argument("-n", "--count", type=int, default=1000)
+    parser.add_argument("--burst-share", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    counts = generate(args.directory, args.count, burst_share=args.burst_share, seed=args.seed)
+
+    print(", ".join(f"{count} {kind}" for kind, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
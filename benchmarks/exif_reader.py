@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Compare per-file latency of the header-only EXIF reader against exifread.
+
+Usage: python -m benchmarks.exif_reader [-n COUNT] [-d DIRECTORY]
+
+Without a directory, COUNT synthetic JPEG files with an EXIF APP1 segment are
+generated into a temporary directory.
+"""
+
+import argparse
+import statistics
+import struct
+import tempfile
+from os import listdir
+from os.path import join
+from time import perf_counter
+import exifread
+from ingestor.utils.exif import ExifReader
+
+
+def _synthetic_jpeg(index: int, payload_size: int) -> bytes:
+    date = f"2023:07:01 12:{index // 60 % 60:02d}:{index % 60:02d}".encode() + b"\x00"
+    exif_ifd_offset = 8 + 2 + 12 + 4
+    date_offset = exif_ifd_offset + 2 + 12 + 4
+    tiff = (
+        b"II*\x00" + struct.pack("<I", 8)
+        + struct.pack("<HHHII", 1, 0x8769, 4, 1, exif_ifd_offset) + bytes(4)
+        + struct.pack("<HHHII", 1, 0x9003, 2, len(date), date_offset) + bytes(4)
+        + date
+    )
+    app1 = b"Exif\x00\x00" + tiff
+    return (
+        b"\xff\xd8\xff\xe1" + struct.pack(">H", len(app1) + 2) + app1
+        + b"\xff\xda" + bytes(payload_size) + b"\xff\xd9"
+    )
+
+
+def _time_per_file(files: list[str], read) -> list[float]:
+    timings = []
+
+    for file in files:
+        start = perf_counter()
+        read(file)
+        timings.append(perf_counter() - start)
+
+    return timings
+
+
+def _read_exifread(file: str):
+    with open(file, "rb") as file_handle:
+        return exifread.process_file(file_handle, stop_tag="DateTimeOriginal")
+
+
+def _report(name: str, timings: list[float]):
+    print(
+        f"{name:>10}: mean {statistics.mean(timings) * 1e6:8.1f} µs, "
+        f"median {statistics.median(timings) * 1e6:8.1f} µs, "
+        f"total {sum(timings):.3f} s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--count", type=int, default=3000)
+    parser.add_argument("-d", "--directory", type=str, default=None)
+    parser.add_argument("--payload-size", type=int, default=256 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_directory:
+        directory = args.directory
+
+        if not directory:
+            directory = temp_directory
+
+            for i in range(args.count):
+                with open(join(directory, f"{i:06d}.jpg"), "wb") as file_handle:
+                    file_handle.write(_synthetic_jpeg(i, args.payload_size))
+
+        files = sorted(join(directory, f) for f in listdir(directory))[:args.count]
+
+        print(f"Reading {len(files)} files from '{directory}'")
+
+        # warm up the page cache so both readers are measured under the same conditions
+        _time_per_file(files, ExifReader.get_date_tags)
+
+        _report("header", _time_per_file(files, ExifReader.get_date_tags))
+        _report("exifread", _time_per_file(files, _read_exifread))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Benchmark the stages of the ingest pipeline on synthetic corpora.
+
+Usage: python -m benchmarks.pipeline [-n COUNT ...] [-o RESULTS.json] [-d WORKDIR] [-j JOBS]
+
+For every corpus size discovery, name planning (`_get_new_filenames`), HEIC
+conversion, copying and moving are timed separately. Results are printed and
+written as JSON, so runs can be compared to spot regressions.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from os import cpu_count, makedirs
+from os.path import basename, join, splitext
+from time import perf_counter
+from zoneinfo import ZoneInfo
+from benchmarks import corpus
+from ingestor.constants.dedup_mode import DedupMode
+from ingestor.constants.heic_mode import HeicMode
+from ingestor.constants.ingesting_mode import IngestingMode
+from ingestor.constants.media_type import MediaType
+from ingestor.utils.copy_engine import CopyEngine
+from ingestor.utils.discovery import Discovery
+from ingestor.utils.heic import HeicConverter
+from ingestor.utils.ingestor import Ingestor
+from ingestor.utils.manifest import IngestSource
+from ingestor.utils.move_engine import MoveEngine
+from ingestor.utils.name_index import NameIndex
+
+
+def _result(count: int, stage: str, seconds: float, files: int, size: int | None = None) -> dict:
+    result = {
+        "corpus_size": count,
+        "stage": stage,
+        "seconds": seconds,
+        "files": files,
+        "files_per_second": files / max(seconds, 1e-9),
+    }
+
+    if size is not None:
+        result["bytes"] = size
+        result["megabytes_per_second"] = size / max(seconds, 1e-9) / 1e6
+
+    return result
+
+
+def _timed(run) -> tuple[float, object]:
+    start = perf_counter()
+    value = run()
+    return perf_counter() - start, value
+
+
+def _run(count: int, directory: str, jobs: int) -> list[dict]:
+    input_directory = join(directory, "input")
+    converted_directory = join(directory, "converted")
+    copy_directory = join(directory, "copied")
+    move_directory = join(directory, "moved")
+
+    for output_directory in (converted_directory, copy_directory, move_directory):
+        makedirs(output_directory)
+
+    corpus.generate(input_directory, count)
+    results = []
+
+    # the first scan only warms up the dentry cache
+    Discovery.scan(input_directory)
+    seconds, discovered = _timed(lambda: Discovery.scan(input_directory))
+    results.append(_result(count, "discovery", seconds, len(discovered)))
+
+    ingestor = Ingestor(
+        sources=[
+            IngestSource(
+                directory=input_directory,
+                person_suffix="B_M",
+                time_correction_offset=timedelta(0),
+            )
+        ],
+        output_directory=copy_directory,
+        keep_original_filename=False,
+        date_pattern=r"%Y-%m-%d %H.%M.%S",
+        heic_mode=HeicMode.CONVERT,
+        timezone=ZoneInfo("Europe/Berlin"),
+        metadata_cache=False,
+        metadata_cache_file=None,
+        metadata_cache_max_entries=0,
+        jobs=jobs,
+        ffprobe_timeout=30.0,
+        heic_jobs=jobs,
+        transfer_jobs=jobs,
+        dedup_mode=DedupMode.OFF,
+        journal=False,
+    )
+    seconds, filenames = _timed(
+        lambda: ingestor._get_new_filenames(
+            IngestingMode.COPY, None, NameIndex(), [discovered]
+        )
+    )
+    results.append(_result(count, "planning", seconds, len(filenames)))
+
+    heic_files = discovered.of_type(MediaType.HEIC)
+    conversions = {
+        file: join(converted_directory, splitext(basename(file))[0] + ".jpg")
+        for file in heic_files
+    }
+    converter = HeicConverter(jobs=jobs)
+
+    def convert():
+        with converter.converting(conversions):
+            pass
+
+    seconds, _ = _timed(convert)
+    results.append(
+        _result(count, "heic conversion", seconds, len(conversions), _size(discovered, heic_files))
+    )
+
+    transfers = {
+        old_name: new_name
+        for old_name, new_name in filenames.items()
+        if old_name not in conversions
+    }
+    seconds, _ = _timed(lambda: CopyEngine(jobs=jobs).copy_all(transfers))
+    results.append(
+        _result(count, "copy", seconds, len(transfers), _size(discovered, transfers))
+    )
+
+    # moves the copies, which live on the same filesystem
+    moves = {
+        new_name: join(move_directory, basename(new_name)) for new_name in transfers.values()
+    }
+    seconds, _ = _timed(lambda: MoveEngine(jobs=jobs).move_all(moves, move_directory))
+    results.append(_result(count, "move", seconds, len(moves), _size(discovered, transfers)))
+
+    return results
+
+
+def _size(discovered, files) -> int:
+    return sum(discovered.stats[file].st_size for file in files)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("-o", "--output", type=str, default="benchmark-results.json")
+    parser.add_argument("-d", "--directory", type=str, default=None)
+    parser.add_argument("-j", "--jobs", type=int, default=cpu_count() or 1)
+    args = parser.parse_args()
+
+    results = []
+
+    for count in args.counts:
+        directory = tempfile.mkdtemp(prefix=f"ingestor-benchmark-{count}-", dir=args.directory)
+
+        try:
+            for result in _run(count, directory, args.jobs):
+                print(
+                    f"{result['corpus_size']:>7} files, {result['stage']:>16}: "
+                    f"{result['seconds']:8.3f} s, {result['files_per_second']:10.1f} files/s"
+                )
+                results.append(result)
+        finally:
+            shutil.rmtree(directory)
+
+    with open(args.output, "w", encoding="utf-8") as file_handle:
+        json.dump(
+            {
+                "created": datetime.now().isoformat(),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "jobs": args.jobs,
+                "results": results,
+            },
+            file_handle,
+            indent=4,
+        )
+
+    print(f"Wrote results to '{args.output}'")
+
+
+if __name__ == "__main__":
+    main()
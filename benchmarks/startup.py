@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Check the CLI startup time against a budget using `python -X importtime`.
+
+Usage: python -m benchmarks.startup [--budget-ms MS] [-r REPEAT] [-o RESULTS.json]
+
+Runs `python -m ingestor --help` several times and reports the best wall time,
+then runs it once more with `-X importtime` to list the slowest imports. Exits
+with a non-zero status if the best run exceeds the budget or if a heavy
+dependency gets imported on startup.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from time import perf_counter
+
+# dependencies that must only be loaded by the stages that need them
+HEAVY_MODULES = ("PIL", "pillow_heif", "exifread")
+
+COMMAND = [sys.executable, "-m", "ingestor", "--help"]
+
+
+def _parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Map every imported module to its self and cumulative import time in µs."""
+    imports = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_time, cumulative, module = line[len("import time:"):].split("|")
+        imports[module.strip()] = (int(self_time), int(cumulative))
+
+    return imports
+
+
+def _run() -> float:
+    start = perf_counter()
+    subprocess.run(COMMAND, capture_output=True, check=True)
+    return perf_counter() - start
+
+
+def _import_times() -> dict[str, tuple[int, int]]:
+    process = subprocess.run(
+        [COMMAND[0], "-X", "importtime", *COMMAND[1:]],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return _parse_importtime(process.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=250.0)
+    parser.add_argument("-r", "--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("-o", "--output", type=str, default=None)
+    args = parser.parse_args()
+
+    runs = [_run() for _ in range(args.repeat)]
+    best = min(runs)
+    imports = _import_times()
+    heavy = [module for module in imports if module.split(".")[0] in HEAVY_MODULES]
+    slowest = sorted(imports.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+
+    print(f"'{' '.join(COMMAND[1:])}': best of {args.repeat} runs {best * 1e3:.1f} ms, budget {args.budget_ms:.1f} ms")
+    print(f"{len(imports)} modules imported, slowest by self time:")
+
+    for module, (self_time, cumulative) in slowest:
+        print(f"{self_time / 1e3:8.2f} ms self {cumulative / 1e3:8.2f} ms cumulative  {module}")
+
+    if heavy:
+        print(f"Heavy dependencies imported on startup: {', '.join(heavy)}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file_handle:
+            json.dump(
+                {
+                    "python": sys.version.split()[0],
+                    "best_ms": best * 1e3,
+                    "runs_ms": [seconds * 1e3 for seconds in runs],
+                    "budget_ms": args.budget_ms,
+                    "modules": len(imports),
+                    "heavy_modules": heavy,
+                    "slowest": {
+                        module: {"self_us": self_time, "cumulative_us": cumulative}
+                        for module, (self_time, cumulative) in slowest
+                    },
+                },
+                file_handle,
+                indent=4,
+            )
+
+    if heavy or best * 1e3 > args.budget_ms:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
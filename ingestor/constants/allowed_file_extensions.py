@@ -1,4 +1,6 @@
-from ..utils.filename import FilenameUtils
+from os.path import splitext
+from types import MappingProxyType
+from ..constants.media_type import MediaType
 
 
 class AllowedFileExtension:
@@ -34,6 +36,22 @@ class AllowedFileExtension:
         "webm",
     ]
 
+    # metadata files that belong to a media file with the same name
+    _SIDECAR = ["aae", "xmp"]
+
+    _IMAGE = frozenset([*_JPEG, *_PNG, *_TIFF])
+
+    # lookup table for classifying files by their lower case extension
+    _MEDIA_TYPES = MappingProxyType(
+        {
+            **{extension: MediaType.IMAGE for extension in _IMAGE},
+            **{extension: MediaType.RAW for extension in _RAW},
+            **{extension: MediaType.HEIC for extension in HEIC},
+            **{extension: MediaType.VIDEO for extension in _VIDEO},
+            **{extension: MediaType.SIDECAR for extension in _SIDECAR},
+        }
+    )
+
     def __init__(self):
         pass
 
@@ -46,10 +64,10 @@ class AllowedFileExtension:
         ]
 
         if include_heic:
-            [*extensions, *AllowedFileExtension.HEIC]
+            extensions = [*extensions, *AllowedFileExtension.HEIC]
 
         if include_raw:
-            [*extensions, *AllowedFileExtension._RAW]
+            extensions = [*extensions, *AllowedFileExtension._RAW]
 
         return extensions
 
@@ -57,26 +75,32 @@ class AllowedFileExtension:
     def video() -> list[str]:
         return AllowedFileExtension._VIDEO
 
+    @staticmethod
+    def media_type(file_path: str) -> MediaType | None:
+        return AllowedFileExtension._MEDIA_TYPES.get(
+            splitext(file_path)[1].lstrip(".").lower()
+        )
+
     @staticmethod
     def is_image(
         file_path: str, include_heic: bool = False, include_raw: bool = False
     ) -> bool:
-        return FilenameUtils.get_file_extension(
-            file_path
-        ).lower() in AllowedFileExtension.image(
-            include_heic=include_heic, include_raw=include_raw
+        media_type = AllowedFileExtension.media_type(file_path)
+
+        return (
+            media_type == MediaType.IMAGE
+            or (include_heic and media_type == MediaType.HEIC)
+            or (include_raw and media_type == MediaType.RAW)
         )
 
     @staticmethod
     def is_video(file_path: str) -> bool:
-        return (
-            FilenameUtils.get_file_extension(file_path).lower()
-            in AllowedFileExtension.video()
-        )
+        return AllowedFileExtension.media_type(file_path) == MediaType.VIDEO
 
     @staticmethod
     def is_heic(file_path: str) -> bool:
-        return (
-            FilenameUtils.get_file_extension(file_path).lower()
-            in AllowedFileExtension.HEIC
-        )
+        return AllowedFileExtension.media_type(file_path) == MediaType.HEIC
+
+    @staticmethod
+    def is_sidecar(file_path: str) -> bool:
+        return AllowedFileExtension.media_type(file_path) == MediaType.SIDECAR
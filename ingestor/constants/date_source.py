@@ -0,0 +1,13 @@
+from enum import StrEnum, auto
+
+
+class DateSource(StrEnum):
+    EXIF = auto()
+    QUICKTIME = auto()
+    CREATION_TIME = auto()
+    TAKEOUT = auto()
+    MTIME = auto()
+
+    @staticmethod
+    def list():
+        return list(map(lambda c: c.value, DateSource))
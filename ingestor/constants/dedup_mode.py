@@ -0,0 +1,11 @@
+from enum import StrEnum, auto
+
+
+class DedupMode(StrEnum):
+    OFF = auto()
+    SKIP = auto()
+    LINK = auto()
+
+    @staticmethod
+    def list():
+        return list(map(lambda c: c.value, DedupMode))
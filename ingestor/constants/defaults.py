@@ -1,7 +1,9 @@
 from datetime import timedelta
+from os import cpu_count
 from zoneinfo import ZoneInfo
 from ..constants.ingesting_mode import IngestingMode
 from ..constants.heic_mode import HeicMode
+from ..constants.dedup_mode import DedupMode
 
 class IngestorDefaultSettings:
     DIRECTORY = "."
@@ -12,6 +14,26 @@ class IngestorDefaultSettings:
     KEEP_ORIGINAL_FILENAME = False
     MODE = IngestingMode.MOVE
     HEIC_MODE = HeicMode.CONVERT
+    INCLUDE_RAW = False
+    GROUP_FILES = False
     TIME_CORRECTION_OFFSET = timedelta(seconds=0)
     TIMEZONE = ZoneInfo("Europe/Berlin")
-    
\ No newline at end of file
+    METADATA_CACHE = True
+    METADATA_CACHE_FILE = None
+    METADATA_CACHE_MAX_ENTRIES = 200_000
+    JOBS = cpu_count() or 1
+    FFPROBE_TIMEOUT = 30.0
+    HEIC_JOBS = cpu_count() or 1
+    TRANSFER_JOBS = 4
+    RECURSIVE = False
+    MANIFEST = None
+    
+    DEDUP = DedupMode.OFF
+    JOURNAL = True
+    OUTPUT_INDEX = False
+    WATCH = False
+    WATCH_INTERVAL = 1.0
+    SETTLE_TIME = 5.0
+    STATS_FILE = None
+    PLAN_OUT = None
+    APPLY = None
@@ -4,6 +4,9 @@ from enum import StrEnum, auto
 class IngestingMode(StrEnum):
     MOVE = auto()
     COPY = auto()
+    LINK = auto()
+    SYMLINK = auto()
+    REFLINK = auto()
 
     @staticmethod
     def list():
@@ -0,0 +1,13 @@
+from enum import StrEnum, auto
+
+
+class MediaType(StrEnum):
+    IMAGE = auto()
+    RAW = auto()
+    HEIC = auto()
+    VIDEO = auto()
+    SIDECAR = auto()
+
+    @staticmethod
+    def list():
+        return list(map(lambda c: c.value, MediaType))
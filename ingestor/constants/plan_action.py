@@ -0,0 +1,11 @@
+from enum import StrEnum, auto
+
+
+class PlanAction(StrEnum):
+    TRANSFER = auto()
+    CONVERT = auto()
+    LINK = auto()
+
+    @staticmethod
+    def list():
+        return list(map(lambda c: c.value, PlanAction))
@@ -3,9 +3,10 @@
 import logging
 from datetime import timedelta
 from zoneinfo import ZoneInfo
-from .utils.ingestor import Ingestor
+from .utils.manifest import IngestSource, Manifest
 from .constants.ingesting_mode import IngestingMode
 from .constants.heic_mode import HeicMode
+from .constants.dedup_mode import DedupMode
 from .constants.defaults import IngestorDefaultSettings
 
 def _cli_entrypoint():
@@ -46,12 +47,29 @@ def _cli_entrypoint():
     parser.add_argument(
         "-d",
         "--directory",
-        help="Directory to ingest files from",
+        help="Directory or ZIP/TAR archive to ingest files from. Archives are read in a single pass without extracting them first",
         type=str,
         required=False,
         default=IngestorDefaultSettings.DIRECTORY,
     )
 
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        help="Also ingest files from subdirectories of the input directory",
+        action="store_true",
+        required=False,
+        default=IngestorDefaultSettings.RECURSIVE,
+    )
+
+    parser.add_argument(
+        "--manifest",
+        help="JSON manifest listing multiple source directories with their own person suffix and time correction offset to ingest in one run. Replaces --directory",
+        type=str,
+        required=False,
+        default=IngestorDefaultSettings.MANIFEST,
+    )
+
     parser.add_argument(
         "-o",
         "--output-directory",
@@ -113,6 +131,22 @@ def _cli_entrypoint():
         default=IngestorDefaultSettings.MODE,
     )
 
+    parser.add_argument(
+        "--include-raw",
+        help="Also ingest camera RAW files (CR2, CR3, ARW, DNG, RAW)",
+        action="store_true",
+        required=False,
+        default=IngestorDefaultSettings.INCLUDE_RAW,
+    )
+
+    parser.add_argument(
+        "--group-files",
+        help="Group files with the same name in the same directory, like the photo and video of a Live Photo or a RAW file and its XMP sidecar. Grouped files share their new name and only the capture date of one of them is read. AAE and XMP sidecars are only ingested with this option",
+        action="store_true",
+        required=False,
+        default=IngestorDefaultSettings.GROUP_FILES,
+    )
+
     parser.add_argument(
         "--heic-mode",
         help="HEIC operation mode. Whether to convert HEIC files to JPG before copying or copying as is.",
@@ -139,8 +173,158 @@ def _cli_entrypoint():
         default=IngestorDefaultSettings.TIMEZONE,
     )
 
+    parser.add_argument(
+        "--no-metadata-cache",
+        help="Don't use the on-disk cache of extracted capture dates",
+        dest="metadata_cache",
+        action="store_false",
+        required=False,
+        default=IngestorDefaultSettings.METADATA_CACHE,
+    )
+
+    parser.add_argument(
+        "--metadata-cache-file",
+        help="Location of the metadata cache file. If unset, metadata-cache.sqlite3 in $XDG_CACHE_HOME/ingestor (~/.cache/ingestor) is used, so the sources are never written to",
+        type=str,
+        required=False,
+        default=IngestorDefaultSettings.METADATA_CACHE_FILE,
+    )
+
+    parser.add_argument(
+        "--metadata-cache-max-entries",
+        help="Maximum number of entries to keep in the metadata cache",
+        type=int,
+        required=False,
+        default=IngestorDefaultSettings.METADATA_CACHE_MAX_ENTRIES,
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        help="Number of workers to use for extracting capture dates",
+        type=int,
+        required=False,
+        default=IngestorDefaultSettings.JOBS,
+    )
+
+    parser.add_argument(
+        "--ffprobe-timeout",
+        help="Timeout in seconds for probing a single video file with ffprobe",
+        type=float,
+        required=False,
+        default=IngestorDefaultSettings.FFPROBE_TIMEOUT,
+    )
+
+    parser.add_argument(
+        "--heic-jobs",
+        help="Number of processes to use for converting HEIC files",
+        type=int,
+        required=False,
+        default=IngestorDefaultSettings.HEIC_JOBS,
+    )
+
+    parser.add_argument(
+        "--transfer-jobs",
+        help="Number of files to copy concurrently, also used for moves across devices",
+        type=int,
+        required=False,
+        default=IngestorDefaultSettings.TRANSFER_JOBS,
+    )
+
+    parser.add_argument(
+        "--dedup",
+        help="Find files with identical content before transferring. Duplicates of files already in the output directory are always skipped, other duplicates are either skipped or hard linked to the first copy",
+        type=DedupMode,
+        required=False,
+        choices=DedupMode.list(),
+        default=IngestorDefaultSettings.DEDUP,
+    )
+
+    parser.add_argument(
+        "--no-journal",
+        help="Don't record planned and completed operations in a journal in the output directory, which lets an interrupted run be resumed",
+        dest="journal",
+        action="store_false",
+        required=False,
+        default=IngestorDefaultSettings.JOURNAL,
+    )
+
+    parser.add_argument(
+        "--output-index",
+        help="Save the names found in the output directory to .ingestor-names.json, so later runs don't have to list a large output directory again while it's unchanged",
+        action="store_true",
+        required=False,
+        default=IngestorDefaultSettings.OUTPUT_INDEX,
+    )
+
+    parser.add_argument(
+        "-w",
+        "--watch",
+        help="Keep running and ingest new files as they appear in the input directories",
+        action="store_true",
+        required=False,
+        default=IngestorDefaultSettings.WATCH,
+    )
+
+    parser.add_argument(
+        "--watch-interval",
+        help="Seconds between checks for new files in watch mode",
+        type=float,
+        required=False,
+        default=IngestorDefaultSettings.WATCH_INTERVAL,
+    )
+
+    parser.add_argument(
+        "--settle-time",
+        help="Seconds the size and modification time of a new file must stay unchanged before it is ingested in watch mode",
+        type=float,
+        required=False,
+        default=IngestorDefaultSettings.SETTLE_TIME,
+    )
+
+    parser.add_argument(
+        "--stats",
+        help="Write timings, file counts, date sources, ffprobe latencies and name collisions of the run to this JSON file",
+        dest="stats_file",
+        type=str,
+        required=False,
+        default=IngestorDefaultSettings.STATS_FILE,
+    )
+
+    parser.add_argument(
+        "--plan-out",
+        help="Only plan the run and write the planned operations to this JSON lines file, which can be carried out later with --apply",
+        type=str,
+        required=False,
+        default=IngestorDefaultSettings.PLAN_OUT,
+    )
+
+    parser.add_argument(
+        "--apply",
+        help="Carry out the operations of a plan written with --plan-out without extracting capture dates again. Mode and output directory are taken from the plan",
+        type=str,
+        required=False,
+        default=IngestorDefaultSettings.APPLY,
+    )
+
+    parser.add_argument(
+        "--profile",
+        help="Profile the run with cProfile and dump the statistics to this file",
+        type=str,
+        nargs="?",
+        required=False,
+        const="ingestor.pstats",
+        default=None,
+    )
+
     args = parser.parse_args()
 
+    if args.watch and (args.plan_out or args.apply):
+        parser.error("--watch can't be combined with --plan-out or --apply")
+
+    if args.plan_out and args.apply:
+        parser.error("--plan-out can't be combined with --apply")
+
     if args.silent:
         args.loglevel = logging.getLevelName(logging.ERROR).lower()
 
@@ -153,7 +337,18 @@ def _cli_entrypoint():
         f"Args:\n{json.dumps(vars(args), indent=4, default=str)}"
     )
 
-    exit_code = ingest(**vars(args))
+    if args.profile:
+        import cProfile
+        import pstats
+
+        profiler = cProfile.Profile()
+        exit_code = profiler.runcall(ingest, **vars(args))
+        profiler.dump_stats(args.profile)
+
+        pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(25)
+        logging.getLogger(__name__).info(f"Wrote profile to '{args.profile}'")
+    else:
+        exit_code = ingest(**vars(args))
 
     end = perf_counter()
     logging.getLogger(__name__).info(f"Done in {timedelta(seconds=end-start)}")
@@ -171,28 +366,93 @@ def ingest(
     date_pattern: str = IngestorDefaultSettings.DATE_PATTERN,
     mode: IngestingMode = IngestorDefaultSettings.MODE,
     heic_mode: HeicMode = IngestorDefaultSettings.HEIC_MODE,
+    include_raw: bool = IngestorDefaultSettings.INCLUDE_RAW,
+    group_files: bool = IngestorDefaultSettings.GROUP_FILES,
     time_correction_offset: timedelta = IngestorDefaultSettings.TIME_CORRECTION_OFFSET,
     timezone: ZoneInfo = IngestorDefaultSettings.TIMEZONE,
+    metadata_cache: bool = IngestorDefaultSettings.METADATA_CACHE,
+    metadata_cache_file: str | None = IngestorDefaultSettings.METADATA_CACHE_FILE,
+    metadata_cache_max_entries: int = IngestorDefaultSettings.METADATA_CACHE_MAX_ENTRIES,
+    jobs: int = IngestorDefaultSettings.JOBS,
+    ffprobe_timeout: float = IngestorDefaultSettings.FFPROBE_TIMEOUT,
+    heic_jobs: int = IngestorDefaultSettings.HEIC_JOBS,
+    transfer_jobs: int = IngestorDefaultSettings.TRANSFER_JOBS,
+    recursive: bool = IngestorDefaultSettings.RECURSIVE,
+    manifest: str | None = IngestorDefaultSettings.MANIFEST,
+    dedup: DedupMode = IngestorDefaultSettings.DEDUP,
+    journal: bool = IngestorDefaultSettings.JOURNAL,
+    watch: bool = IngestorDefaultSettings.WATCH,
+    watch_interval: float = IngestorDefaultSettings.WATCH_INTERVAL,
+    settle_time: float = IngestorDefaultSettings.SETTLE_TIME,
+    stats_file: str | None = IngestorDefaultSettings.STATS_FILE,
+    output_index: bool = IngestorDefaultSettings.OUTPUT_INDEX,
+    plan_out: str | None = IngestorDefaultSettings.PLAN_OUT,
+    apply: str | None = IngestorDefaultSettings.APPLY,
     **kwargs,
 ) -> int | None:
+    # loaded here so that --help doesn't pay for importing the whole pipeline
+    from .utils.ingestor import Ingestor
+
     logger = logging.getLogger(__name__)
 
     if dry_run:
         logger.warning(f"Dry run active, skipping destructive operations")
 
     try:
+        if manifest:
+            sources = Manifest.load(
+                manifest,
+                person_suffix=person_suffix,
+                time_correction_offset=time_correction_offset,
+                recursive=recursive,
+            )
+        else:
+            sources = [
+                IngestSource(
+                    directory=directory,
+                    person_suffix=person_suffix,
+                    time_correction_offset=time_correction_offset,
+                    recursive=recursive,
+                )
+            ]
+
+        logger.debug(f"{sources=}")
+
         ingestor = Ingestor(
-            directory=directory,
+            sources=sources,
             output_directory=output_directory,
-            person_suffix=person_suffix,
             keep_original_filename=keep_original_filename,
             date_pattern=date_pattern,
             heic_mode=heic_mode,
-            time_correction_offset=time_correction_offset,
             timezone=timezone,
+            # applying a plan never extracts capture dates
+            metadata_cache=metadata_cache and not apply,
+            metadata_cache_file=metadata_cache_file,
+            metadata_cache_max_entries=metadata_cache_max_entries,
+            jobs=jobs,
+            ffprobe_timeout=ffprobe_timeout,
+            heic_jobs=heic_jobs,
+            transfer_jobs=transfer_jobs,
+            dedup_mode=dedup,
+            journal=journal,
+            stats_file=stats_file,
+            plan_file=plan_out,
+            persist_output_index=output_index,
+            include_raw=include_raw,
+            group_files=group_files,
         )
 
-        ingestor.execute(mode=mode, dry_run=dry_run)
+        if apply:
+            ingestor.apply(apply, dry_run=dry_run)
+        elif watch:
+            ingestor.watch(
+                mode=mode,
+                dry_run=dry_run,
+                interval=watch_interval,
+                settle_time=settle_time,
+            )
+        else:
+            ingestor.execute(mode=mode, dry_run=dry_run)
 
     except KeyboardInterrupt as e:
         logger.warning("Interrupted by SIGINT")
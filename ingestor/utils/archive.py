@@ -0,0 +1,181 @@
+import datetime
+import io
+import json
+import os
+import struct
+import tarfile
+import zipfile
+from os.path import abspath, basename, dirname, isfile, join
+from typing import BinaryIO, Iterator, NamedTuple
+from ..constants.date_source import DateSource
+from ..constants.media_type import MediaType
+from .exif import ExifError, ExifReader
+from .heif import HeifReader
+from .isobmff import IsoBmffError, IsoBmffReader
+from .raw import RawReader
+
+
+class ArchiveMember(NamedTuple):
+    name: str
+    size: int
+    mtime: datetime.datetime
+
+    def stat(self) -> os.stat_result:
+        """Stat result with the size and modification time of the member."""
+        mtime_ns = int(self.mtime.timestamp() * 1e9)
+
+        return os.stat_result(
+            (0, 0, 0, 0, 0, 0, self.size, 0, 0, 0),
+            {"st_mtime": mtime_ns / 1e9, "st_mtime_ns": mtime_ns},
+        )
+
+
+class ArchiveReader:
+    """Reads the members of a ZIP or TAR archive in a single sequential pass.
+
+    ZIP members are visited in the order they are stored in, TAR archives are
+    opened as a stream, so compressed archives are only decompressed once and
+    nothing is extracted to disk. Each member stream has to be consumed before
+    the next member is requested.
+    """
+
+    EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+
+    # bytes read from the start of a member to find its capture date
+    HEADER_SIZE = 256 * 1024
+
+    # upper bound for Takeout metadata files read into memory
+    MAX_METADATA_SIZE = 1 << 20
+
+    archive_file: str
+
+    _zip_file: zipfile.ZipFile | None
+    _tar_file: tarfile.TarFile | None
+
+    def __init__(self, archive_file: str):
+        self.archive_file = archive_file
+        self._zip_file = None
+        self._tar_file = None
+
+        if zipfile.is_zipfile(archive_file):
+            self._zip_file = zipfile.ZipFile(archive_file)
+        else:
+            self._tar_file = tarfile.open(archive_file, mode="r|*")
+
+    def __enter__(self) -> "ArchiveReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    @staticmethod
+    def is_archive(path: str) -> bool:
+        return path.lower().endswith(ArchiveReader.EXTENSIONS) and isfile(path)
+
+    @staticmethod
+    def member_path(archive_file: str, name: str) -> str:
+        """Path identifying a member, like for the entries of the journal."""
+        return join(abspath(archive_file), name)
+
+    def members(self) -> Iterator[tuple[ArchiveMember, BinaryIO]]:
+        """Yield every regular, non-hidden file with an open stream of its content."""
+        if self._zip_file:
+            infos = sorted(self._zip_file.infolist(), key=lambda info: info.header_offset)
+
+            for info in infos:
+                if info.is_dir() or ArchiveReader._is_hidden(info.filename):
+                    continue
+
+                member = ArchiveMember(
+                    name=info.filename,
+                    size=info.file_size,
+                    mtime=datetime.datetime(*info.date_time),
+                )
+
+                with self._zip_file.open(info) as stream:
+                    yield member, stream
+        else:
+            for info in self._tar_file:
+                if not info.isfile() or ArchiveReader._is_hidden(info.name):
+                    continue
+
+                member = ArchiveMember(
+                    name=info.name,
+                    size=info.size,
+                    mtime=datetime.datetime.fromtimestamp(info.mtime),
+                )
+
+                with self._tar_file.extractfile(info) as stream:
+                    yield member, stream
+
+    def close(self):
+        if self._zip_file:
+            self._zip_file.close()
+
+        if self._tar_file:
+            self._tar_file.close()
+
+    @staticmethod
+    def get_header_date(
+        media_type: MediaType, header: bytes
+    ) -> tuple[datetime.datetime, DateSource] | None:
+        """Read the capture date from the first bytes of a member.
+
+        Returns `None` if the date lies outside of `header`, like the `moov`
+        box of a video that was written without fast start.
+        """
+        file_handle = io.BytesIO(header)
+
+        try:
+            if media_type == MediaType.VIDEO:
+                return IsoBmffReader.read_creation_date(file_handle)
+
+            if media_type == MediaType.HEIC:
+                date_tags = HeifReader.read_date_tags(file_handle)
+            elif media_type == MediaType.RAW:
+                date_tags = RawReader.read_date_tags(file_handle)
+            else:
+                date_tags = ExifReader.read_date_tags(file_handle)
+        except (ExifError, IsoBmffError, struct.error):
+            return None
+
+        return (date_tags.date_time_original, DateSource.EXIF) if date_tags else None
+
+    @staticmethod
+    def is_takeout_metadata(name: str) -> bool:
+        return name.lower().endswith(".json")
+
+    @staticmethod
+    def parse_takeout_metadata(
+        name: str, data: bytes
+    ) -> tuple[str, datetime.datetime] | None:
+        """Parse a Google Takeout metadata file.
+
+        Returns the `takeout_key` of the media file it describes and its capture
+        date, or `None` if it isn't Takeout metadata.
+        """
+        try:
+            metadata = json.loads(data)
+            date = datetime.datetime.fromtimestamp(
+                int(metadata["photoTakenTime"]["timestamp"]), tz=datetime.timezone.utc
+            )
+            title = metadata.get("title")
+        except (ValueError, KeyError, TypeError, OverflowError, OSError):
+            return None
+
+        # the title holds the original name, the metadata file name may be
+        # truncated or carry a '.supplemental-metadata' suffix
+        if not isinstance(title, str) or not title:
+            title = basename(name)[:-len(".json")].removesuffix(".supplemental-metadata")
+
+        return ArchiveReader.takeout_key(f"{dirname(name)}/{title}"), date
+
+    @staticmethod
+    def takeout_key(name: str) -> str:
+        return f"{dirname(name)}/{basename(name).lower()}"
+
+    @staticmethod
+    def _is_hidden(name: str) -> bool:
+        return any(
+            part.startswith(".") or part == "__MACOSX" for part in name.split("/")
+        )
@@ -0,0 +1,123 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+from typing import Callable
+
+
+class Deduplicator:
+    """Finds files with identical content among candidates and existing files.
+
+    Files are grouped by size first, then by a hash over their first and last
+    few KB and only files that still tie are hashed completely, so files with
+    a unique size are never read at all.
+    """
+
+    PARTIAL_SIZE = 16 * 1024
+
+    _CHUNK_SIZE = 1024 * 1024
+
+    _logger: logging.Logger
+
+    jobs: int
+    read_bytes: int
+
+    _lock: Lock
+
+    def __init__(self, jobs: int = 1):
+        self.jobs = max(1, jobs)
+        self.read_bytes = 0
+        self._lock = Lock()
+        self._logger = logging.getLogger(__name__)
+
+    def find_duplicates(
+        self, candidates: dict[str, int], existing: dict[str, int] | None = None
+    ) -> dict[str, str]:
+        """Map every duplicate candidate to the file it duplicates.
+
+        `candidates` and `existing` map file paths to their size. Existing files
+        are always kept, among candidates the first one in iteration order is
+        kept and the others are reported as duplicates of it.
+        """
+        existing = existing or {}
+
+        # existing files come first so they are picked as the original
+        sizes = {**existing, **candidates}
+        groups = Deduplicator._group(list(sizes), lambda file: sizes[file])
+
+        groups = self._refine(groups, lambda file: (sizes[file], self._partial_hash(file, sizes[file])))
+        groups = self._refine(groups, lambda file: self._full_hash(file))
+
+        duplicates = {}
+
+        for files in groups:
+            original = files[0]
+
+            for file in files[1:]:
+                if file in candidates:
+                    duplicates[file] = original
+
+        self._logger.info(
+            f"Found {len(duplicates)} duplicates among {len(candidates)} files "
+            f"reading {self.read_bytes / 1e6:.1f} MB"
+        )
+
+        return duplicates
+
+    def _refine(self, groups: list[list[str]], key: Callable[[str], object]) -> list[list[str]]:
+        files = [file for group in groups for file in group]
+
+        if self.jobs > 1 and len(files) > 1:
+            with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+                keys = dict(zip(files, executor.map(key, files)))
+        else:
+            keys = {file: key(file) for file in files}
+
+        return [
+            refined
+            for group in groups
+            for refined in Deduplicator._group(group, keys.__getitem__)
+        ]
+
+    @staticmethod
+    def _group(files: list[str], key: Callable[[str], object]) -> list[list[str]]:
+        """Group files by key, dropping groups with a single file."""
+        groups: dict[object, list[str]] = {}
+
+        for file in files:
+            groups.setdefault(key(file), []).append(file)
+
+        return [group for group in groups.values() if len(group) > 1]
+
+    def _partial_hash(self, file: str, size: int) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+
+        with open(file, "rb") as file_handle:
+            head = file_handle.read(Deduplicator.PARTIAL_SIZE)
+            digest.update(head)
+            read = len(head)
+
+            if size > 2 * Deduplicator.PARTIAL_SIZE:
+                file_handle.seek(-Deduplicator.PARTIAL_SIZE, 2)
+                tail = file_handle.read(Deduplicator.PARTIAL_SIZE)
+                digest.update(tail)
+                read += len(tail)
+
+        with self._lock:
+            self.read_bytes += read
+
+        return digest.digest()
+
+    def _full_hash(self, file: str) -> bytes:
+        digest = hashlib.blake2b()
+        read = 0
+
+        with open(file, "rb") as file_handle:
+            while chunk := file_handle.read(Deduplicator._CHUNK_SIZE):
+                digest.update(chunk)
+                read += len(chunk)
+
+        with self._lock:
+            self.read_bytes += read
+
+        return digest.digest()
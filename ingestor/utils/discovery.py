@@ -0,0 +1,83 @@
+import logging
+from os import scandir, stat_result
+from os.path import realpath
+from ..constants.allowed_file_extensions import AllowedFileExtension
+from ..constants.media_type import MediaType
+
+
+class DiscoveredFiles:
+    files: dict[MediaType, list[str]]
+    stats: dict[str, stat_result]
+
+    def __init__(self):
+        self.files = {media_type: [] for media_type in MediaType}
+        self.stats = {}
+
+    def __len__(self) -> int:
+        return len(self.stats)
+
+    def add(self, file_path: str, file_stat: stat_result, media_type: MediaType | None = None) -> bool:
+        """Add a file, returns `False` if it isn't a media file."""
+        media_type = media_type or AllowedFileExtension.media_type(file_path)
+
+        if not media_type:
+            return False
+
+        self.files[media_type].append(file_path)
+        self.stats[file_path] = file_stat
+
+        return True
+
+    def of_type(self, *media_types: MediaType) -> list[str]:
+        return [file for media_type in media_types for file in self.files[media_type]]
+
+
+class Discovery:
+    """Sorts the media files of a directory by type in a single `scandir` pass.
+
+    The stat result of every file is kept, so later stages can use the size and
+    modification time without another syscall.
+    """
+
+    @staticmethod
+    def scan(
+        directory: str,
+        recursive: bool = False,
+        exclude_directories: set[str] | None = None,
+    ) -> DiscoveredFiles:
+        """Scan `directory` for media files.
+
+        Subdirectories are only descended into with `recursive`, hidden ones and
+        the real paths listed in `exclude_directories` are skipped. Symlinks to
+        directories aren't followed, so a link back up the tree can't make the
+        scan loop.
+        """
+        discovered = DiscoveredFiles()
+        exclude_directories = exclude_directories or set()
+        pending = [directory]
+
+        while pending:
+            with scandir(pending.pop()) as entries:
+                subdirectories = []
+
+                for entry in entries:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith(".") and realpath(entry.path) not in exclude_directories:
+                            subdirectories.append(entry.path)
+                        continue
+
+                    media_type = AllowedFileExtension.media_type(entry.name)
+
+                    if not media_type or not entry.is_file():
+                        continue
+
+                    discovered.add(entry.path, entry.stat(), media_type)
+
+            # keep a depth first order that follows the listing order
+            pending.extend(reversed(subdirectories))
+
+        logging.getLogger(__name__).debug(
+            f"Discovered {len(discovered)} media files in '{directory}'"
+        )
+
+        return discovered
@@ -0,0 +1,245 @@
+import datetime
+import struct
+from typing import BinaryIO, Callable, NamedTuple
+
+
+class ExifError(ValueError):
+    pass
+
+
+class ExifDateTags(NamedTuple):
+    date_time_original: datetime.datetime
+    offset_time_original: str | None
+    subsec_time_original: str | None
+
+
+class ExifReader:
+    """Header-only reader for the capture date tags of JPEG and TIFF files.
+
+    Only the JPEG APP1 segment or the TIFF IFD0 -> Exif IFD chain is read, using
+    small bounded reads. Anything that doesn't look like a JPEG or TIFF file
+    raises `ExifError` so callers can fall back to a full EXIF parser.
+    """
+
+    # https://exiftool.org/TagNames/EXIF.html
+    TAG_EXIF_IFD_POINTER = 0x8769
+    TAG_DATETIMEORIGINAL = 0x9003
+    TAG_OFFSETTIMEORIGINAL = 0x9011
+    TAG_SUBSECTIMEORIGINAL = 0x9291
+
+    DATE_FORMAT = "%Y:%m:%d %H:%M:%S"
+
+    _JPEG_SOI = b"\xff\xd8"
+    _JPEG_MARKER_APP1 = 0xE1
+    _JPEG_MARKER_SOS = 0xDA
+    _JPEG_MARKER_EOI = 0xD9
+    _EXIF_HEADER = b"Exif\x00\x00"
+
+    _TIFF_TYPE_ASCII = 2
+    _TIFF_TYPE_LONG = 4
+    _TIFF_TYPE_IFD = 13
+
+    # upper bound for the number of entries in a single IFD
+    _MAX_IFD_ENTRIES = 1024
+
+    # upper bound for a single value read from a TIFF file
+    _MAX_VALUE_SIZE = 256
+
+    @staticmethod
+    def get_date_tags(file_path: str) -> ExifDateTags | None:
+        with open(file_path, "rb") as file_handle:
+            return ExifReader.read_date_tags(file_handle)
+
+    @staticmethod
+    def read_date_tags(file_handle: BinaryIO) -> ExifDateTags | None:
+        """Read the capture date tags from an open JPEG or TIFF file.
+
+        Returns `None` if the file has no `DateTimeOriginal` tag.
+        """
+        header = file_handle.read(4)
+
+        if header[:2] == ExifReader._JPEG_SOI:
+            tiff = ExifReader._read_jpeg_app1(file_handle)
+
+            if tiff is None:
+                return None
+
+            return ExifReader.parse_tiff(ExifReader._bytes_reader(tiff))
+
+        if header in (b"II*\x00", b"MM\x00*"):
+            return ExifReader.parse_tiff(ExifReader._file_reader(file_handle))
+
+        raise ExifError("Neither a JPEG nor a TIFF file")
+
+    @staticmethod
+    def parse_exif_blob(data: bytes) -> ExifDateTags | None:
+        """Parse the date tags from a raw EXIF blob with or without `Exif` header."""
+        if data.startswith(ExifReader._EXIF_HEADER):
+            data = data[len(ExifReader._EXIF_HEADER):]
+
+        return ExifReader.parse_tiff(ExifReader._bytes_reader(data))
+
+    @staticmethod
+    def parse_tiff(
+        read_at: Callable[[int, int], bytes], exif_ifd_first: bool = False
+    ) -> ExifDateTags | None:
+        """Parse the date tags from a TIFF structure.
+
+        `read_at(offset, size)` returns `size` bytes at `offset` relative to the
+        start of the TIFF header. With `exif_ifd_first` the first IFD is read as
+        the Exif IFD itself, like in the CMT2 box of CR3 files.
+        """
+        try:
+            header = read_at(0, 8)
+
+            if header[:4] == b"II*\x00":
+                byte_order = "<"
+            elif header[:4] == b"MM\x00*":
+                byte_order = ">"
+            else:
+                raise ExifError("Invalid TIFF header")
+
+            (ifd0_offset,) = struct.unpack(byte_order + "I", header[4:8])
+            ifd0 = ExifReader._read_ifd(read_at, byte_order, ifd0_offset)
+
+            if exif_ifd_first:
+                exif_ifd = ifd0
+            else:
+                exif_ifd_pointer = ifd0.get(ExifReader.TAG_EXIF_IFD_POINTER)
+
+                if not exif_ifd_pointer:
+                    return None
+
+                exif_ifd_offset = ExifReader._read_value(read_at, byte_order, *exif_ifd_pointer)
+
+                if not isinstance(exif_ifd_offset, int):
+                    raise ExifError("Exif IFD pointer isn't an offset")
+
+                exif_ifd = ExifReader._read_ifd(read_at, byte_order, exif_ifd_offset)
+
+            if ExifReader.TAG_DATETIMEORIGINAL not in exif_ifd:
+                return None
+
+            values = {
+                tag: ExifReader._read_value(read_at, byte_order, *exif_ifd[tag])
+                for tag in (
+                    ExifReader.TAG_DATETIMEORIGINAL,
+                    ExifReader.TAG_OFFSETTIMEORIGINAL,
+                    ExifReader.TAG_SUBSECTIMEORIGINAL,
+                )
+                if tag in exif_ifd
+            }
+        except struct.error as e:
+            raise ExifError("Truncated TIFF structure") from e
+        except TypeError as e:
+            raise ExifError("Invalid TIFF structure") from e
+
+        try:
+            date = datetime.datetime.strptime(
+                values[ExifReader.TAG_DATETIMEORIGINAL], ExifReader.DATE_FORMAT
+            )
+        except (TypeError, ValueError):
+            return None
+
+        return ExifDateTags(
+            date_time_original=date,
+            offset_time_original=values.get(ExifReader.TAG_OFFSETTIMEORIGINAL) or None,
+            subsec_time_original=values.get(ExifReader.TAG_SUBSECTIMEORIGINAL) or None,
+        )
+
+    @staticmethod
+    def _read_jpeg_app1(file_handle: BinaryIO) -> bytes | None:
+        file_handle.seek(2)
+
+        while True:
+            marker = file_handle.read(4)
+
+            if len(marker) < 4 or marker[0] != 0xFF:
+                raise ExifError("Invalid JPEG marker")
+
+            marker_type = marker[1]
+
+            if marker_type in (ExifReader._JPEG_MARKER_SOS, ExifReader._JPEG_MARKER_EOI):
+                return None
+
+            (length,) = struct.unpack(">H", marker[2:4])
+
+            if length < 2:
+                raise ExifError("Invalid JPEG segment length")
+
+            if marker_type == ExifReader._JPEG_MARKER_APP1:
+                segment = file_handle.read(length - 2)
+
+                if segment.startswith(ExifReader._EXIF_HEADER):
+                    return segment[len(ExifReader._EXIF_HEADER):]
+            else:
+                file_handle.seek(length - 2, 1)
+
+    @staticmethod
+    def _read_ifd(
+        read_at: Callable[[int, int], bytes], byte_order: str, offset: int
+    ) -> dict[int, tuple[int, int, bytes]]:
+        """Read an IFD into `{tag: (type, count, value_or_offset)}`."""
+        (entry_count,) = struct.unpack(byte_order + "H", read_at(offset, 2))
+
+        if entry_count > ExifReader._MAX_IFD_ENTRIES:
+            raise ExifError("Too many IFD entries")
+
+        data = read_at(offset + 2, entry_count * 12)
+        entries = {}
+
+        for i in range(entry_count):
+            tag, value_type, count = struct.unpack_from(byte_order + "HHI", data, i * 12)
+            entries[tag] = (value_type, count, data[i * 12 + 8:i * 12 + 12])
+
+        return entries
+
+    @staticmethod
+    def _read_value(
+        read_at: Callable[[int, int], bytes],
+        byte_order: str,
+        value_type: int,
+        count: int,
+        value_or_offset: bytes,
+    ) -> str | int | None:
+        if value_type in (ExifReader._TIFF_TYPE_LONG, ExifReader._TIFF_TYPE_IFD):
+            return struct.unpack(byte_order + "I", value_or_offset)[0]
+
+        if value_type != ExifReader._TIFF_TYPE_ASCII:
+            return None
+
+        if count > ExifReader._MAX_VALUE_SIZE:
+            raise ExifError("ASCII value exceeds read limit")
+
+        if count <= 4:
+            raw = value_or_offset[:count]
+        else:
+            (offset,) = struct.unpack(byte_order + "I", value_or_offset)
+            raw = read_at(offset, count)
+
+        return raw.split(b"\x00", 1)[0].decode("ascii", errors="replace").strip()
+
+    @staticmethod
+    def _bytes_reader(data: bytes) -> Callable[[int, int], bytes]:
+        def read_at(offset: int, size: int) -> bytes:
+            chunk = data[offset:offset + size]
+
+            if len(chunk) < size:
+                raise ExifError("Read beyond end of EXIF data")
+
+            return chunk
+
+        return read_at
+
+    @staticmethod
+    def _file_reader(file_handle: BinaryIO, base: int = 0) -> Callable[[int, int], bytes]:
+        def read_at(offset: int, size: int) -> bytes:
+            file_handle.seek(base + offset)
+            chunk = file_handle.read(size)
+
+            if len(chunk) < size:
+                raise ExifError("Read beyond end of file")
+
+            return chunk
+
+        return read_at
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+from time import perf_counter
+
+
+class FfprobeRunner:
+    """Runs ffprobe on many files at once with bounded concurrency.
+
+    Only the container level tags are requested and reading is limited to the
+    first packet, so large files are never scanned. Every probe is subject to a
+    timeout, a file that hangs or fails just yields no tags.
+    """
+
+    _logger: logging.Logger
+
+    concurrency: int
+    timeout: float
+    executable: str
+    latencies: list[float]
+
+    def __init__(self, concurrency: int, timeout: float, executable: str = "ffprobe"):
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self.executable = executable
+        self.latencies = []
+        self._logger = logging.getLogger(__name__)
+
+    def probe_all(self, file_paths: list[str]) -> dict[str, dict[str, str]]:
+        """Return the format tags of every file, keyed by file path.
+
+        Files that couldn't be probed map to an empty dict.
+        """
+        if not file_paths:
+            return {}
+
+        return asyncio.run(self._probe_all(file_paths))
+
+    async def _probe_all(self, file_paths: list[str]) -> dict[str, dict[str, str]]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded_probe(file_path: str) -> dict[str, str]:
+            async with semaphore:
+                start = perf_counter()
+
+                try:
+                    return await self._probe(file_path)
+                finally:
+                    self.latencies.append(perf_counter() - start)
+
+        results = await asyncio.gather(*map(bounded_probe, file_paths))
+
+        return dict(zip(file_paths, results))
+
+    async def _probe(self, file_path: str) -> dict[str, str]:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.executable,
+                "-v",
+                "error",
+                "-read_intervals",
+                "%+#1",
+                "-show_entries",
+                "format_tags",
+                "-of",
+                "json",
+                file_path,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except OSError:
+            self._logger.exception(f"Couldn't start '{self.executable}' for '{file_path}'")
+            return {}
+
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                process.communicate(), timeout=self.timeout
+            )
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            self._logger.error(
+                f"Probing '{file_path}' timed out after {self.timeout} seconds"
+            )
+            return {}
+
+        if process.returncode != 0:
+            self._logger.error(
+                f"Error while probing '{file_path}': {stderr.decode(errors='replace').strip()}"
+            )
+            return {}
+
+        try:
+            return json.loads(stdout).get("format", {}).get("tags", {})
+        except ValueError:
+            self._logger.exception(f"Couldn't parse ffprobe output for '{file_path}'")
+            return {}
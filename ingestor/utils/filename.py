@@ -1,9 +1,12 @@
 import datetime
-import exifread
 import logging
-import ffmpeg
+from os import stat_result
 from os.path import basename, splitext, getmtime
 from zoneinfo import ZoneInfo
+from ..constants.date_source import DateSource
+from .isobmff import IsoBmffReader, IsoBmffError
+from .exif import ExifReader, ExifError
+from .raw import RawReader
 
 
 class FilenameUtils:
@@ -35,100 +38,124 @@ class FilenameUtils:
         self.correction_offset = correction_offset
         self.timezone = timezone
 
-    def get_filename_for_image(
+    def get_filename_for_date(
         self,
         *,
-        image_file_path: str,
-        counter: int = 0,
-    ):
-        return FilenameUtils._get_filename_for_image(
-            date_pattern=self.date_pattern,
-            image_file_path=image_file_path,
-            person_suffix=self.person_suffix,
-            keep_original_filename=self.keep_original_filename,
-            time_correction_offset=self.correction_offset,
-            timezone=self.timezone,
-            counter=counter,
-        )
-
-    def get_filename_for_video(
-        self,
-        *,
-        video_file_path: str,
+        date: datetime.datetime,
+        file_path: str,
         counter: int = 0,
+        extension: str | None = None,
     ):
-        return FilenameUtils._get_filename_for_video(
+        return FilenameUtils._get_formatted_filename(
+            date=date,
             date_pattern=self.date_pattern,
-            video_file_path=video_file_path,
+            file_path=file_path,
             person_suffix=self.person_suffix,
             keep_original_filename=self.keep_original_filename,
             time_correction_offset=self.correction_offset,
             timezone=self.timezone,
             counter=counter,
+            extension=extension,
         )
 
     @staticmethod
-    def _get_filename_for_image(
-        *,
-        date_pattern: str,
-        image_file_path: str,
-        person_suffix: str,
-        time_correction_offset: datetime.timedelta,
-        timezone: ZoneInfo,
-        keep_original_filename: bool = False,
-        counter = 0,
-    ):
+    def get_image_date(
+        image_file_path: str, file_stat: stat_result | None = None
+    ) -> tuple[datetime.datetime, DateSource]:
         date = FilenameUtils._get_exif_date(image_file_path)
 
         if not date:
             logging.getLogger(__name__).warning(
                 f"Couldn't get EXIF date from '{image_file_path}', using file modification date instead"
             )
-            date = FilenameUtils._get_mtime(image_file_path)
+            return FilenameUtils._get_mtime(image_file_path, file_stat), DateSource.MTIME
 
-        return FilenameUtils._get_formatted_filename(
-            date=date,
-            date_pattern=date_pattern,
-            file_path=image_file_path,
-            person_suffix=person_suffix,
-            keep_original_filename=keep_original_filename,
-            time_correction_offset=time_correction_offset,
-            timezone=timezone,
-            counter=counter,
-        )
+        return date, DateSource.EXIF
 
     @staticmethod
-    def _get_filename_for_video(
-        *,
-        date_pattern: str,
-        video_file_path: str,
-        person_suffix: str,
-        time_correction_offset: datetime.timedelta,
-        timezone: ZoneInfo,
-        keep_original_filename: bool = False,
-        counter = 0,
-    ):
-        date = FilenameUtils._get_video_creation_date(video_file_path)
+    def get_raw_date(
+        raw_file_path: str, file_stat: stat_result | None = None
+    ) -> tuple[datetime.datetime, DateSource]:
+        date = None
+
+        # RAW files are far too large for a full EXIF parser, so there's no
+        # fallback to exifread here
+        try:
+            date_tags = RawReader.get_date_tags(raw_file_path)
+
+            if date_tags:
+                date = date_tags.date_time_original
+        except ExifError as e:
+            logging.getLogger(__name__).debug(
+                f"Couldn't read RAW header of '{raw_file_path}' ({e})"
+            )
+        except OSError:
+            logging.getLogger(__name__).exception(
+                f"Error while reading '{raw_file_path}'"
+            )
 
         if not date:
             logging.getLogger(__name__).warning(
-                f"Couldn't get video creation date from '{video_file_path}', using file modification date instead"
+                f"Couldn't get EXIF date from '{raw_file_path}', using file modification date instead"
             )
-            date = FilenameUtils._get_mtime(video_file_path)
+            return FilenameUtils._get_mtime(raw_file_path, file_stat), DateSource.MTIME
 
-        return FilenameUtils._get_formatted_filename(
-            date=date,
-            date_pattern=date_pattern,
-            file_path=video_file_path,
-            person_suffix=person_suffix,
-            keep_original_filename=keep_original_filename,
-            time_correction_offset=time_correction_offset,
-            timezone=timezone,
-            counter=counter,
+        return date, DateSource.EXIF
+
+    @staticmethod
+    def get_native_video_date(
+        video_file_path: str, file_stat: stat_result | None = None
+    ) -> tuple[datetime.datetime, DateSource] | None:
+        """Get the video date without running ffprobe.
+
+        Returns `None` for containers that can only be read by ffprobe, their tags
+        can then be passed to `get_video_date_from_tags`.
+        """
+        try:
+            result = IsoBmffReader.get_creation_date(video_file_path)
+        except IsoBmffError:
+            return None
+        except OSError:
+            logging.getLogger(__name__).exception(
+                f"Error while reading '{video_file_path}'"
+            )
+            result = None
+
+        return FilenameUtils._with_video_mtime_fallback(video_file_path, result, file_stat)
+
+    @staticmethod
+    def get_video_date_from_tags(
+        video_file_path: str,
+        tags: dict[str, str],
+        file_stat: stat_result | None = None,
+    ) -> tuple[datetime.datetime, DateSource]:
+        return FilenameUtils._with_video_mtime_fallback(
+            video_file_path,
+            FilenameUtils._parse_video_tags(video_file_path, tags),
+            file_stat,
         )
 
     @staticmethod
-    def _get_mtime(file_path: str) -> datetime.datetime:
+    def _with_video_mtime_fallback(
+        video_file_path: str,
+        result: tuple[datetime.datetime, DateSource] | None,
+        file_stat: stat_result | None = None,
+    ) -> tuple[datetime.datetime, DateSource]:
+        if not result:
+            logging.getLogger(__name__).warning(
+                f"Couldn't get video creation date from '{video_file_path}', using file modification date instead"
+            )
+            return FilenameUtils._get_mtime(video_file_path, file_stat), DateSource.MTIME
+
+        return result
+
+    @staticmethod
+    def _get_mtime(
+        file_path: str, file_stat: stat_result | None = None
+    ) -> datetime.datetime:
+        if file_stat:
+            return datetime.datetime.fromtimestamp(file_stat.st_mtime)
+
         return datetime.datetime.fromtimestamp(getmtime(file_path))
 
     @staticmethod
@@ -141,7 +168,8 @@ class FilenameUtils:
         time_correction_offset: datetime.timedelta,
         timezone: ZoneInfo,
         keep_original_filename: bool = False,
-        counter = 0,        
+        counter = 0,
+        extension: str | None = None,
     ):
         date = date + time_correction_offset
         date = date.astimezone(timezone)
@@ -159,7 +187,8 @@ class FilenameUtils:
             else ""
         )
 
-        extension = FilenameUtils.get_file_extension(file_path)
+        if not extension:
+            extension = FilenameUtils.get_file_extension(file_path)
 
         filename = (
             f"{formatted_date}{counter_str}_{person_suffix}{original_filename_suffix}.{extension}"
@@ -168,26 +197,47 @@ class FilenameUtils:
         return filename
 
     @staticmethod
-    def _get_video_creation_date(video_file_path: str) -> datetime.datetime:
+    def _parse_video_tags(
+        video_file_path: str, tags: dict[str, str]
+    ) -> tuple[datetime.datetime, DateSource] | None:
+        creation_time_str = tags.get(FilenameUtils.VIDEO_TAG_GENERIC_CREATION_TIME)
+        source = DateSource.CREATION_TIME
+
+        # prefer apple creation date
+        if FilenameUtils.VIDEO_TAG_QUICKTIME_CREATION_DATE in tags.keys():
+            creation_time_str = tags.get(FilenameUtils.VIDEO_TAG_QUICKTIME_CREATION_DATE)
+            source = DateSource.QUICKTIME
+
+        if not creation_time_str:
+            return None
+
         try:
-            probe_result = ffmpeg.probe(video_file_path)
-            
-            tags = probe_result.get("format").get("tags")
-            
-            creation_time_str = tags.get(FilenameUtils.VIDEO_TAG_GENERIC_CREATION_TIME)
-            
-            # prefer apple creation date
-            if FilenameUtils.VIDEO_TAG_QUICKTIME_CREATION_DATE in tags.keys():
-                creation_time_str = tags.get(FilenameUtils.VIDEO_TAG_QUICKTIME_CREATION_DATE)    
-            
-            return datetime.datetime.fromisoformat(creation_time_str)
-        except Exception as e:
+            return datetime.datetime.fromisoformat(creation_time_str), source
+        except ValueError:
             logging.getLogger(__name__).exception(
-                f"Error while probing '{video_file_path}'"
+                f"Couldn't parse creation date '{creation_time_str}' of '{video_file_path}'"
             )
 
     @staticmethod
     def _get_exif_date(image_file_path: str) -> datetime.datetime:
+        try:
+            date_tags = ExifReader.get_date_tags(image_file_path)
+
+            if date_tags:
+                return date_tags.date_time_original
+
+            logging.getLogger(__name__).warning(
+                f"Couldn't find tag '{FilenameUtils.EXIF_TAG_NAME_DATETIMEORIGINAL}'"
+            )
+            return None
+        except ExifError as e:
+            logging.getLogger(__name__).debug(
+                f"Couldn't read EXIF header of '{image_file_path}' ({e}), falling back to exifread"
+            )
+
+        # only loaded for files the header-only reader can't handle
+        import exifread
+
         with open(image_file_path, "rb") as file_handle:
             tags = exifread.process_file(file_handle, stop_tag="DateTimeOriginal")
 
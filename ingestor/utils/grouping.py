@@ -0,0 +1,69 @@
+from os.path import basename, dirname, splitext
+from ..constants.allowed_file_extensions import AllowedFileExtension
+from ..constants.media_type import MediaType
+
+
+class FileGrouper:
+    """Groups files of one shot, like the HEIC and MOV of a Live Photo.
+
+    Files in the same directory with the same name up to the extension belong
+    together. Sidecars may also keep the extension of their media file, like
+    `IMG_1234.CR2.xmp`. Each group has a primary file the capture date is read
+    from, preferring the formats that are cheapest to read.
+    """
+
+    # lower ranks are read first, sidecars never are
+    _PRIMARY_RANKS = {
+        MediaType.IMAGE: 0,
+        MediaType.HEIC: 1,
+        MediaType.RAW: 2,
+        MediaType.VIDEO: 3,
+    }
+
+    @staticmethod
+    def group(file_paths: list[str]) -> dict[str, list[str]]:
+        """Map the primary file of every group to its other members.
+
+        Files without a partner aren't part of the result, neither are groups
+        made of sidecars only. Members keep the order of `file_paths`.
+        """
+        groups: dict[tuple[str, str], list[str]] = {}
+
+        for file_path in file_paths:
+            key = (dirname(file_path), FileGrouper.stem(file_path).lower())
+            groups.setdefault(key, []).append(file_path)
+
+        primaries = {}
+
+        for members in groups.values():
+            if len(members) < 2:
+                continue
+
+            ranked = [
+                (FileGrouper._PRIMARY_RANKS[media_type], i)
+                for i, media_type in enumerate(map(AllowedFileExtension.media_type, members))
+                if media_type in FileGrouper._PRIMARY_RANKS
+            ]
+
+            if not ranked:
+                continue
+
+            primary = members[min(ranked)[1]]
+            primaries[primary] = [member for member in members if member != primary]
+
+        return primaries
+
+    @staticmethod
+    def stem(file_path: str) -> str:
+        """Name of the file without its extension, or both extensions for sidecars."""
+        stem = splitext(basename(file_path))[0]
+
+        if AllowedFileExtension.is_sidecar(file_path) and AllowedFileExtension.media_type(stem):
+            return splitext(stem)[0]
+
+        return stem
+
+    @staticmethod
+    def suffix(file_path: str) -> str:
+        """Everything after the stem without the leading dot, like `MOV` or `CR2.xmp`."""
+        return basename(file_path)[len(FileGrouper.stem(file_path)) + 1:]
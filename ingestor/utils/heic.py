@@ -1,61 +1,181 @@
 import logging
-from os import listdir, remove
-from os.path import join, splitext, abspath, basename
-from PIL import Image
-from pillow_heif import register_heif_opener
-from ..constants.allowed_file_extensions import AllowedFileExtension
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from os import remove, replace, stat, stat_result, utime
+from time import perf_counter
+from typing import Callable
+from ..constants.date_source import DateSource
+from .exif import ExifError
+from .heif import HeifReader
+from .filename import FilenameUtils
 
 
 class HeicConverter:
+    # `Image` module of Pillow, imported once by every conversion worker
+    _image = None
+
     _logger: logging.Logger
 
-    input_directory: str
-    output_directory: str
+    jobs: int
+    converted_files: int
+    converted_bytes: int
 
-    def __init__(self, input_directory: str, output_directory: str | None = None):
-        self.input_directory = abspath(input_directory)
-        self.output_directory = (
-            input_directory if not output_directory else output_directory
-        )
+    def __init__(self, jobs: int = 1):
+        self.jobs = max(1, jobs)
+        self.converted_files = 0
+        self.converted_bytes = 0
         self._logger = logging.getLogger()
-        self._logger.debug(
-            f"Initialized {__name__}: {self.input_directory=}, {self.output_directory=}"
-        )
+        self._logger.debug(f"Initialized {__name__}: {self.jobs=}")
+
+    @contextmanager
+    def converting(
+        self,
+        conversions: dict[str, str],
+        delete_source_files: bool = False,
+        on_done: Callable[[str], None] | None = None,
+    ):
+        """Convert HEIC files to the given JPEG files in the background.
+
+        Conversion runs in worker processes while the body of the `with` block
+        runs, leaving the block waits for all conversions to finish. `on_done`
+        is called with every successfully converted file once they're finished.
+        """
+        if not conversions:
+            yield
+            return
+
+        start = perf_counter()
+        converted_bytes = 0
+        converted_files = 0
+
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(conversions)),
+            initializer=HeicConverter._init_worker,
+        ) as executor:
+            futures = [
+                executor.submit(
+                    HeicConverter._convert_file, file, jpg_file, delete_source_files
+                )
+                for file, jpg_file in conversions.items()
+            ]
+
+            yield
+
+            results = [future.result() for future in futures]
 
-    def run_conversion(self, delete_source_files: bool = False):
-        files = HeicConverter._find_heic_files(self.input_directory)
+        for file, size in zip(conversions, results):
+            if size is None:
+                continue
+
+            converted_files += 1
+            converted_bytes += size
+
+            if on_done:
+                on_done(file)
+
+        self.converted_files += converted_files
+        self.converted_bytes += converted_bytes
+
+        if converted_files < len(conversions):
+            self._logger.error(
+                f"Failed converting {len(conversions) - converted_files} files to JPEG"
+            )
+
+        elapsed = max(perf_counter() - start, 1e-9)
 
         self._logger.info(
-            f"Found {len(files)} HEIC/HEIF files to convert in '{self.input_directory}'"
+            f"Converted {converted_files} files in {elapsed:.2f} s "
+            f"({converted_files / elapsed:.1f} images/s, {converted_bytes / elapsed / 1e6:.1f} MB/s)"
         )
 
-        self._logger.info("Starting conversion")
+    @staticmethod
+    def get_date(
+        file: str, file_stat: stat_result | None = None
+    ) -> tuple[datetime, DateSource]:
+        """Get the capture date from the EXIF data of a HEIC file.
 
-        register_heif_opener()
+        Only the Exif item is read from the file, pixel data isn't decoded.
+        """
+        try:
+            date_tags = HeifReader.get_date_tags(file)
 
-        for file in files:
-            jpg_file = join(self.output_directory, splitext(basename(file))[0] + ".jpg")
+            if date_tags:
+                return date_tags.date_time_original, DateSource.EXIF
+        except ExifError as e:
+            logging.getLogger(__name__).debug(f"Couldn't read HEIF metadata of '{file}' ({e})")
+        except OSError:
+            logging.getLogger(__name__).exception(f"Error while reading EXIF data of '{file}'")
+
+        logging.getLogger(__name__).warning(
+            f"Couldn't get EXIF date from '{file}', using file modification date instead"
+        )
 
-            self._logger.debug(f"Converting file '{file}' to JPEG file '{jpg_file}'")
+        return FilenameUtils._get_mtime(file, file_stat), DateSource.MTIME
+
+    @staticmethod
+    def _convert_file(file: str, jpg_file: str, delete_source_file: bool) -> int | None:
+        """Convert a single file and return the size of the source file.
+
+        Runs in worker processes, so errors are logged here and signalled by
+        returning `None`.
+        """
+        logger = logging.getLogger(__name__)
+        logger.debug(f"Converting file '{file}' to JPEG file '{jpg_file}'")
+
+        # write to a temporary file first so an interrupted conversion never
+        # leaves a truncated JPEG that would be considered up to date
+        temp_file = jpg_file + ".part"
+
+        try:
+            source_stat = stat(file)
+
+            with HeicConverter._image.open(file) as image:
+                exif = image.getexif()
+                image.convert("RGB").save(temp_file, format="JPEG", exif=exif)
+
+            utime(temp_file, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            replace(temp_file, jpg_file)
+
+            if delete_source_file:
+                logger.debug(f"Deleting '{file}'")
+                remove(file)
+
+            return source_stat.st_size
+
+        except Exception as e:
+            logger.exception(f"Exception occured while converting '{file}' to JPEG")
 
             try:
-                with Image.open(file) as image:
-                    exif = image.getexif()
-                    image.convert("RGB").save(jpg_file, exif=exif)
+                remove(temp_file)
+            except OSError:
+                pass
 
-                    if delete_source_files:
-                        self._logger.debug(f"Deleting '{file}'")
-                        remove(file)
+            return None
 
-            except Exception as e:
-                self._logger.exception(
-                    f"Exception occured while converting '{file}' to JPEG"
-                )
+    @staticmethod
+    def _init_worker():
+        """Import Pillow with HEIF support in a conversion worker.
+
+        Pillow and pillow_heif are only imported once HEIC files are actually converted.
+        """
+        from PIL import Image
+        from pillow_heif import register_heif_opener
+
+        register_heif_opener()
+
+        HeicConverter._image = Image
 
     @staticmethod
-    def _find_heic_files(directory: str) -> list[str]:
-        return [
-            join(directory, f)
-            for f in listdir(directory)
-            if AllowedFileExtension.is_heic(f)
-        ]
+    def is_up_to_date(file: str, jpg_file: str) -> bool:
+        """Check whether `jpg_file` was converted from the current version of `file`.
+
+        Converted files get the modification time of their source, so a JPEG with
+        a different modification time or no content needs to be converted again.
+        """
+        try:
+            jpg_stat = stat(jpg_file)
+        except FileNotFoundError:
+            return False
+
+        return jpg_stat.st_size > 0 and jpg_stat.st_mtime_ns == stat(file).st_mtime_ns
@@ -0,0 +1,193 @@
+import struct
+from typing import BinaryIO
+from .exif import ExifDateTags, ExifError, ExifReader
+from .isobmff import IsoBmffError, IsoBmffReader
+
+
+class HeifReader:
+    """Header-only reader for the capture date of HEIC/HEIF files.
+
+    The EXIF data of a HEIF file is stored as an item of type `Exif`. Its ID is
+    looked up in `meta/iinf` and its location in `meta/iloc`, then only that
+    blob is read and parsed. Image data is never touched or decoded.
+    """
+
+    # upper bound for the `iinf`/`iloc` boxes and the Exif item read into memory
+    _MAX_SIZE = 1 << 20
+
+    _ITEM_TYPE_EXIF = b"Exif"
+
+    _CONSTRUCTION_METHOD_FILE = 0
+    _CONSTRUCTION_METHOD_IDAT = 1
+
+    @staticmethod
+    def get_date_tags(file_path: str) -> ExifDateTags | None:
+        with open(file_path, "rb") as file_handle:
+            return HeifReader.read_date_tags(file_handle)
+
+    @staticmethod
+    def read_date_tags(file_handle: BinaryIO) -> ExifDateTags | None:
+        """Read the capture date tags from an open HEIF file.
+
+        Returns `None` if the file has no Exif item or no `DateTimeOriginal` tag
+        and raises `ExifError` if it isn't a HEIF file.
+        """
+        file_size = file_handle.seek(0, 2)
+
+        try:
+            boxes = IsoBmffReader._iter_boxes(file_handle, 0, file_size)
+            first = next(boxes, None)
+
+            if not first or first[0] != b"ftyp":
+                raise ExifError("Not a HEIF file")
+
+            for box_type, start, end in boxes:
+                if box_type == b"meta":
+                    exif = HeifReader._read_exif_item(file_handle, start, end)
+
+                    return ExifReader.parse_exif_blob(exif) if exif else None
+        except (IsoBmffError, struct.error, IndexError) as e:
+            raise ExifError(f"Invalid HEIF structure: {e}") from e
+
+        raise ExifError("No 'meta' box found")
+
+    @staticmethod
+    def _read_exif_item(file_handle: BinaryIO, start: int, end: int) -> bytes | None:
+        # 'meta' is a full box, its children follow version and flags
+        children = {
+            box_type: (box_start, box_end)
+            for box_type, box_start, box_end in IsoBmffReader._iter_boxes(
+                file_handle, start + 4, end
+            )
+        }
+
+        if b"iinf" not in children or b"iloc" not in children:
+            return None
+
+        item_id = HeifReader._find_exif_item_id(
+            HeifReader._read_payload(file_handle, *children[b"iinf"])
+        )
+
+        if item_id is None:
+            return None
+
+        location = HeifReader._find_item_location(
+            HeifReader._read_payload(file_handle, *children[b"iloc"]), item_id
+        )
+
+        if not location:
+            return None
+
+        construction_method, base_offset, extents = location
+
+        if construction_method == HeifReader._CONSTRUCTION_METHOD_IDAT:
+            if b"idat" not in children:
+                raise IsoBmffError("Exif item refers to a missing 'idat' box")
+
+            base_offset += children[b"idat"][0]
+        elif construction_method != HeifReader._CONSTRUCTION_METHOD_FILE:
+            return None
+
+        if sum(length for _, length in extents) > HeifReader._MAX_SIZE:
+            raise IsoBmffError("Exif item exceeds read limit")
+
+        data = b""
+
+        for offset, length in extents:
+            file_handle.seek(base_offset + offset)
+            data += file_handle.read(length)
+
+        # the item starts with the offset of the TIFF header behind this field
+        (tiff_offset,) = struct.unpack_from(">I", data, 0)
+
+        return data[4 + tiff_offset:]
+
+    @staticmethod
+    def _find_exif_item_id(payload: bytes) -> int | None:
+        version = payload[0]
+
+        if version == 0:
+            (entry_count,) = struct.unpack_from(">H", payload, 4)
+            offset = 6
+        else:
+            (entry_count,) = struct.unpack_from(">I", payload, 4)
+            offset = 8
+
+        for _ in range(entry_count):
+            size, box_type = struct.unpack_from(">I4s", payload, offset)
+
+            if size < 8 or offset + size > len(payload):
+                raise IsoBmffError("Invalid 'infe' box")
+
+            # only 'infe' versions 2 and 3 carry an item type
+            if box_type == b"infe" and payload[offset + 8] >= 2:
+                if payload[offset + 8] == 2:
+                    item_id, _, item_type = struct.unpack_from(">HH4s", payload, offset + 12)
+                else:
+                    item_id, _, item_type = struct.unpack_from(">IH4s", payload, offset + 12)
+
+                if item_type == HeifReader._ITEM_TYPE_EXIF:
+                    return item_id
+
+            offset += size
+
+        return None
+
+    @staticmethod
+    def _find_item_location(
+        payload: bytes, item_id: int
+    ) -> tuple[int, int, list[tuple[int, int]]] | None:
+        """Return construction method, base offset and `(offset, length)` extents of an item."""
+        version = payload[0]
+        offset_size = payload[4] >> 4
+        length_size = payload[4] & 0x0F
+        base_offset_size = payload[5] >> 4
+        index_size = payload[5] & 0x0F if version in (1, 2) else 0
+
+        if any(size not in (0, 4, 8) for size in (offset_size, length_size, base_offset_size, index_size)):
+            raise IsoBmffError("Unsupported field size in 'iloc' box")
+
+        item_id_size = 2 if version < 2 else 4
+        item_count = int.from_bytes(payload[6:6 + item_id_size], "big")
+        position = 6 + item_id_size
+
+        def read_uint(size: int) -> int:
+            nonlocal position
+
+            if position + size > len(payload):
+                raise IsoBmffError("Truncated 'iloc' box")
+
+            value = int.from_bytes(payload[position:position + size], "big")
+            position += size
+            return value
+
+        for _ in range(item_count):
+            current_id = read_uint(item_id_size)
+            construction_method = HeifReader._CONSTRUCTION_METHOD_FILE
+
+            if version in (1, 2):
+                construction_method = read_uint(2) & 0x0F
+
+            read_uint(2)  # data reference index
+            base_offset = read_uint(base_offset_size)
+            extent_count = read_uint(2)
+            extents = []
+
+            for _ in range(extent_count):
+                read_uint(index_size)
+                extent_offset = read_uint(offset_size)
+                extent_length = read_uint(length_size)
+                extents.append((extent_offset, extent_length))
+
+            if current_id == item_id:
+                return construction_method, base_offset, extents
+
+        return None
+
+    @staticmethod
+    def _read_payload(file_handle: BinaryIO, start: int, end: int) -> bytes:
+        if end - start > HeifReader._MAX_SIZE:
+            raise IsoBmffError("Box payload exceeds read limit")
+
+        file_handle.seek(start)
+        return file_handle.read(end - start)
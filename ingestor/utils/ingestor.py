@@ -1,169 +1,1279 @@
-from datetime import timedelta
+from datetime import datetime
 from zoneinfo import ZoneInfo
 import logging
-from os import listdir
-from os.path import join, expanduser
+from os import link, remove, replace, stat, stat_result, utime
+from shutil import copyfileobj
+from os.path import join, expanduser, abspath, realpath, isdir, basename, lexists, samestat
+from typing import BinaryIO, Callable
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
 from ..constants.allowed_file_extensions import AllowedFileExtension
 from ..constants.ingesting_mode import IngestingMode
 from ..constants.heic_mode import HeicMode
+from ..constants.date_source import DateSource
+from ..constants.media_type import MediaType
+from ..constants.dedup_mode import DedupMode
+from ..constants.defaults import IngestorDefaultSettings
 from ..utils.heic import HeicConverter
 from ..utils.filename import FilenameUtils
+from ..utils.name_index import NameIndex
+from ..utils.metadata_cache import MetadataCache
+from ..utils.run_stats import RunStats
+from ..utils.progress import Progress
+from ..utils.ffprobe import FfprobeRunner
+from ..utils.discovery import Discovery, DiscoveredFiles
+from ..utils.manifest import IngestSource
+from ..utils.copy_engine import CopyEngine
+from ..utils.link_engine import LinkEngine
+from ..utils.move_engine import MoveEngine
+from ..utils.deduplicator import Deduplicator
+from ..utils.journal import Journal
+from ..utils.watcher import Watcher, Debouncer
+from ..utils.output_index import OutputIndex
+from ..utils.grouping import FileGrouper
+from ..utils.archive import ArchiveMember, ArchiveReader
+from ..utils.plan import PlanEntry, PlanReader, PlanWriter
+from ..constants.plan_action import PlanAction
 
 
 class Ingestor:
-    _directory: str
+    # number of plan entries applied at once
+    APPLY_BATCH_SIZE = 10_000
+
+    _sources: list[IngestSource]
     _output_directory: str
     _heic_mode: HeicMode
+    _dedup_mode: DedupMode
 
-    _filename_utils: FilenameUtils
+    _filename_utils: list[FilenameUtils]
+    _metadata_caches: list[MetadataCache | None]
+    _jobs: int
+    _heic_jobs: int
+    _transfer_jobs: int
+    _file_stats: dict[str, stat_result]
+    _duplicates: dict[str, str]
+    _use_journal: bool
+    _resumed: dict[str, str]
+    _ffprobe_timeout: float
+    _stats: RunStats
+    _stats_file: str | None
+    _plan_file: str | None
+    _persist_output_index: bool
+    _include_raw: bool
+    _group_files: bool
+    _capture_dates: dict[str, tuple[datetime, DateSource]]
 
     _logger: logging.Logger
 
     def __init__(
         self,
         *,
-        directory: str,
+        sources: list[IngestSource],
         output_directory: str,
-        person_suffix: str,
         keep_original_filename: bool,
         date_pattern: str,
         heic_mode: HeicMode,
-        time_correction_offset: timedelta,
         timezone: ZoneInfo,
+        metadata_cache: bool,
+        metadata_cache_file: str | None,
+        metadata_cache_max_entries: int,
+        jobs: int,
+        ffprobe_timeout: float,
+        heic_jobs: int,
+        transfer_jobs: int,
+        dedup_mode: DedupMode,
+        journal: bool,
+        stats_file: str | None = None,
+        plan_file: str | None = None,
+        persist_output_index: bool = False,
+        include_raw: bool = False,
+        group_files: bool = False,
     ):
-        self._directory = expanduser(directory.strip().rstrip("/").rstrip("\\"))
+        self._sources = sources
         self._output_directory = expanduser(
             output_directory.strip().rstrip("/").rstrip("\\")
         )
         self._heic_mode = heic_mode
+        self._dedup_mode = dedup_mode
+        self._jobs = max(1, jobs)
+        self._heic_jobs = max(1, heic_jobs)
+        self._transfer_jobs = max(1, transfer_jobs)
+        self._ffprobe_timeout = ffprobe_timeout
+        self._stats = RunStats()
+        self._stats_file = stats_file
+        self._plan_file = plan_file
+        self._persist_output_index = persist_output_index
+        self._include_raw = include_raw
+        self._group_files = group_files
+        self._capture_dates = {}
+        self._file_stats = {}
+        self._duplicates = {}
+        self._use_journal = journal
+        self._resumed = {}
 
-        self._filename_utils = FilenameUtils(
-            date_pattern=date_pattern,
-            keep_original_filename=keep_original_filename,
-            person_suffix=person_suffix,
-            correction_offset=time_correction_offset,
-            timezone=timezone,
-        )
+        self._filename_utils = [
+            FilenameUtils(
+                date_pattern=date_pattern,
+                keep_original_filename=keep_original_filename,
+                person_suffix=source.person_suffix,
+                correction_offset=source.time_correction_offset,
+                timezone=timezone,
+            )
+            for source in self._sources
+        ]
 
         self._logger = logging.getLogger(__name__)
 
+        # sources share one cache outside of them, its entries are keyed by
+        # absolute path and archive members are never cached
+        cache = None
+
+        if metadata_cache and not all(
+            ArchiveReader.is_archive(source.directory) for source in self._sources
+        ):
+            cache = MetadataCache(
+                cache_file=metadata_cache_file or MetadataCache.default_cache_file(),
+                max_entries=metadata_cache_max_entries,
+            )
+
+        self._metadata_caches = [
+            None if ArchiveReader.is_archive(source.directory) else cache
+            for source in self._sources
+        ]
+
     def execute(self, mode: IngestingMode, dry_run: bool = False):
-        self._handle_heic()
-        
-        filenames = self._get_new_filenames()
+        journal = self._open_journal()
+        output_index = OutputIndex(self._output_directory, persist=self._persist_output_index)
+        name_index = self._create_name_index(journal, output_index)
+
+        try:
+            self._execute(mode, dry_run, journal, name_index)
+
+            if not dry_run and not self._plan_file:
+                output_index.save(name_index)
+        finally:
+            if journal:
+                journal.close()
+
+            self._write_stats()
+
+    def watch(
+        self,
+        mode: IngestingMode,
+        dry_run: bool = False,
+        interval: float = IngestorDefaultSettings.WATCH_INTERVAL,
+        settle_time: float = IngestorDefaultSettings.SETTLE_TIME,
+    ):
+        """Ingest the sources once, then keep ingesting files as they appear.
+
+        New files are only picked up after their size and modification time
+        didn't change for `settle_time` seconds. The name index stays in memory,
+        so later files never collide with the ones ingested before.
+        """
+        journal = self._open_journal()
+        output_index = OutputIndex(self._output_directory, persist=self._persist_output_index)
+        name_index = self._create_name_index(journal, output_index)
+
+        # set up the watches first so nothing landing during the first run is missed
+        watcher = Watcher.create(
+            self._sources, exclude_directories={realpath(self._output_directory)}
+        )
+        debouncer = Debouncer(settle_time)
+        ingested: dict[str, tuple[int, int]] = {}
+
+        try:
+            self._execute(mode, dry_run, journal, name_index)
+            ingested.update(Ingestor._stat_keys(self._file_stats))
+
+            self._logger.info(
+                f"Watching {len(self._sources)} source directories for new files"
+            )
+
+            while True:
+                for source_index, file_path in watcher.poll(timeout=interval):
+                    debouncer.add(source_index, file_path)
+
+                settled = debouncer.pop_settled()
+
+                # changed files are ingested again, seen ones aren't
+                discovered = [DiscoveredFiles() for _ in self._sources]
+
+                for file_path, (source_index, file_stat) in settled.items():
+                    if ingested.get(file_path) != Ingestor._stat_key(file_stat):
+                        discovered[source_index].add(file_path, file_stat)
+
+                if not any(discovered):
+                    continue
+
+                try:
+                    self._execute(mode, dry_run, journal, name_index, discovered)
+                except Exception:
+                    self._logger.exception("Exception occured while ingesting new files")
+
+                ingested.update(Ingestor._stat_keys(self._file_stats))
+        finally:
+            watcher.close()
+
+            if not dry_run:
+                output_index.save(name_index)
+
+            if journal:
+                journal.close()
+
+            self._write_stats()
+
+    def _execute(
+        self,
+        mode: IngestingMode,
+        dry_run: bool,
+        journal: Journal | None,
+        name_index: NameIndex,
+        discovered: list[DiscoveredFiles] | None = None,
+    ):
+        filenames = self._get_new_filenames(mode, journal, name_index, discovered)
+
+        # duplicates left after planning are hard linked to their original once
+        # it has been transferred
+        links = {
+            filenames[duplicate]: filenames[original]
+            for duplicate, original in self._duplicates.items()
+        }
+        filenames = {
+            old_name: new_name
+            for old_name, new_name in filenames.items()
+            if old_name not in self._duplicates
+        }
+
+        # HEIC files are converted straight to their final name in the output
+        # directory while the remaining files are transferred
+        conversions = {}
+
+        if self._heic_mode == HeicMode.CONVERT:
+            conversions = {
+                old_name: new_name
+                for old_name, new_name in filenames.items()
+                if AllowedFileExtension.is_heic(old_name)
+            }
+            filenames = {
+                old_name: new_name
+                for old_name, new_name in filenames.items()
+                if old_name not in conversions
+            }
+
+        link_engine = None
+
+        # converted files are written, not linked, so they may be on any device
+        if mode in (IngestingMode.LINK, IngestingMode.SYMLINK, IngestingMode.REFLINK):
+            link_engine = LinkEngine(mode)
+            link_engine.check_devices(filenames, self._output_directory, self._file_stats)
 
         if dry_run:
             self._logger.warning("Dry run activated")
 
-            mode_string = "moved" if mode == IngestingMode.MOVE else "copied"
+            mode_string = {
+                IngestingMode.MOVE: "moved",
+                IngestingMode.COPY: "copied",
+                IngestingMode.LINK: "hard linked",
+                IngestingMode.SYMLINK: "symlinked",
+                IngestingMode.REFLINK: "reflinked",
+            }[mode]
 
             for old_name, new_name in filenames.items():
                 self._logger.debug(
                     f"File would be {mode_string}: '{old_name}' -> '{new_name}'"
                 )
 
+            for old_name, new_name in conversions.items():
+                self._logger.debug(
+                    f"File would be converted: '{old_name}' -> '{new_name}'"
+                )
+
+            for new_name, original in links.items():
+                self._logger.debug(
+                    f"Duplicate would be linked: '{original}' -> '{new_name}'"
+                )
+
+        if self._plan_file:
+            self._write_plan(mode, filenames, conversions, links)
+
+            if any(ArchiveReader.is_archive(source.directory) for source in self._sources):
+                self._logger.warning("Archive sources can't be planned and are left out of the plan")
+
+        if dry_run or self._plan_file:
+            if dry_run and discovered is None:
+                self._ingest_archives(mode, dry_run, name_index, journal)
+
+            self._stats.log_summary()
             return
 
-        if mode == IngestingMode.COPY:
-            Ingestor.copy_all(filenames)
-        elif mode == IngestingMode.MOVE:
-            Ingestor.move_all(filenames)
-        else:
-            raise ValueError(f"Unsupported mode '{mode}'")
+        if journal:
+            filenames = self._resume_transfers(mode, filenames, journal)
+            journal.plan(
+                {
+                    old_name: new_name
+                    for old_name, new_name in {**filenames, **conversions}.items()
+                    if old_name not in self._resumed
+                },
+                self._file_stats,
+                mode,
+            )
+
+        self._transfer(mode, filenames, conversions, links, journal, link_engine)
+
+        if discovered is None:
+            self._ingest_archives(mode, dry_run, name_index, journal)
+
+        self._stats.log_summary()
+
+    def apply(self, plan_file: str, dry_run: bool = False):
+        """Carry out the operations of a plan written with `plan_file` set.
+
+        The mode and output directory are taken from the plan. Capture dates
+        aren't extracted again, sources are only checked against the size and
+        modification time they had when the plan was made. The plan is read in
+        batches, so it never has to fit into memory at once.
+        """
+        with PlanReader(plan_file) as reader:
+            mode = IngestingMode(reader.mode)
+            self._output_directory = reader.output_directory
+            journal = None if dry_run else self._open_journal()
+
+            link_engine = None
+
+            if mode in (IngestingMode.LINK, IngestingMode.SYMLINK, IngestingMode.REFLINK):
+                link_engine = LinkEngine(mode)
+
+            self._logger.info(
+                f"Applying plan '{plan_file}' in mode '{mode}' to '{self._output_directory}'"
+            )
+
+            # duplicates are linked once all originals have been transferred
+            links = {}
+            changed = 0
+            existing = 0
+
+            try:
+                for batch in reader.batches(Ingestor.APPLY_BATCH_SIZE):
+                    filenames = {}
+                    conversions = {}
+                    self._file_stats = {}
+                    self._resumed = {}
+
+                    for entry in batch:
+                        if entry.action == PlanAction.LINK:
+                            links[entry.target] = entry.source
+                            continue
+
+                        try:
+                            file_stat = stat(entry.source)
+                        except FileNotFoundError:
+                            file_stat = None
+
+                        if not file_stat or Ingestor._stat_key(file_stat) != (entry.size, entry.mtime_ns):
+                            self._logger.warning(
+                                f"Skipping '{entry.source}', it was changed or removed after planning"
+                            )
+                            changed += 1
+                            continue
+
+                        if journal:
+                            journal_entry = journal.get(entry.source, file_stat, mode)
+
+                            if journal_entry and journal_entry.target == abspath(entry.target):
+                                if journal_entry.completed:
+                                    continue
+
+                                self._resumed[entry.source] = entry.target
+
+                        # the output directory may have changed since planning
+                        if (
+                            entry.action == PlanAction.TRANSFER
+                            and entry.source not in self._resumed
+                            and lexists(entry.target)
+                        ):
+                            self._logger.warning(
+                                f"Skipping '{entry.source}', its target '{entry.target}' already exists"
+                            )
+                            existing += 1
+                            continue
+
+                        self._file_stats[entry.source] = file_stat
+
+                        if entry.action == PlanAction.CONVERT:
+                            conversions[entry.source] = entry.target
+                        else:
+                            filenames[entry.source] = entry.target
+
+                    if dry_run:
+                        for old_name, new_name in {**filenames, **conversions}.items():
+                            self._logger.debug(f"File would be ingested: '{old_name}' -> '{new_name}'")
+
+                        continue
+
+                    if link_engine:
+                        link_engine.check_devices(filenames, self._output_directory, self._file_stats)
+
+                    if journal:
+                        filenames = self._resume_transfers(mode, filenames, journal)
+                        journal.plan(
+                            {
+                                old_name: new_name
+                                for old_name, new_name in {**filenames, **conversions}.items()
+                                if old_name not in self._resumed
+                            },
+                            self._file_stats,
+                            mode,
+                        )
+
+                    self._transfer(mode, filenames, conversions, {}, journal, link_engine)
+
+                # links of an earlier, interrupted apply are left alone
+                links = {
+                    new_name: original
+                    for new_name, original in links.items()
+                    if not lexists(new_name)
+                }
+
+                if dry_run:
+                    for new_name, original in links.items():
+                        self._logger.debug(f"Duplicate would be linked: '{original}' -> '{new_name}'")
+                else:
+                    Ingestor._link_duplicates(links)
+
+                self._stats.count("plan entries changed", changed)
+                self._stats.count("plan targets existing", existing)
+                self._stats.log_summary()
+            finally:
+                if journal:
+                    journal.close()
+
+                self._write_stats()
+
+    def _ingest_archives(
+        self,
+        mode: IngestingMode,
+        dry_run: bool,
+        name_index: NameIndex,
+        journal: Journal | None,
+    ):
+        """Copy the media files of all archive sources straight to their new names.
+
+        Every archive is read once from start to end. The capture date is read
+        from the first bytes of each member, falling back to the date of its
+        Google Takeout metadata file and then to the modification time of the
+        member. Members are streamed to a temporary file in the output directory
+        and renamed once their name is known, members whose metadata file comes
+        later in the archive wait there until the archive has been read. HEIC
+        members are converted from their temporary files once the archive has
+        been read. Members are journaled like files, so ingesting an archive
+        again skips the members that were already extracted.
+        """
+        for source_index, source in enumerate(self._sources):
+            if not ArchiveReader.is_archive(source.directory):
+                continue
+
+            if mode != IngestingMode.COPY:
+                self._logger.warning(
+                    f"Files in archive '{source.directory}' are copied, mode '{mode}' doesn't apply to archives"
+                )
+
+            with self._stats.measure("archive ingestion"):
+                self._ingest_archive(source_index, dry_run, name_index, journal)
+
+    def _ingest_archive(
+        self,
+        source_index: int,
+        dry_run: bool,
+        name_index: NameIndex,
+        journal: Journal | None,
+    ):
+        source = self._sources[source_index]
+        media_types = {MediaType.IMAGE, MediaType.HEIC, MediaType.VIDEO}
+
+        if self._include_raw:
+            media_types.add(MediaType.RAW)
+
+        takeout_dates: dict[str, datetime] = {}
+        deferred: list[tuple[ArchiveMember, str | None, str | None]] = []
+        # temporary files of HEIC members -> (JPEG file, journal key)
+        conversions: dict[str, tuple[str, str]] = {}
+        temp_file = None
+        ingested = 0
+        skipped = 0
+        ingested_size = 0
+
+        self._logger.info(f"Reading archive '{source.directory}'")
+
+        try:
+            with ArchiveReader(source.directory) as reader:
+                for member, stream in reader.members():
+                    if ArchiveReader.is_takeout_metadata(member.name):
+                        if member.size <= ArchiveReader.MAX_METADATA_SIZE:
+                            metadata = ArchiveReader.parse_takeout_metadata(
+                                member.name, stream.read()
+                            )
+
+                            if metadata:
+                                takeout_dates[metadata[0]] = metadata[1]
+
+                        continue
+
+                    media_type = AllowedFileExtension.media_type(member.name)
+
+                    if media_type not in media_types:
+                        continue
+
+                    key = ArchiveReader.member_path(source.directory, member.name)
+                    journal_entry = journal.get(key, member.stat(), IngestingMode.COPY) if journal else None
+
+                    if journal_entry and journal_entry.completed:
+                        skipped += 1
+                        continue
+
+                    # an interrupted extraction is finished under its planned name
+                    target = journal_entry.target if journal_entry else None
+
+                    header = stream.read(ArchiveReader.HEADER_SIZE)
+                    result = ArchiveReader.get_header_date(media_type, header)
+                    takeout_date = takeout_dates.get(ArchiveReader.takeout_key(member.name))
+
+                    if not result and takeout_date:
+                        result = takeout_date, DateSource.TAKEOUT
+
+                    # the name is only known once the date is, so the data is
+                    # streamed to a temporary file in the output directory
+                    temp_file = None
+
+                    if not dry_run:
+                        temp_file = join(
+                            self._output_directory, f".ingestor-archive-{ingested}.part"
+                        )
+                        Ingestor._write_member(member, header, stream, temp_file)
+
+                    ingested += 1
+                    ingested_size += member.size
+
+                    if result:
+                        self._finish_member(
+                            source_index, name_index, journal, conversions, member, *result, temp_file, target
+                        )
+                    else:
+                        deferred.append((member, temp_file, target))
+
+                    temp_file = None
+
+            for member, member_temp_file, target in deferred:
+                takeout_date = takeout_dates.get(ArchiveReader.takeout_key(member.name))
+
+                if takeout_date:
+                    result = takeout_date, DateSource.TAKEOUT
+                else:
+                    self._logger.warning(
+                        f"Couldn't get capture date of '{member.name}', using its modification date instead"
+                    )
+                    result = member.mtime, DateSource.MTIME
+
+                self._finish_member(
+                    source_index, name_index, journal, conversions, member, *result, member_temp_file, target
+                )
+
+            self._convert_members(conversions, journal)
+        finally:
+            # left behind if reading the archive or converting a member failed
+            for leftover in [
+                temp_file,
+                *(member_temp_file for _, member_temp_file, _ in deferred),
+                *conversions,
+            ]:
+                if leftover and lexists(leftover):
+                    remove(leftover)
+
+        if skipped:
+            self._logger.info(
+                f"Skipping {skipped} files in archive '{source.directory}' that were already extracted"
+            )
+
+        self._stats.add_files("archive ingestion", ingested, ingested_size)
+        self._logger.info(
+            f"{'Found' if dry_run else 'Extracted'} {ingested} media files in archive '{source.directory}'"
+        )
+
+    def _finish_member(
+        self,
+        source_index: int,
+        name_index: NameIndex,
+        journal: Journal | None,
+        conversions: dict[str, tuple[str, str]],
+        member: ArchiveMember,
+        date: datetime,
+        date_source: DateSource,
+        temp_file: str | None,
+        target: str | None,
+    ):
+        """Move an extracted member to its new name or queue its conversion.
+
+        `target` is the name planned for the member by an interrupted run.
+        """
+        convert = self._heic_mode == HeicMode.CONVERT and AllowedFileExtension.is_heic(member.name)
+        new_name = target or self._claim_filename(
+            name_index,
+            self._filename_utils[source_index],
+            date,
+            member.name,
+            extension="jpg" if convert else None,
+        )
+        self._stats.count(f"date source {date_source}")
+
+        if not temp_file:
+            self._logger.debug(
+                f"File would be {'converted' if convert else 'extracted'}: '{member.name}' -> '{new_name}'"
+            )
+            return
+
+        key = ArchiveReader.member_path(self._sources[source_index].directory, member.name)
+
+        if journal and not target:
+            journal.plan({key: new_name}, {key: member.stat()}, IngestingMode.COPY)
+
+        if convert:
+            conversions[temp_file] = new_name, key
+            return
+
+        self._logger.debug(f"Extracted: '{member.name}' -> '{new_name}'")
+        replace(temp_file, new_name)
+
+        if journal:
+            journal.complete(key)
+
+    def _convert_members(self, conversions: dict[str, tuple[str, str]], journal: Journal | None):
+        """Convert the temporary files of HEIC members, deleting them once converted."""
+        converter = HeicConverter(jobs=self._heic_jobs)
+
+        def on_done(temp_file: str):
+            if journal:
+                journal.complete(conversions[temp_file][1])
+
+        with converter.converting(
+            {temp_file: jpg_file for temp_file, (jpg_file, _) in conversions.items()},
+            delete_source_files=True,
+            on_done=on_done,
+        ):
+            pass
+
+        self._stats.count("heic conversions", converter.converted_files)
 
     @staticmethod
-    def move_all(filenames: dict[str, str]):
-        from shutil import move
+    def _write_member(member: ArchiveMember, header: bytes, stream: BinaryIO, file_path: str):
+        with open(file_path, "wb") as file_handle:
+            file_handle.write(header)
+            copyfileobj(stream, file_handle, ArchiveReader.HEADER_SIZE)
+
+        mtime = member.mtime.timestamp()
+        utime(file_path, (mtime, mtime))
+
+    def _transfer(
+        self,
+        mode: IngestingMode,
+        filenames: dict[str, str],
+        conversions: dict[str, str],
+        links: dict[str, str],
+        journal: Journal | None,
+        link_engine: LinkEngine | None,
+    ):
+        """Convert, transfer and link planned files, marking them done in the journal."""
+        pending_conversions = {
+            old_name: new_name
+            for old_name, new_name in conversions.items()
+            if not HeicConverter.is_up_to_date(old_name, new_name)
+        }
+
+        if journal:
+            for old_name in conversions.keys() - pending_conversions.keys():
+                journal.complete(old_name)
+
+        if len(pending_conversions) < len(conversions):
+            self._logger.info(
+                f"Skipping {len(conversions) - len(pending_conversions)} up to date HEIC conversions"
+            )
+
+        converter = HeicConverter(jobs=self._heic_jobs)
+        on_done = journal.complete if journal else None
+
+        self._stats.add_files(
+            "transfer",
+            len(filenames) + len(pending_conversions),
+            sum(self._file_stats[old_name].st_size for old_name in [*filenames, *pending_conversions]),
+        )
+
+        with self._stats.measure("transfer"):
+            with converter.converting(pending_conversions, on_done=on_done):
+                if mode == IngestingMode.COPY:
+                    Ingestor.copy_all(filenames, jobs=self._transfer_jobs, on_done=on_done)
+                elif mode == IngestingMode.MOVE:
+                    Ingestor.move_all(
+                        filenames,
+                        self._output_directory,
+                        jobs=self._transfer_jobs,
+                        stats=self._file_stats,
+                        on_done=on_done,
+                    )
+                elif link_engine:
+                    link_engine.link_all(filenames, on_done=on_done)
+                else:
+                    raise ValueError(f"Unsupported mode '{mode}'")
 
+            Ingestor._link_duplicates(links)
+
+        self._stats.count("heic conversions", converter.converted_files)
+
+    @staticmethod
+    def _link_duplicates(links: dict[str, str]):
         logger = logging.getLogger(__name__)
 
-        for old_name, new_name in filenames.items():
-            logger.debug(f"Moving: '{old_name}' -> '{new_name}'")
-            move(old_name, new_name)
+        for new_name, original in links.items():
+            logger.debug(f"Linking duplicate: '{original}' -> '{new_name}'")
+            link(original, new_name)
+
+    def _write_plan(
+        self,
+        mode: IngestingMode,
+        filenames: dict[str, str],
+        conversions: dict[str, str],
+        links: dict[str, str],
+    ):
+        with PlanWriter(
+            self._plan_file, mode=mode, output_directory=self._output_directory
+        ) as writer:
+            for action, operations in (
+                (PlanAction.TRANSFER, filenames),
+                (PlanAction.CONVERT, conversions),
+            ):
+                for old_name, new_name in operations.items():
+                    file_stat = self._file_stats[old_name]
+                    date, date_source = self._capture_dates.get(old_name, (None, None))
+
+                    writer.write(
+                        PlanEntry(
+                            action=action,
+                            source=old_name,
+                            target=new_name,
+                            size=file_stat.st_size,
+                            mtime_ns=file_stat.st_mtime_ns,
+                            date=date.isoformat() if date else None,
+                            date_source=date_source,
+                        )
+                    )
+
+            for new_name, original in links.items():
+                writer.write(
+                    PlanEntry(
+                        action=PlanAction.LINK,
+                        source=original,
+                        target=new_name,
+                        size=0,
+                        mtime_ns=0,
+                    )
+                )
+
+        self._logger.info(f"Wrote {writer.entries} planned operations to '{self._plan_file}'")
+
+    @staticmethod
+    def move_all(
+        filenames: dict[str, str],
+        output_directory: str,
+        jobs: int = 1,
+        stats: dict[str, stat_result] | None = None,
+        on_done: Callable[[str], None] | None = None,
+    ):
+        MoveEngine(jobs=jobs).move_all(filenames, output_directory, stats, on_done=on_done)
 
     @staticmethod
-    def copy_all(filenames: dict[str, str]):
-        from shutil import copy2
+    def copy_all(
+        filenames: dict[str, str],
+        jobs: int = 1,
+        on_done: Callable[[str], None] | None = None,
+    ):
+        CopyEngine(jobs=jobs).copy_all(filenames, on_done=on_done)
 
-        logger = logging.getLogger(__name__)
+    def _resume_transfers(
+        self, mode: IngestingMode, filenames: dict[str, str], journal: Journal
+    ) -> dict[str, str]:
+        """Drop transfers an interrupted run already finished from `filenames`.
+
+        Only operations resumed from the journal are checked. Their target is
+        verified against the source and partially written targets are removed.
+        """
+        pending = {}
+        finished = 0
 
         for old_name, new_name in filenames.items():
-            logger.debug(f"Copying: '{old_name}' -> '{new_name}'")
-            copy2(old_name, new_name)
+            if old_name not in self._resumed:
+                pending[old_name] = new_name
+                continue
 
-    def _get_new_filenames(self) -> dict[str, str]:
-        filenames = {}
-        image_files = Ingestor._find_image_files_in_directory(
-            self._directory,
-            include_heic=(self._heic_mode == HeicMode.COPY),
-            include_raw=False,
-        )
-        video_files = Ingestor._find_video_files_in_directory(self._directory)
+            if self._is_transferred(mode, old_name, new_name):
+                # the copy of a move across devices finished but the source is left
+                if mode == IngestingMode.MOVE:
+                    remove(old_name)
+
+                journal.complete(old_name)
+                finished += 1
+                continue
+
+            if lexists(new_name):
+                self._logger.debug(f"Removing partially written file '{new_name}'")
+                remove(new_name)
 
+            pending[old_name] = new_name
+
+        if finished:
+            self._logger.info(
+                f"{finished} files of the interrupted run were already transferred"
+            )
+
+        return pending
+
+    def _is_transferred(self, mode: IngestingMode, old_name: str, new_name: str) -> bool:
+        try:
+            target_stat = stat(new_name)
+        except FileNotFoundError:
+            return False
+
+        source_stat = self._file_stats[old_name]
+
+        if mode in (IngestingMode.LINK, IngestingMode.SYMLINK):
+            return samestat(source_stat, target_stat)
+
+        return target_stat.st_size == source_stat.st_size
+
+    def _write_stats(self):
+        if not self._stats_file:
+            return
+
+        try:
+            self._stats.write_json(self._stats_file)
+        except OSError:
+            self._logger.exception(f"Couldn't write run statistics to '{self._stats_file}'")
+
+    def _open_journal(self) -> Journal | None:
+        if not self._use_journal or not isdir(self._output_directory):
+            return None
+
+        return Journal(join(self._output_directory, Journal.FILENAME))
+
+    def _create_name_index(self, journal: Journal | None, output_index: OutputIndex) -> NameIndex:
+        name_index = NameIndex()
+
+        # existing results are never overwritten, a name found in the output
+        # directory is resolved like any other collision
+        with self._stats.measure("output index"):
+            for name in output_index.load():
+                name_index.add(name)
+
+        self._stats.count("output index names", len(name_index))
         self._logger.info(
-            f"Found {len(image_files)} image files in '{self._directory}'"
+            f"Found {len(name_index)} existing names in '{self._output_directory}'"
         )
-        self._logger.info(
-            f"Found {len(video_files)} video files in '{self._directory}'"
+
+        # names of earlier runs stay taken, even if their transfer didn't finish
+        if journal:
+            for target in journal.targets():
+                name_index.add(basename(target))
+
+        return name_index
+
+    @staticmethod
+    def _stat_key(file_stat: stat_result) -> tuple[int, int]:
+        return file_stat.st_size, file_stat.st_mtime_ns
+
+    @staticmethod
+    def _stat_keys(stats: dict[str, stat_result]) -> dict[str, tuple[int, int]]:
+        return {file_path: Ingestor._stat_key(file_stat) for file_path, file_stat in stats.items()}
+
+    def _get_new_filenames(
+        self,
+        mode: IngestingMode,
+        journal: Journal | None,
+        name_index: NameIndex,
+        discovered: list[DiscoveredFiles] | None = None,
+    ) -> dict[str, str]:
+        """Plan the new names of the discovered files.
+
+        The sources are scanned unless `discovered` already lists their files.
+        """
+        filenames = {}
+        files: list[tuple[str, Callable | None, int]] = []
+        stats: dict[str, stat_result] = {}
+        converted_files: set[str] = set()
+
+        # never pick up previous results when the output lies within a source
+        exclude_directories = {realpath(self._output_directory)}
+
+        if discovered is None:
+            with self._stats.measure("discovery"):
+                # archives are read in their own pass by `_ingest_archives`
+                discovered = [
+                    Discovery.scan(
+                        source.directory,
+                        recursive=source.recursive,
+                        exclude_directories=exclude_directories,
+                    )
+                    if not ArchiveReader.is_archive(source.directory)
+                    else DiscoveredFiles()
+                    for source in self._sources
+                ]
+
+        for source_index, (source, source_files) in enumerate(zip(self._sources, discovered)):
+            if ArchiveReader.is_archive(source.directory):
+                continue
+
+            image_files = source_files.of_type(MediaType.IMAGE)
+            heic_files = source_files.of_type(MediaType.HEIC)
+            video_files = source_files.of_type(MediaType.VIDEO)
+            raw_files = source_files.of_type(MediaType.RAW) if self._include_raw else []
+            sidecar_files = source_files.of_type(MediaType.SIDECAR) if self._group_files else []
+
+            self._logger.info(
+                f"Found {len(image_files)} image files in '{source.directory}'"
+            )
+            self._logger.info(
+                f"Found {len(heic_files)} HEIC/HEIF files to "
+                f"{'convert' if self._heic_mode == HeicMode.CONVERT else 'copy'} in '{source.directory}'"
+            )
+            self._logger.info(
+                f"Found {len(video_files)} video files in '{source.directory}'"
+            )
+
+            if self._include_raw:
+                self._logger.info(
+                    f"Found {len(raw_files)} RAW files in '{source.directory}'"
+                )
+
+            self._logger.debug(f"{image_files=}")
+            self._logger.debug(f"{video_files=}")
+
+            files.extend(
+                [
+                    *((image_file, FilenameUtils.get_image_date, source_index) for image_file in image_files),
+                    *((video_file, FilenameUtils.get_native_video_date, source_index) for video_file in video_files),
+                    *((heic_file, HeicConverter.get_date, source_index) for heic_file in heic_files),
+                    *((raw_file, FilenameUtils.get_raw_date, source_index) for raw_file in raw_files),
+                    # sidecars are only ingested along with their media file
+                    *((sidecar_file, None, source_index) for sidecar_file in sidecar_files),
+                ]
+            )
+            stats.update(source_files.stats)
+
+            if self._heic_mode == HeicMode.CONVERT:
+                converted_files.update(heic_files)
+
+        self._file_stats = stats
+        self._stats.add_files(
+            "discovery",
+            len(files),
+            sum(stats[file_path].st_size for file_path, _, _ in files),
         )
-        self._logger.debug(f"{image_files=}")
-        self._logger.debug(f"{video_files=}")
+        self._duplicates = {}
+        self._resumed = {}
 
-        for image_file in image_files:
-            counter = 0
-            
-            while True:
-                filename = join(
-                    self._output_directory,
-                    self._filename_utils.get_filename_for_image(image_file_path=image_file, counter=counter),
+        # files planned by an interrupted run keep their names, finished ones
+        # are left out entirely
+        if journal:
+            pending_files = []
+
+            for file in files:
+                entry = journal.get(file[0], stats[file[0]], mode)
+
+                if not entry:
+                    pending_files.append(file)
+                elif not entry.completed:
+                    self._resumed[file[0]] = entry.target
+
+            completed = len(files) - len(pending_files) - len(self._resumed)
+
+            self._stats.count("journal completed files", completed)
+            self._stats.count("journal resumed files", len(self._resumed))
+
+            if completed or self._resumed:
+                self._logger.info(
+                    f"Resuming {len(self._resumed)} planned operations from the journal, "
+                    f"skipping {completed} completed ones"
                 )
-                
-                if not filename in filenames.values():
-                    filenames[image_file] = filename
-                    break
-                
-                counter += 1
-
-        for video_file in video_files:
-            counter = 0
-            
-            while True:
-                filename = join(
-                    self._output_directory,
-                    self._filename_utils.get_filename_for_video(video_file_path=video_file, counter=counter),
+
+            files = pending_files
+            filenames.update(self._resumed)
+
+        if self._dedup_mode != DedupMode.OFF:
+            # sidecars of different shots often have identical content
+            candidates = dict.fromkeys(file_path for file_path, extractor, _ in files if extractor)
+
+            with self._stats.measure("deduplication"):
+                duplicates = self._find_duplicates(list(candidates), stats)
+
+            # duplicates of files already in the output directory are always
+            # skipped, the others are kept for linking in link dedup mode
+            if self._dedup_mode == DedupMode.LINK:
+                self._duplicates = {
+                    duplicate: original
+                    for duplicate, original in duplicates.items()
+                    if original in candidates
+                }
+
+            skipped = {
+                duplicate for duplicate in duplicates if duplicate not in self._duplicates
+            }
+            files = [file for file in files if file[0] not in skipped]
+
+            self._stats.count("duplicates skipped", len(skipped))
+            self._stats.count("duplicates linked", len(self._duplicates))
+
+            self._logger.info(
+                f"Skipping {len(skipped)} duplicate files, linking {len(self._duplicates)}"
+            )
+
+        # members of a group are named after their primary file, so only the
+        # date of the primary is extracted
+        groups: dict[str, list[str]] = {}
+
+        if self._group_files:
+            with self._stats.measure("grouping"):
+                groups = FileGrouper.group([file_path for file_path, _, _ in files])
+
+            members = {member for group in groups.values() for member in group}
+            files = [file for file in files if file[0] not in members]
+
+            self._stats.count("grouped files", len(members))
+            self._logger.info(
+                f"Found {len(groups)} groups of related files with {len(members)} additional members"
+            )
+
+        # sidecars whose media file isn't ingested are left alone
+        files = [file for file in files if file[1]]
+
+        with self._stats.measure("metadata extraction"):
+            dates = self._get_capture_dates(files, stats)
+
+        self._stats.add_files("metadata extraction", len(files))
+        self._capture_dates = {
+            member: date
+            for (file_path, _, _), date in zip(files, dates)
+            for member in [file_path, *groups.get(file_path, [])]
+        }
+
+        for _, date_source in dates:
+            self._stats.count(f"date source {date_source}")
+
+        # names are claimed serially in discovery order so that the counters are
+        # the same no matter how many workers were used for extracting the dates
+        collisions = name_index.collisions
+        planned = len(filenames)
+
+        with self._stats.measure("name planning"):
+            for (file_path, _, source_index), (date, _) in zip(files, dates):
+                extension = "jpg" if file_path in converted_files else None
+
+                if file_path not in groups:
+                    filenames[file_path] = self._claim_filename(
+                        name_index,
+                        self._filename_utils[source_index],
+                        date,
+                        file_path,
+                        extension=extension,
+                    )
+                    continue
+
+                # members are added right after their primary file, so a group
+                # is transferred together
+                members = [file_path, *groups[file_path]]
+                extensions = [
+                    "jpg" if member in converted_files else FileGrouper.suffix(member)
+                    for member in groups[file_path]
+                ]
+                filenames.update(
+                    zip(
+                        members,
+                        self._claim_group_filenames(
+                            name_index,
+                            self._filename_utils[source_index],
+                            date,
+                            file_path,
+                            [extension, *extensions],
+                        ),
+                    )
                 )
-                
-                if not filename in filenames.values():
-                    filenames[video_file] = filename
-                    break
-                
-                counter += 1
+
+        self._stats.add_files("name planning", len(filenames) - planned)
+        self._stats.count("name collisions", name_index.collisions - collisions)
 
         return filenames
 
-    def _handle_heic(self):
-        if not self._heic_mode == HeicMode.CONVERT:
-            return
+    def _find_duplicates(
+        self, file_paths: list[str], stats: dict[str, stat_result]
+    ) -> dict[str, str]:
+        """Find duplicates among the given files and the files in the output directory."""
+        candidates = {file_path: stats[file_path].st_size for file_path in file_paths}
+        existing = {}
 
-        converter = HeicConverter(self._directory)
-        converter.run_conversion(delete_source_files=False)
+        if isdir(self._output_directory):
+            # a file ingested into its own directory mustn't be its own duplicate
+            candidate_paths = {abspath(file_path) for file_path in file_paths}
+            existing = {
+                file_path: file_stat.st_size
+                for file_path, file_stat in Discovery.scan(self._output_directory).stats.items()
+                if abspath(file_path) not in candidate_paths
+            }
 
-    @staticmethod
-    def _find_image_files_in_directory(
-        directory, include_heic: bool = False, include_raw: bool = False
+        return Deduplicator(jobs=self._jobs).find_duplicates(candidates, existing)
+
+    def _get_capture_dates(
+        self,
+        files: list[
+            tuple[str, Callable[[str, stat_result], tuple[datetime, DateSource] | None], int]
+        ],
+        stats: dict[str, stat_result],
+    ) -> list[tuple[datetime, DateSource]]:
+        dates: list[tuple[datetime, DateSource] | None] = [None] * len(files)
+        missing: list[int] = []
+
+        for i, (file_path, _, source_index) in enumerate(files):
+            metadata_cache = self._metadata_caches[source_index]
+
+            if not metadata_cache:
+                missing.append(i)
+                continue
+
+            dates[i] = metadata_cache.get(abspath(file_path), stats[file_path])
+
+            if not dates[i]:
+                missing.append(i)
+
+        self._logger.debug(
+            f"Extracting capture dates of {len(missing)} files with {self._jobs} workers"
+        )
+
+        self._stats.count("metadata cache hits", len(files) - len(missing))
+        self._stats.count("metadata cache misses", len(missing))
+
+        progress = Progress("Extracting capture dates", len(missing), self._logger)
+        latencies: list[float] = []
+
+        def extract(i: int) -> tuple[datetime, DateSource] | None:
+            file_path, extractor, _ = files[i]
+            start = perf_counter()
+
+            try:
+                return extractor(file_path, stats[file_path])
+            finally:
+                latencies.append(perf_counter() - start)
+                progress.advance()
+
+        if self._jobs > 1 and len(missing) > 1:
+            with ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                extracted = list(executor.map(extract, missing))
+        else:
+            extracted = [extract(i) for i in missing]
+
+        # containers the native readers can't handle are probed in one batch
+        needs_probe = [
+            position for position, result in enumerate(extracted) if not result
+        ]
+
+        if needs_probe:
+            self._logger.debug(f"Probing {len(needs_probe)} files with ffprobe")
+
+            probe_paths = [files[missing[position]][0] for position in needs_probe]
+            ffprobe_runner = FfprobeRunner(
+                concurrency=self._jobs, timeout=self._ffprobe_timeout
+            )
+            probe_results = ffprobe_runner.probe_all(probe_paths)
+
+            self._stats.count("ffprobe calls", len(probe_paths))
+            self._stats.add_latencies("ffprobe", ffprobe_runner.latencies)
+
+            for position, file_path in zip(needs_probe, probe_paths):
+                extracted[position] = FilenameUtils.get_video_date_from_tags(
+                    file_path, probe_results[file_path], stats[file_path]
+                )
+
+        self._stats.add_latencies("metadata extraction", latencies)
+
+        for i, (date, source) in zip(missing, extracted):
+            dates[i] = (date, source)
+            file_path, _, source_index = files[i]
+            metadata_cache = self._metadata_caches[source_index]
+
+            if metadata_cache:
+                metadata_cache.put(abspath(file_path), stats[file_path], date, source)
+
+        for metadata_cache in dict.fromkeys(filter(None, self._metadata_caches)):
+            metadata_cache.save()
+
+        return dates
+
+    def _claim_filename(
+        self,
+        name_index: NameIndex,
+        filename_utils: FilenameUtils,
+        date: datetime,
+        file_path: str,
+        extension: str | None = None,
+    ) -> str:
+        def render(counter: int) -> str:
+            return filename_utils.get_filename_for_date(
+                date=date, file_path=file_path, counter=counter, extension=extension
+            )
+
+        return join(self._output_directory, name_index.claim(render(0), render))
+
+    def _claim_group_filenames(
+        self,
+        name_index: NameIndex,
+        filename_utils: FilenameUtils,
+        date: datetime,
+        file_path: str,
+        extensions: list[str | None],
     ) -> list[str]:
-        return [
-            join(directory, f)
-            for f in listdir(directory)
-            if AllowedFileExtension.is_image(
-                f, include_heic=include_heic, include_raw=include_raw
+        """Claim names for a group that only differ in their extensions.
+
+        Members whose name would only differ in case from the one of an earlier
+        member, like a converted HEIC file next to its JPEG, get a name of their
+        own, so they can't overwrite each other on case-insensitive file systems.
+        """
+        def render_all(counter: int, extensions: list[str | None]) -> list[str]:
+            return [
+                filename_utils.get_filename_for_date(
+                    date=date, file_path=file_path, counter=counter, extension=extension
+                )
+                for extension in extensions
+            ]
+
+        base_names = render_all(0, extensions)
+        shared: list[int] = []
+        separate: list[int] = []
+        folded_names = set()
+
+        for i, name in enumerate(base_names):
+            if name.casefold() in folded_names:
+                separate.append(i)
+            else:
+                folded_names.add(name.casefold())
+                shared.append(i)
+
+        shared_extensions = [extensions[i] for i in shared]
+        names: list[str] = [""] * len(extensions)
+
+        for i, name in zip(
+            shared,
+            name_index.claim_all(
+                [base_names[i] for i in shared],
+                lambda counter: render_all(counter, shared_extensions),
+            ),
+        ):
+            names[i] = join(self._output_directory, name)
+
+        for i in separate:
+            names[i] = self._claim_filename(
+                name_index, filename_utils, date, file_path, extension=extensions[i]
             )
-        ]
 
-    @staticmethod
-    def _find_video_files_in_directory(directory) -> list[str]:
-        return [
-            join(directory, f)
-            for f in listdir(directory)
-            if AllowedFileExtension.is_video(f)
-        ]
+        return names
@@ -0,0 +1,230 @@
+import datetime
+import struct
+from itertools import chain
+from typing import BinaryIO, Iterator
+from ..constants.date_source import DateSource
+
+
+class IsoBmffError(ValueError):
+    pass
+
+
+class IsoBmffReader:
+    """Minimal reader for creation dates in ISO base media files (MP4, MOV, 3GP).
+
+    Only box headers are read while walking the file, so the media data is never
+    touched and files with the `moov` box at the end are handled by seeking past
+    `mdat`. Box payloads are only read for `mvhd`, `keys` and `ilst`.
+    """
+
+    # box types that may legally appear at the start of a QuickTime/ISOBMFF file
+    _TOP_LEVEL_BOX_TYPES = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot", b"uuid"}
+
+    # upper bound for box payloads read into memory
+    _MAX_PAYLOAD_SIZE = 1 << 20
+
+    # QuickTime timestamps count seconds since 1904-01-01 UTC
+    _MAC_EPOCH = datetime.datetime(1904, 1, 1, tzinfo=datetime.timezone.utc)
+
+    _DATA_TYPE_UTF8 = 1
+
+    QUICKTIME_CREATION_DATE_KEY = b"com.apple.quicktime.creationdate"
+
+    @staticmethod
+    def get_creation_date(
+        file_path: str,
+    ) -> tuple[datetime.datetime, DateSource] | None:
+        with open(file_path, "rb") as file_handle:
+            return IsoBmffReader.read_creation_date(file_handle)
+
+    @staticmethod
+    def read_creation_date(
+        file_handle: BinaryIO,
+    ) -> tuple[datetime.datetime, DateSource] | None:
+        """Read the creation date from an open file.
+
+        Prefers the QuickTime `com.apple.quicktime.creationdate` metadata key over
+        the `mvhd` creation time, which is what ffprobe reports as `creation_time`.
+        Raises `IsoBmffError` if the file isn't an ISO base media file.
+        """
+        file_size = file_handle.seek(0, 2)
+        boxes = IsoBmffReader._iter_boxes(file_handle, 0, file_size)
+
+        try:
+            first = next(boxes, None)
+
+            if not first or first[0] not in IsoBmffReader._TOP_LEVEL_BOX_TYPES:
+                raise IsoBmffError("Not an ISO base media file")
+
+            for box_type, start, end in chain([first], boxes):
+                if box_type == b"moov":
+                    return IsoBmffReader._read_moov(file_handle, start, end)
+        except struct.error as e:
+            raise IsoBmffError("Truncated box") from e
+
+        raise IsoBmffError("No 'moov' box found")
+
+    @staticmethod
+    def _read_moov(
+        file_handle: BinaryIO, start: int, end: int
+    ) -> tuple[datetime.datetime, DateSource] | None:
+        creation_time = None
+        quicktime_creation_date = None
+
+        for box_type, box_start, box_end in IsoBmffReader._iter_boxes(file_handle, start, end):
+            if box_type == b"mvhd":
+                creation_time = IsoBmffReader._parse_mvhd(
+                    IsoBmffReader._read_payload(file_handle, box_start, box_end)
+                )
+            elif box_type == b"meta":
+                quicktime_creation_date = IsoBmffReader._read_meta(
+                    file_handle, box_start, box_end
+                )
+
+        if quicktime_creation_date:
+            return quicktime_creation_date, DateSource.QUICKTIME
+
+        if creation_time:
+            return creation_time, DateSource.CREATION_TIME
+
+    @staticmethod
+    def _parse_mvhd(payload: bytes) -> datetime.datetime | None:
+        if len(payload) < 12:
+            raise IsoBmffError("Truncated 'mvhd' box")
+
+        version = payload[0]
+
+        if version == 1:
+            (seconds,) = struct.unpack_from(">Q", payload, 4)
+        else:
+            (seconds,) = struct.unpack_from(">I", payload, 4)
+
+        if seconds == 0:
+            return None
+
+        return IsoBmffReader._MAC_EPOCH + datetime.timedelta(seconds=seconds)
+
+    @staticmethod
+    def _read_meta(file_handle: BinaryIO, start: int, end: int) -> datetime.datetime | None:
+        # QuickTime 'meta' boxes are plain boxes whereas ISO 'meta' boxes are full
+        # boxes with 4 bytes of version and flags before their children
+        file_handle.seek(start)
+        peek = file_handle.read(8)
+
+        if len(peek) == 8 and peek[4:8] not in (b"hdlr", b"keys", b"ilst"):
+            start += 4
+
+        keys: list[bytes] = []
+        ilst = None
+
+        for box_type, box_start, box_end in IsoBmffReader._iter_boxes(file_handle, start, end):
+            if box_type == b"keys":
+                keys = IsoBmffReader._parse_keys(
+                    IsoBmffReader._read_payload(file_handle, box_start, box_end)
+                )
+            elif box_type == b"ilst":
+                ilst = (box_start, box_end)
+
+        if not ilst or IsoBmffReader.QUICKTIME_CREATION_DATE_KEY not in keys:
+            return None
+
+        key_index = keys.index(IsoBmffReader.QUICKTIME_CREATION_DATE_KEY) + 1
+        value = IsoBmffReader._find_ilst_value(
+            IsoBmffReader._read_payload(file_handle, *ilst), key_index
+        )
+
+        if not value:
+            return None
+
+        try:
+            return datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _parse_keys(payload: bytes) -> list[bytes]:
+        (entry_count,) = struct.unpack_from(">I", payload, 4)
+        keys = []
+        offset = 8
+
+        for _ in range(entry_count):
+            if offset + 8 > len(payload):
+                raise IsoBmffError("Truncated 'keys' box")
+
+            (key_size,) = struct.unpack_from(">I", payload, offset)
+
+            if key_size < 8:
+                raise IsoBmffError("Invalid key size in 'keys' box")
+
+            keys.append(payload[offset + 8:offset + key_size])
+            offset += key_size
+
+        return keys
+
+    @staticmethod
+    def _find_ilst_value(payload: bytes, key_index: int) -> str | None:
+        offset = 0
+
+        while offset + 8 <= len(payload):
+            size, index = struct.unpack_from(">II", payload, offset)
+
+            if size < 8:
+                break
+
+            if index == key_index:
+                item = payload[offset + 8:offset + size]
+
+                # 'data' box: size, type, type indicator, locale, value
+                if len(item) >= 16 and item[4:8] == b"data":
+                    (data_size, data_type) = struct.unpack_from(">I4xI", item, 0)
+
+                    if data_type == IsoBmffReader._DATA_TYPE_UTF8:
+                        return item[16:data_size].decode("utf-8", errors="replace")
+
+                return None
+
+            offset += size
+
+        return None
+
+    @staticmethod
+    def _read_payload(file_handle: BinaryIO, start: int, end: int) -> bytes:
+        if end - start > IsoBmffReader._MAX_PAYLOAD_SIZE:
+            raise IsoBmffError("Box payload exceeds read limit")
+
+        file_handle.seek(start)
+        return file_handle.read(end - start)
+
+    @staticmethod
+    def _iter_boxes(
+        file_handle: BinaryIO, start: int, end: int
+    ) -> Iterator[tuple[bytes, int, int]]:
+        """Yield `(type, payload_start, payload_end)` for all boxes in a range."""
+        offset = start
+
+        while offset + 8 <= end:
+            file_handle.seek(offset)
+            header = file_handle.read(8)
+
+            if len(header) < 8:
+                raise IsoBmffError("Truncated box header")
+
+            size, box_type = struct.unpack(">I4s", header)
+            header_size = 8
+
+            if size == 1:
+                large_size = file_handle.read(8)
+
+                if len(large_size) < 8:
+                    raise IsoBmffError("Truncated box header")
+
+                (size,) = struct.unpack(">Q", large_size)
+                header_size = 16
+            elif size == 0:
+                size = end - offset
+
+            if size < header_size or offset + size > end:
+                raise IsoBmffError(f"Invalid size for box {box_type!r}")
+
+            yield box_type, offset + header_size, offset + size
+            offset += size
@@ -0,0 +1,187 @@
+import json
+import logging
+import os
+from os.path import abspath
+from threading import Lock
+from typing import NamedTuple, TextIO
+
+
+class JournalEntry(NamedTuple):
+    target: str
+    size: int
+    mtime_ns: int
+    mode: str
+    completed: bool
+
+
+class Journal:
+    """Append-only log of the planned and completed operations of an ingest.
+
+    All operations are appended before any file is transferred and every file
+    is marked as completed right after its transfer, so an interrupted run can
+    be resumed without planning or transferring finished files again. Entries
+    are keyed by the absolute source path and only valid as long as size and
+    modification time of the source still match. A torn last line left behind
+    by a crash is ignored.
+    """
+
+    FILENAME = ".ingestor-journal.jsonl"
+
+    _logger: logging.Logger
+
+    journal_file: str
+
+    _entries: dict[str, JournalEntry]
+    _file_handle: TextIO | None
+    _lock: Lock
+
+    def __init__(self, journal_file: str):
+        self.journal_file = journal_file
+        self._entries = {}
+        self._file_handle = None
+        self._lock = Lock()
+        self._logger = logging.getLogger(__name__)
+
+        lines, intact = self._load()
+
+        # superseded records only slow down loading, rewrite the journal once
+        # they outnumber the live ones or when a torn line has to be dropped
+        if not intact or lines > 2 * len(self._entries):
+            self._compact()
+
+        self._logger.debug(
+            f"Loaded {len(self._entries)} journal entries from '{self.journal_file}'"
+        )
+
+    def get(self, source: str, stat: os.stat_result, mode: str) -> JournalEntry | None:
+        entry = self._entries.get(abspath(source))
+
+        if (
+            not entry
+            or entry.mode != mode
+            or entry.size != stat.st_size
+            or entry.mtime_ns != stat.st_mtime_ns
+        ):
+            return None
+
+        return entry
+
+    def targets(self) -> list[str]:
+        return [entry.target for entry in self._entries.values()]
+
+    def plan(self, operations: dict[str, str], stats: dict[str, os.stat_result], mode: str):
+        """Record operations before they are carried out."""
+        records = []
+
+        for source, target in operations.items():
+            entry = JournalEntry(
+                target=abspath(target),
+                size=stats[source].st_size,
+                mtime_ns=stats[source].st_mtime_ns,
+                mode=mode,
+                completed=False,
+            )
+            self._entries[abspath(source)] = entry
+            records.append(Journal._plan_record(abspath(source), entry))
+
+        self._append(records, sync=True)
+
+    def complete(self, source: str):
+        """Record that the operation of `source` has been carried out."""
+        source = abspath(source)
+        entry = self._entries.get(source)
+
+        if not entry:
+            return
+
+        self._entries[source] = entry._replace(completed=True)
+        self._append([{"op": "done", "source": source}])
+
+    def close(self):
+        with self._lock:
+            if not self._file_handle:
+                return
+
+            self._file_handle.flush()
+            os.fsync(self._file_handle.fileno())
+            self._file_handle.close()
+            self._file_handle = None
+
+    def _append(self, records: list[dict], sync: bool = False):
+        if not records:
+            return
+
+        with self._lock:
+            if not self._file_handle:
+                self._file_handle = open(self.journal_file, "a", encoding="utf-8")
+
+            self._file_handle.write(
+                "".join(json.dumps(record) + "\n" for record in records)
+            )
+            self._file_handle.flush()
+
+            if sync:
+                os.fsync(self._file_handle.fileno())
+
+    def _load(self) -> tuple[int, bool]:
+        lines = 0
+        intact = True
+
+        try:
+            file_handle = open(self.journal_file, "r", encoding="utf-8")
+        except FileNotFoundError:
+            return lines, intact
+
+        with file_handle:
+            for line in file_handle:
+                lines += 1
+                intact = intact and line.endswith("\n")
+
+                try:
+                    record = json.loads(line)
+
+                    if record["op"] == "plan":
+                        self._entries[record["source"]] = JournalEntry(
+                            target=record["target"],
+                            size=record["size"],
+                            mtime_ns=record["mtime_ns"],
+                            mode=record["mode"],
+                            completed=False,
+                        )
+                    elif record["op"] == "done" and record["source"] in self._entries:
+                        self._entries[record["source"]] = self._entries[
+                            record["source"]
+                        ]._replace(completed=True)
+                except (ValueError, KeyError, TypeError):
+                    intact = False
+                    self._logger.warning(
+                        f"Ignoring invalid line {lines} of journal '{self.journal_file}'"
+                    )
+
+        return lines, intact
+
+    def _compact(self):
+        temp_file = self.journal_file + ".part"
+
+        with open(temp_file, "w", encoding="utf-8") as file_handle:
+            for source, entry in self._entries.items():
+                file_handle.write(json.dumps(Journal._plan_record(source, entry)) + "\n")
+
+                if entry.completed:
+                    file_handle.write(json.dumps({"op": "done", "source": source}) + "\n")
+
+            file_handle.flush()
+            os.fsync(file_handle.fileno())
+
+        os.replace(temp_file, self.journal_file)
+
+    @staticmethod
+    def _plan_record(source: str, entry: JournalEntry) -> dict:
+        return {
+            "op": "plan",
+            "source": source,
+            "target": entry.target,
+            "size": entry.size,
+            "mtime_ns": entry.mtime_ns,
+            "mode": entry.mode,
+        }
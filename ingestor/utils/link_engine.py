@@ -0,0 +1,89 @@
+import logging
+import os
+from os.path import abspath
+from shutil import copystat
+from time import perf_counter
+from typing import Callable
+from ..constants.ingesting_mode import IngestingMode
+from .copy_engine import CopyEngine
+
+
+class LinkEngine:
+    """Creates hard links, symbolic links or reflinks instead of copying data.
+
+    Hard links and reflinks only work within a single filesystem, so all sources
+    are checked against the output directory before anything is linked.
+    """
+
+    _logger: logging.Logger
+
+    mode: IngestingMode
+
+    _ACTIONS = {
+        IngestingMode.LINK: "Hard linking",
+        IngestingMode.SYMLINK: "Symlinking",
+        IngestingMode.REFLINK: "Reflinking",
+    }
+
+    def __init__(self, mode: IngestingMode):
+        if mode not in LinkEngine._ACTIONS:
+            raise ValueError(f"Unsupported link mode '{mode}'")
+
+        self.mode = mode
+        self._logger = logging.getLogger(__name__)
+
+    def check_devices(
+        self, filenames: dict[str, str], output_directory: str, stats: dict[str, os.stat_result]
+    ):
+        """Raise a `ValueError` if a source is on a different device than the output."""
+        if self.mode == IngestingMode.SYMLINK or not filenames:
+            return
+
+        output_device = os.stat(output_directory).st_dev
+        foreign = [
+            old_name
+            for old_name in filenames
+            if (stats.get(old_name) or os.stat(old_name)).st_dev != output_device
+        ]
+
+        if foreign:
+            raise ValueError(
+                f"Mode '{self.mode}' needs sources and output on the same filesystem, "
+                f"{len(foreign)} files (e.g. '{foreign[0]}') are on a different device than '{output_directory}'"
+            )
+
+    def link_all(
+        self, filenames: dict[str, str], on_done: Callable[[str], None] | None = None
+    ):
+        start = perf_counter()
+
+        for old_name, new_name in filenames.items():
+            self._logger.debug(f"{LinkEngine._ACTIONS[self.mode]}: '{old_name}' -> '{new_name}'")
+
+            if self.mode == IngestingMode.LINK:
+                os.link(old_name, new_name)
+            elif self.mode == IngestingMode.SYMLINK:
+                os.symlink(abspath(old_name), new_name)
+            else:
+                LinkEngine._reflink(old_name, new_name)
+
+            if on_done:
+                on_done(old_name)
+
+        self._logger.info(
+            f"Linked {len(filenames)} files in {perf_counter() - start:.2f} s"
+        )
+
+    @staticmethod
+    def _reflink(old_name: str, new_name: str):
+        with open(old_name, "rb") as source, open(new_name, "xb") as target:
+            try:
+                CopyEngine._reflink(source.fileno(), target.fileno(), 0)
+            except (OSError, AttributeError) as e:
+                target.close()
+                os.remove(new_name)
+                raise OSError(
+                    f"Couldn't reflink '{old_name}' to '{new_name}', the filesystem may not support reflinks"
+                ) from e
+
+        copystat(old_name, new_name)
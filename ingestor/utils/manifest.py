@@ -0,0 +1,85 @@
+import json
+from datetime import timedelta
+from os.path import dirname, expanduser, join
+from .time_offset_parser import TimeOffsetParser
+
+
+class IngestSource:
+    directory: str
+    person_suffix: str
+    time_correction_offset: timedelta
+    recursive: bool
+
+    def __init__(
+        self,
+        *,
+        directory: str,
+        person_suffix: str,
+        time_correction_offset: timedelta,
+        recursive: bool = False,
+    ):
+        self.directory = expanduser(directory.strip().rstrip("/").rstrip("\\"))
+        self.person_suffix = person_suffix
+        self.time_correction_offset = time_correction_offset
+        self.recursive = recursive
+
+    def __repr__(self) -> str:
+        return (
+            f"IngestSource(directory={self.directory!r}, person_suffix={self.person_suffix!r}, "
+            f"time_correction_offset={self.time_correction_offset!r}, recursive={self.recursive!r})"
+        )
+
+
+class Manifest:
+    """Loads the list of sources to ingest in a single run from a JSON file.
+
+    Example:
+
+        {
+            "sources": [
+                {"directory": "Julian", "person_suffix": "J_H"},
+                {"directory": "Anna/DCIM", "person_suffix": "A_B", "time_correction_offset": "-01:00:00"}
+            ]
+        }
+
+    Relative directories are resolved against the location of the manifest. A
+    directory may also be a ZIP or TAR archive.
+    Missing `person_suffix`, `time_correction_offset` and `recursive` values are
+    taken from the given defaults.
+    """
+
+    @staticmethod
+    def load(
+        manifest_file: str,
+        *,
+        person_suffix: str,
+        time_correction_offset: timedelta,
+        recursive: bool,
+    ) -> list[IngestSource]:
+        with open(manifest_file, "r", encoding="utf-8") as file_handle:
+            manifest = json.load(file_handle)
+
+        if not isinstance(manifest, dict) or not isinstance(manifest.get("sources"), list):
+            raise ValueError(f"Manifest '{manifest_file}' has no list of 'sources'")
+
+        base_directory = dirname(manifest_file)
+        sources = []
+
+        for entry in manifest["sources"]:
+            if not isinstance(entry, dict) or not entry.get("directory"):
+                raise ValueError(f"Source without 'directory' in manifest '{manifest_file}': {entry}")
+
+            offset = entry.get("time_correction_offset")
+
+            sources.append(
+                IngestSource(
+                    directory=join(base_directory, expanduser(entry["directory"])),
+                    person_suffix=entry.get("person_suffix", person_suffix),
+                    time_correction_offset=(
+                        TimeOffsetParser.parse(offset) if offset else time_correction_offset
+                    ),
+                    recursive=entry.get("recursive", recursive),
+                )
+            )
+
+        return sources
@@ -0,0 +1,139 @@
+import logging
+import sqlite3
+from contextlib import closing
+from datetime import datetime
+from os import environ, makedirs, stat_result
+from os.path import dirname, expanduser, join
+from time import time_ns
+from ..constants.date_source import DateSource
+
+
+class MetadataCache:
+    """On-disk cache of extracted capture dates.
+
+    Entries are keyed by path and only considered valid as long as device, inode,
+    size and modification time of the file still match. The number of entries is
+    bounded, least recently used entries are evicted first.
+    """
+
+    FILENAME = "metadata-cache.sqlite3"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS capture_dates (
+            path TEXT PRIMARY KEY,
+            device INTEGER NOT NULL,
+            inode INTEGER NOT NULL,
+            size INTEGER NOT NULL,
+            mtime_ns INTEGER NOT NULL,
+            date TEXT NOT NULL,
+            source TEXT NOT NULL,
+            last_used INTEGER NOT NULL
+        )
+    """
+
+    _logger: logging.Logger
+
+    cache_file: str
+    max_entries: int
+
+    _entries: dict[str, tuple[int, int, int, int, str, str]]
+    _pending: dict[str, tuple[int, int, int, int, str, str]]
+    _touched: set[str]
+
+    hits: int
+    misses: int
+
+    def __init__(self, cache_file: str, max_entries: int):
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self._logger = logging.getLogger(__name__)
+        self._entries = {}
+        self._pending = {}
+        self._touched = set()
+        self.hits = 0
+        self.misses = 0
+
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(MetadataCache._SCHEMA)
+                for path, *row in connection.execute(
+                    "SELECT path, device, inode, size, mtime_ns, date, source FROM capture_dates"
+                ):
+                    self._entries[path] = tuple(row)
+        except (sqlite3.Error, OSError):
+            self._logger.warning(
+                f"Couldn't read metadata cache '{self.cache_file}', starting with an empty cache",
+                exc_info=True,
+            )
+
+        self._logger.debug(
+            f"Loaded {len(self._entries)} cached entries from '{self.cache_file}'"
+        )
+
+    def get(self, path: str, stat: stat_result) -> tuple[datetime, DateSource] | None:
+        entry = self._pending.get(path) or self._entries.get(path)
+
+        if not entry or entry[:4] != MetadataCache._stat_key(stat):
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._touched.add(path)
+
+        return datetime.fromisoformat(entry[4]), DateSource(entry[5])
+
+    def put(self, path: str, stat: stat_result, date: datetime, source: DateSource):
+        self._pending[path] = (
+            *MetadataCache._stat_key(stat),
+            date.isoformat(),
+            source.value,
+        )
+
+    def save(self):
+        now = time_ns()
+
+        try:
+            with closing(self._connect()) as connection, connection:
+                connection.execute(MetadataCache._SCHEMA)
+                connection.executemany(
+                    "INSERT OR REPLACE INTO capture_dates VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(path, *entry, now) for path, entry in self._pending.items()],
+                )
+                connection.executemany(
+                    "UPDATE capture_dates SET last_used = ? WHERE path = ?",
+                    [(now, path) for path in self._touched - self._pending.keys()],
+                )
+                connection.execute(
+                    "DELETE FROM capture_dates WHERE path IN ("
+                    "SELECT path FROM capture_dates ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+        except (sqlite3.Error, OSError):
+            self._logger.warning(
+                f"Couldn't write metadata cache '{self.cache_file}'", exc_info=True
+            )
+            return
+
+        self._entries.update(self._pending)
+        self._pending.clear()
+        self._touched.clear()
+
+        self._logger.info(
+            f"Metadata cache: {self.hits} hits, {self.misses} misses"
+        )
+
+    @staticmethod
+    def default_cache_file() -> str:
+        """Per-user location of the cache, following the XDG base directory spec."""
+        cache_home = environ.get("XDG_CACHE_HOME") or expanduser(join("~", ".cache"))
+        return join(cache_home, "ingestor", MetadataCache.FILENAME)
+
+    def _connect(self) -> sqlite3.Connection:
+        if dirname(self.cache_file):
+            makedirs(dirname(self.cache_file), exist_ok=True)
+
+        return sqlite3.connect(self.cache_file)
+
+    @staticmethod
+    def _stat_key(stat: stat_result) -> tuple[int, int, int, int]:
+        return stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns
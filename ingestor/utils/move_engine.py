@@ -0,0 +1,78 @@
+import errno
+import logging
+import os
+from time import perf_counter
+from typing import Callable
+from .copy_engine import CopyEngine
+
+
+class MoveEngine:
+    """Moves files with plain renames where possible.
+
+    Whether a source can be renamed into the output directory is decided once
+    per source device. Files on other devices are moved by a parallel
+    copy -> fsync -> unlink pipeline instead.
+    """
+
+    _logger: logging.Logger
+
+    jobs: int
+
+    def __init__(self, jobs: int = 1):
+        self.jobs = max(1, jobs)
+        self._logger = logging.getLogger(__name__)
+
+    def move_all(
+        self,
+        filenames: dict[str, str],
+        output_directory: str,
+        stats: dict[str, os.stat_result] | None = None,
+        on_done: Callable[[str], None] | None = None,
+    ):
+        stats = stats or {}
+        output_device = os.stat(output_directory).st_dev
+
+        renames = {}
+        cross_device = {}
+
+        for old_name, new_name in filenames.items():
+            file_stat = stats.get(old_name) or os.stat(old_name)
+
+            if file_stat.st_dev == output_device:
+                renames[old_name] = new_name
+            else:
+                cross_device[old_name] = new_name
+
+        start = perf_counter()
+        renamed = 0
+
+        for old_name, new_name in renames.items():
+            self._logger.debug(f"Moving: '{old_name}' -> '{new_name}'")
+
+            try:
+                os.rename(old_name, new_name)
+            except OSError as e:
+                # e.g. different mount points of the same filesystem
+                if e.errno != errno.EXDEV:
+                    raise
+
+                cross_device[old_name] = new_name
+                continue
+
+            renamed += 1
+
+            if on_done:
+                on_done(old_name)
+
+        if renamed:
+            self._logger.info(f"Renamed {renamed} files in {perf_counter() - start:.2f} s")
+
+        if cross_device:
+            self._logger.warning(
+                f"{len(cross_device)} files are on a different device than '{output_directory}', "
+                "moving them means copying all of their data"
+            )
+
+            CopyEngine(jobs=self.jobs).copy_all(
+                cross_device, remove_source=True, on_done=on_done
+            )
@@ -0,0 +1,92 @@
+from typing import Callable, Iterator
+
+
+class NameIndex:
+    """Hash-based index of already assigned target names.
+
+    Keeps track of every name handed out so far as well as the next counter to try
+    for each base name, so that resolving a collision never re-scans the names
+    that were assigned before. Names are compared case-insensitively, as they
+    would overwrite each other on case-insensitive file systems.
+    """
+
+    _used_names: set[str]
+    _folded_names: set[str]
+    _next_counters: dict[str, int]
+
+    collisions: int
+
+    def __init__(self):
+        self._used_names = set()
+        self._folded_names = set()
+        self._next_counters = {}
+        self.collisions = 0
+
+    def __contains__(self, name: str) -> bool:
+        return name.casefold() in self._folded_names
+
+    def __len__(self) -> int:
+        return len(self._used_names)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._used_names)
+
+    def claim(self, base_name: str, render: Callable[[int], str]) -> str:
+        """Claim the first free name for `base_name`.
+
+        `render` builds the candidate name for a given counter, `render(0)` is
+        expected to return `base_name` itself.
+        """
+        counter = self._next_counters.get(base_name, 0)
+
+        while True:
+            name = base_name if counter == 0 else render(counter)
+
+            if name not in self:
+                break
+
+            counter += 1
+
+        self.add(name)
+        self._next_counters[base_name] = counter + 1
+
+        if counter > 0:
+            self.collisions += 1
+
+        return name
+
+    def claim_all(
+        self, base_names: list[str], render: Callable[[int], list[str]]
+    ) -> list[str]:
+        """Claim names that share a counter, like the members of a file group.
+
+        `render` builds the candidate names of all members for a given counter,
+        `render(0)` is expected to return `base_names` themselves. The first
+        counter for which none of the names is taken is used for all of them.
+        The names of the members must differ in more than their case.
+        """
+        counter = max(self._next_counters.get(base_name, 0) for base_name in base_names)
+
+        while True:
+            names = base_names if counter == 0 else render(counter)
+
+            if not any(name in self for name in names):
+                break
+
+            counter += 1
+
+        for name in names:
+            self.add(name)
+
+        for base_name in base_names:
+            self._next_counters[base_name] = counter + 1
+
+        if counter > 0:
+            self.collisions += 1
+
+        return names
+
+    def add(self, name: str):
+        """Mark `name` as taken without going through a base name."""
+        self._used_names.add(name)
+        self._folded_names.add(name.casefold())
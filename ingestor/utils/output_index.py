@@ -0,0 +1,101 @@
+import json
+import logging
+from os import scandir, stat
+from os.path import join
+from typing import Iterable
+
+
+class OutputIndex:
+    """Names of the entries already present in the output directory.
+
+    The directory is listed once per run, so planning never overwrites the
+    results of earlier runs without a stat per planned file. The names can be
+    persisted next to the results together with the modification time of the
+    directory. As long as no entry was added, removed or renamed since, the
+    saved names are used instead of listing the directory again.
+    """
+
+    FILENAME = ".ingestor-names.json"
+    VERSION = 1
+
+    _logger: logging.Logger
+
+    output_directory: str
+    index_file: str
+    persist: bool
+
+    def __init__(self, output_directory: str, persist: bool = False):
+        self.output_directory = output_directory
+        self.index_file = join(output_directory, OutputIndex.FILENAME)
+        self.persist = persist
+        self._logger = logging.getLogger(__name__)
+
+    def load(self) -> list[str]:
+        """Return the names in the output directory, an empty list if it doesn't exist."""
+        try:
+            mtime_ns = stat(self.output_directory).st_mtime_ns
+        except FileNotFoundError:
+            return []
+
+        if self.persist:
+            names = self._load_saved(mtime_ns)
+
+            if names is not None:
+                self._logger.debug(
+                    f"Loaded {len(names)} names of '{self.output_directory}' from '{self.index_file}'"
+                )
+                return names
+
+        with scandir(self.output_directory) as entries:
+            names = [entry.name for entry in entries]
+
+        self._logger.debug(f"Listed {len(names)} names in '{self.output_directory}'")
+
+        return names
+
+    def save(self, names: Iterable[str]):
+        """Persist `names`, which must include every name in the output directory."""
+        if not self.persist:
+            return
+
+        try:
+            # the index file is created first and then rewritten in place, so
+            # writing it doesn't change the modification time recorded in it
+            open(self.index_file, "a").close()
+            mtime_ns = stat(self.output_directory).st_mtime_ns
+
+            with open(self.index_file, "w", encoding="utf-8") as file_handle:
+                json.dump(
+                    {
+                        "version": OutputIndex.VERSION,
+                        "mtime_ns": mtime_ns,
+                        "names": sorted(names),
+                    },
+                    file_handle,
+                    separators=(",", ":"),
+                )
+        except OSError:
+            self._logger.warning(
+                f"Couldn't write output index '{self.index_file}'", exc_info=True
+            )
+
+    def _load_saved(self, mtime_ns: int) -> list[str] | None:
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as file_handle:
+                saved = json.load(file_handle)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            self._logger.warning(
+                f"Couldn't read output index '{self.index_file}', listing the output directory"
+            )
+            return None
+
+        if (
+            not isinstance(saved, dict)
+            or saved.get("version") != OutputIndex.VERSION
+            or saved.get("mtime_ns") != mtime_ns
+        ):
+            return None
+
+        return saved.get("names")
@@ -0,0 +1,146 @@
+import json
+from datetime import datetime
+from itertools import islice
+from os.path import abspath
+from typing import Iterator, TextIO
+from ..constants.plan_action import PlanAction
+
+
+class PlanEntry:
+    """A single planned operation.
+
+    For transfers and conversions `source` is the input file, for links of
+    duplicates it's the already planned target the duplicate is linked to.
+    `date` and `date_source` are unknown for operations resumed from a journal.
+    """
+
+    __slots__ = ("action", "source", "target", "size", "mtime_ns", "date", "date_source")
+
+    action: PlanAction
+    source: str
+    target: str
+    size: int
+    mtime_ns: int
+    date: str | None
+    date_source: str | None
+
+    def __init__(
+        self,
+        action: PlanAction,
+        source: str,
+        target: str,
+        size: int,
+        mtime_ns: int,
+        date: str | None = None,
+        date_source: str | None = None,
+    ):
+        self.action = action
+        self.source = source
+        self.target = target
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.date = date
+        self.date_source = date_source
+
+    def __repr__(self) -> str:
+        return f"PlanEntry({', '.join(f'{slot}={getattr(self, slot)!r}' for slot in PlanEntry.__slots__)})"
+
+
+class PlanWriter:
+    """Streams plan entries to a JSON lines file.
+
+    The first line is a header with the ingesting mode, the output directory and
+    the field names. Every further line is an array of entry values in that order.
+    Paths are written as absolute paths, so a plan can be applied from any
+    working directory.
+    """
+
+    VERSION = 1
+
+    plan_file: str
+    entries: int
+
+    _file_handle: TextIO
+
+    def __init__(self, plan_file: str, *, mode: str, output_directory: str):
+        self.plan_file = plan_file
+        self.entries = 0
+        self._file_handle = open(plan_file, "w", encoding="utf-8")
+        self._write(
+            {
+                "version": PlanWriter.VERSION,
+                "created": datetime.now().isoformat(),
+                "mode": mode,
+                "output_directory": abspath(output_directory),
+                "fields": PlanEntry.__slots__,
+            }
+        )
+
+    def __enter__(self) -> "PlanWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, entry: PlanEntry):
+        values = {slot: getattr(entry, slot) for slot in PlanEntry.__slots__}
+        values["source"] = abspath(entry.source)
+        values["target"] = abspath(entry.target)
+
+        self._write(list(values.values()))
+        self.entries += 1
+
+    def close(self):
+        self._file_handle.close()
+
+    def _write(self, value):
+        self._file_handle.write(json.dumps(value, separators=(",", ":")) + "\n")
+
+
+class PlanReader:
+    """Reads a plan file written by `PlanWriter` entry by entry."""
+
+    plan_file: str
+    mode: str
+    output_directory: str
+
+    _fields: list[str]
+    _file_handle: TextIO
+
+    def __init__(self, plan_file: str):
+        self.plan_file = plan_file
+        self._file_handle = open(plan_file, "r", encoding="utf-8")
+
+        try:
+            header = json.loads(self._file_handle.readline())
+
+            if header.get("version") != PlanWriter.VERSION:
+                raise ValueError(f"Unsupported plan version {header.get('version')!r}")
+
+            self.mode = header["mode"]
+            self.output_directory = header["output_directory"]
+            self._fields = header["fields"]
+        except (ValueError, KeyError, AttributeError) as e:
+            self._file_handle.close()
+            raise ValueError(f"'{plan_file}' isn't a valid plan file: {e}") from e
+
+    def __enter__(self) -> "PlanReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file_handle.close()
+
+    def __iter__(self) -> Iterator[PlanEntry]:
+        for line_number, line in enumerate(self._file_handle, start=2):
+            try:
+                values = dict(zip(self._fields, json.loads(line)))
+                values["action"] = PlanAction(values["action"])
+                yield PlanEntry(**values)
+            except (ValueError, KeyError, TypeError) as e:
+                raise ValueError(f"Invalid entry on line {line_number} of '{self.plan_file}': {e}") from e
+
+    def batches(self, size: int) -> Iterator[list[PlanEntry]]:
+        entries = iter(self)
+
+        while batch := list(islice(entries, size)):
+            yield batch
@@ -0,0 +1,63 @@
+import logging
+from datetime import timedelta
+from threading import Lock
+from time import perf_counter
+
+
+class Progress:
+    """Logs a progress line with throughput and ETA at most every few seconds.
+
+    Safe to advance from several worker threads.
+    """
+
+    # seconds between two progress log lines
+    INTERVAL = 5.0
+
+    _logger: logging.Logger
+
+    label: str
+    total: int
+    done: int
+    size: int
+
+    _start: float
+    _last_log: float
+    _lock: Lock
+
+    def __init__(self, label: str, total: int, logger: logging.Logger | None = None):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.size = 0
+        self._start = perf_counter()
+        self._last_log = self._start
+        self._lock = Lock()
+        self._logger = logger or logging.getLogger(__name__)
+
+    def add_total(self, total: int):
+        with self._lock:
+            self.total += total
+
+    def advance(self, files: int = 1, size: int = 0):
+        now = perf_counter()
+
+        with self._lock:
+            self.done += files
+            self.size += size
+
+            if now - self._last_log < Progress.INTERVAL:
+                return
+
+            self._last_log = now
+            done = self.done
+            size = self.size
+
+        elapsed = now - self._start
+        remaining = max(self.total - done, 0)
+        eta = timedelta(seconds=round(elapsed / done * remaining)) if done else "unknown"
+
+        self._logger.info(
+            f"{self.label}: {done}/{self.total} files ({done / max(self.total, 1):.0%})"
+            + (f", {size / 1e6:.1f} MB ({size / elapsed / 1e6:.1f} MB/s)" if size else "")
+            + f", {done / elapsed:.1f} files/s, ETA {eta}"
+        )
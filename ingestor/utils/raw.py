@@ -0,0 +1,95 @@
+import struct
+from typing import BinaryIO
+from .exif import ExifDateTags, ExifError, ExifReader
+from .isobmff import IsoBmffError, IsoBmffReader
+
+
+class RawReader:
+    """Header-only reader for the capture date of camera RAW files.
+
+    CR2, ARW, DNG and most other RAW formats are TIFF files, so only IFD0 and the
+    Exif IFD are read. CR3 files are ISO base media files, their Exif IFD is
+    stored as a TIFF structure in the `CMT2` box inside Canon's `uuid` box in
+    `moov`. Either way only a few KB are read, no matter how large the file is.
+    """
+
+    # https://github.com/lclevy/canon_cr3
+    CANON_UUID = bytes.fromhex("85c0b687820f11e08111f4ce462b6a48")
+
+    _TIFF_HEADERS = (b"II*\x00", b"MM\x00*")
+
+    # Panasonic RW2/RAW files are TIFF files with a different magic number
+    _PANASONIC_HEADER = b"IIU\x00"
+
+    _CR3_BRAND = b"crx "
+
+    @staticmethod
+    def get_date_tags(file_path: str) -> ExifDateTags | None:
+        with open(file_path, "rb") as file_handle:
+            return RawReader.read_date_tags(file_handle)
+
+    @staticmethod
+    def read_date_tags(file_handle: BinaryIO) -> ExifDateTags | None:
+        """Read the capture date tags from an open RAW file.
+
+        Returns `None` if the file has no `DateTimeOriginal` tag and raises
+        `ExifError` if the format isn't supported.
+        """
+        header = file_handle.read(12)
+
+        if header[:4] in RawReader._TIFF_HEADERS:
+            return ExifReader.parse_tiff(ExifReader._file_reader(file_handle))
+
+        if header[:4] == RawReader._PANASONIC_HEADER:
+            read_at = ExifReader._file_reader(file_handle)
+
+            return ExifReader.parse_tiff(
+                lambda offset, size: RawReader._patch_magic(offset, read_at(offset, size))
+            )
+
+        if header[4:12] == b"ftyp" + RawReader._CR3_BRAND:
+            return RawReader._read_cr3(file_handle)
+
+        raise ExifError("Unsupported RAW format")
+
+    @staticmethod
+    def _read_cr3(file_handle: BinaryIO) -> ExifDateTags | None:
+        file_size = file_handle.seek(0, 2)
+
+        try:
+            for box_type, start, end in IsoBmffReader._iter_boxes(file_handle, 0, file_size):
+                if box_type != b"moov":
+                    continue
+
+                for child_type, child_start, child_end in IsoBmffReader._iter_boxes(
+                    file_handle, start, end
+                ):
+                    if child_type != b"uuid":
+                        continue
+
+                    file_handle.seek(child_start)
+
+                    if file_handle.read(16) != RawReader.CANON_UUID:
+                        continue
+
+                    for cmt_type, cmt_start, _ in IsoBmffReader._iter_boxes(
+                        file_handle, child_start + 16, child_end
+                    ):
+                        if cmt_type == b"CMT2":
+                            return ExifReader.parse_tiff(
+                                ExifReader._file_reader(file_handle, base=cmt_start),
+                                exif_ifd_first=True,
+                            )
+
+                return None
+        except (IsoBmffError, struct.error) as e:
+            raise ExifError(f"Invalid CR3 structure: {e}") from e
+
+        raise ExifError("No 'moov' box found")
+
+    @staticmethod
+    def _patch_magic(offset: int, data: bytes) -> bytes:
+        if offset == 0:
+            return RawReader._TIFF_HEADERS[0] + data[4:]
+
+        return data
@@ -0,0 +1,122 @@
+import json
+import logging
+import statistics
+from contextlib import contextmanager
+from datetime import timedelta
+from threading import Lock
+from time import perf_counter
+
+
+class RunStats:
+    """Collects timings, file and byte counts, counters and latencies of a run.
+
+    Stages are timed with `measure`, everything else is added by the stages
+    themselves. The collected numbers can be logged or written as JSON.
+    """
+
+    _logger: logging.Logger
+
+    timings: dict[str, float]
+    files: dict[str, int]
+    bytes: dict[str, int]
+    counters: dict[str, int]
+    latencies: dict[str, list[float]]
+
+    _lock: Lock
+
+    def __init__(self):
+        self._logger = logging.getLogger(__name__)
+        self.timings = {}
+        self.files = {}
+        self.bytes = {}
+        self.counters = {}
+        self.latencies = {}
+        self._lock = Lock()
+
+    @contextmanager
+    def measure(self, stage: str):
+        start = perf_counter()
+
+        try:
+            yield
+        finally:
+            elapsed = perf_counter() - start
+            self.timings[stage] = self.timings.get(stage, 0.0) + elapsed
+            self._logger.debug(f"Stage '{stage}' took {timedelta(seconds=elapsed)}")
+
+    def add_files(self, stage: str, files: int, size: int = 0):
+        with self._lock:
+            self.files[stage] = self.files.get(stage, 0) + files
+            self.bytes[stage] = self.bytes.get(stage, 0) + size
+
+    def count(self, counter: str, amount: int = 1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def add_latencies(self, name: str, latencies: list[float]):
+        with self._lock:
+            self.latencies.setdefault(name, []).extend(latencies)
+
+    def log_summary(self):
+        for stage, elapsed in self.timings.items():
+            files = self.files.get(stage)
+            size = self.bytes.get(stage)
+            self._logger.info(
+                f"Stage '{stage}': {timedelta(seconds=elapsed)}"
+                + (f", {files} files" if files else "")
+                + (f" ({size / 1e6:.1f} MB)" if size else "")
+            )
+
+        for counter, value in sorted(self.counters.items()):
+            if value:
+                self._logger.info(f"{counter}: {value}")
+
+        for name, summary in self._latency_summaries().items():
+            self._logger.info(
+                f"{name} latency: p50 {summary['p50'] * 1e3:.1f} ms, "
+                f"p90 {summary['p90'] * 1e3:.1f} ms, p99 {summary['p99'] * 1e3:.1f} ms, "
+                f"max {summary['max'] * 1e3:.1f} ms ({summary['count']} calls)"
+            )
+
+    def to_dict(self) -> dict:
+        return {
+            "stages": {
+                stage: {
+                    "seconds": elapsed,
+                    "files": self.files.get(stage, 0),
+                    "bytes": self.bytes.get(stage, 0),
+                }
+                for stage, elapsed in self.timings.items()
+            },
+            "counters": dict(sorted(self.counters.items())),
+            "latencies": self._latency_summaries(),
+        }
+
+    def write_json(self, stats_file: str):
+        with open(stats_file, "w", encoding="utf-8") as file_handle:
+            json.dump(self.to_dict(), file_handle, indent=4)
+
+        self._logger.info(f"Wrote run statistics to '{stats_file}'")
+
+    def _latency_summaries(self) -> dict[str, dict[str, float]]:
+        summaries = {}
+
+        for name, latencies in self.latencies.items():
+            if not latencies:
+                continue
+
+            if len(latencies) > 1:
+                percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+            else:
+                percentiles = latencies * 99
+
+            summaries[name] = {
+                "count": len(latencies),
+                "mean": statistics.fmean(latencies),
+                "p50": percentiles[49],
+                "p90": percentiles[89],
+                "p99": percentiles[98],
+                "max": max(latencies),
+            }
+
+        return summaries
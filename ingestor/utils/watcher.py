@@ -0,0 +1,304 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+from abc import ABC, abstractmethod
+from os.path import basename, isdir, join, realpath
+from time import monotonic, sleep
+from ..constants.allowed_file_extensions import AllowedFileExtension
+from .discovery import Discovery
+from .manifest import IngestSource
+
+
+class Debouncer:
+    """Holds back files until their size and modification time stop changing.
+
+    Files that are still being written or synced are only released once a stat
+    didn't change for `settle_time` seconds, files that vanish are dropped.
+    """
+
+    settle_time: float
+
+    _pending: dict[str, tuple[int, int, int, float]]
+
+    def __init__(self, settle_time: float):
+        self.settle_time = settle_time
+        self._pending = {}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, source_index: int, file_path: str):
+        if file_path not in self._pending:
+            # the first check records the stat, settling starts from there
+            self._pending[file_path] = (source_index, -1, -1, 0.0)
+
+    def pop_settled(self, now: float | None = None) -> dict[str, tuple[int, os.stat_result]]:
+        """Return the files that settled, with their source index and stat result."""
+        now = monotonic() if now is None else now
+        settled = {}
+
+        for file_path, (source_index, size, mtime_ns, changed) in list(self._pending.items()):
+            try:
+                file_stat = os.stat(file_path)
+            except FileNotFoundError:
+                del self._pending[file_path]
+                continue
+
+            if (file_stat.st_size, file_stat.st_mtime_ns) != (size, mtime_ns):
+                self._pending[file_path] = (
+                    source_index,
+                    file_stat.st_size,
+                    file_stat.st_mtime_ns,
+                    now,
+                )
+            elif now - changed >= self.settle_time:
+                del self._pending[file_path]
+                settled[file_path] = (source_index, file_stat)
+
+        return settled
+
+
+class Watcher(ABC):
+    """Reports media files that appear in the source directories.
+
+    Uses inotify where available and falls back to comparing periodic scans.
+    """
+
+    _logger: logging.Logger
+
+    sources: list[IngestSource]
+    exclude_directories: set[str]
+
+    def __init__(self, sources: list[IngestSource], exclude_directories: set[str] | None = None):
+        self.sources = sources
+        self.exclude_directories = exclude_directories or set()
+        self._logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def create(
+        sources: list[IngestSource], exclude_directories: set[str] | None = None
+    ) -> "Watcher":
+        try:
+            return InotifyWatcher(sources, exclude_directories)
+        except OSError as e:
+            logging.getLogger(__name__).warning(
+                f"inotify isn't available ({e}), polling the source directories instead"
+            )
+
+        return PollingWatcher(sources, exclude_directories)
+
+    @abstractmethod
+    def poll(self, timeout: float) -> list[tuple[int, str]]:
+        """Wait up to `timeout` seconds and return `(source_index, file_path)` of new or changed files."""
+
+    def close(self):
+        pass
+
+    def _is_candidate(self, file_path: str) -> bool:
+        return not basename(file_path).startswith(".") and bool(
+            AllowedFileExtension.media_type(file_path)
+        )
+
+
+class PollingWatcher(Watcher):
+    """Finds new and changed files by comparing a scan with the previous one."""
+
+    _known: list[dict[str, tuple[int, int]]]
+
+    def __init__(self, sources: list[IngestSource], exclude_directories: set[str] | None = None):
+        super().__init__(sources, exclude_directories)
+        self._known = [self._snapshot(source) for source in self.sources]
+
+    def poll(self, timeout: float) -> list[tuple[int, str]]:
+        sleep(timeout)
+        changed = []
+
+        for source_index, source in enumerate(self.sources):
+            snapshot = self._snapshot(source)
+            known = self._known[source_index]
+
+            changed.extend(
+                (source_index, file_path)
+                for file_path, key in snapshot.items()
+                if known.get(file_path) != key
+            )
+            self._known[source_index] = snapshot
+
+        return changed
+
+    def _snapshot(self, source: IngestSource) -> dict[str, tuple[int, int]]:
+        if not isdir(source.directory):
+            return {}
+
+        try:
+            discovered = Discovery.scan(
+                source.directory,
+                recursive=source.recursive,
+                exclude_directories=self.exclude_directories,
+            )
+        except FileNotFoundError:
+            return {}
+
+        return {
+            file_path: (file_stat.st_size, file_stat.st_mtime_ns)
+            for file_path, file_stat in discovered.stats.items()
+        }
+
+
+class InotifyWatcher(Watcher):
+    """Watches the source directories with inotify through libc."""
+
+    # from sys/inotify.h
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_Q_OVERFLOW = 0x00004000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = os.O_CLOEXEC
+
+    _MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+    _EVENT = struct.Struct("iIII")
+    _BUFFER_SIZE = 64 * 1024
+
+    _libc: ctypes.CDLL
+    _fd: int
+    _watches: dict[int, tuple[int, str]]
+
+    def __init__(self, sources: list[IngestSource], exclude_directories: set[str] | None = None):
+        super().__init__(sources, exclude_directories)
+        self._watches = {}
+
+        library = ctypes.util.find_library("c")
+
+        if not library:
+            raise OSError(errno.ENOSYS, "libc not found")
+
+        self._libc = ctypes.CDLL(library, use_errno=True)
+
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError(errno.ENOSYS, "libc has no inotify support")
+
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+
+        self._fd = self._libc.inotify_init1(InotifyWatcher.IN_NONBLOCK | InotifyWatcher.IN_CLOEXEC)
+
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+
+        # archive sources are only read once
+        for source_index, source in enumerate(self.sources):
+            if isdir(source.directory):
+                self._add_watches(source_index, source.directory)
+
+    def poll(self, timeout: float) -> list[tuple[int, str]]:
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+
+        if not readable:
+            return []
+
+        changed = []
+
+        while True:
+            try:
+                data = os.read(self._fd, InotifyWatcher._BUFFER_SIZE)
+            except BlockingIOError:
+                break
+
+            changed.extend(self._parse(data))
+
+        return changed
+
+    def close(self):
+        os.close(self._fd)
+
+    def _parse(self, data: bytes) -> list[tuple[int, str]]:
+        changed = []
+        offset = 0
+
+        while offset < len(data):
+            wd, mask, _, length = InotifyWatcher._EVENT.unpack_from(data, offset)
+            offset += InotifyWatcher._EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\x00"))
+            offset += length
+
+            if mask & InotifyWatcher.IN_Q_OVERFLOW:
+                self._logger.warning("inotify event queue overflowed, rescanning all sources")
+                changed.extend(self._rescan())
+                continue
+
+            if wd not in self._watches or not name:
+                continue
+
+            source_index, directory = self._watches[wd]
+            path = join(directory, name)
+
+            if mask & InotifyWatcher.IN_ISDIR:
+                # files may have landed before the new directory was watched
+                if self.sources[source_index].recursive and not name.startswith("."):
+                    changed.extend(self._add_watches(source_index, path))
+                continue
+
+            if self._is_candidate(path):
+                changed.append((source_index, path))
+
+        return changed
+
+    def _add_watches(self, source_index: int, directory: str) -> list[tuple[int, str]]:
+        """Watch `directory` and, for recursive sources, its subdirectories.
+
+        Returns the files already present in the newly watched directories.
+        """
+        present = []
+        pending = [directory]
+
+        while pending:
+            current = pending.pop()
+
+            if realpath(current) in self.exclude_directories:
+                continue
+
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), InotifyWatcher._MASK)
+
+            if wd < 0:
+                self._logger.error(
+                    f"Couldn't watch '{current}': {os.strerror(ctypes.get_errno())}"
+                )
+                continue
+
+            self._watches[wd] = (source_index, current)
+
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        # symlinked directories aren't followed, like in `Discovery.scan`
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.sources[source_index].recursive and not entry.name.startswith("."):
+                                pending.append(entry.path)
+                        elif entry.is_file() and self._is_candidate(entry.path):
+                            present.append((source_index, entry.path))
+            except FileNotFoundError:
+                continue
+
+        return present
+
+    def _rescan(self) -> list[tuple[int, str]]:
+        changed = []
+
+        for source_index, source in enumerate(self.sources):
+            if not isdir(source.directory):
+                continue
+
+            discovered = Discovery.scan(
+                source.directory,
+                recursive=source.recursive,
+                exclude_directories=self.exclude_directories,
+            )
+            changed.extend((source_index, file_path) for file_path in discovered.stats)
+
+        return changed
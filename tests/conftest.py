@@ -0,0 +1,26 @@
+from typing import Callable
+import pytest
+
+
+@pytest.fixture
+def create_files(tmp_path) -> Callable[..., dict[str, str]]:
+    """Create source files and map them to new names in `tmp_path / "out"`.
+
+    Source `i` holds `size` times the byte `i`.
+    """
+    source_directory = tmp_path / "source"
+    output_directory = tmp_path / "out"
+    source_directory.mkdir()
+    output_directory.mkdir()
+
+    def create(count: int, size: int = 128) -> dict[str, str]:
+        filenames = {}
+
+        for i in range(count):
+            source = source_directory / f"{i}.jpg"
+            source.write_bytes(bytes([i]) * size)
+            filenames[str(source)] = str(output_directory / f"renamed_{i}.jpg")
+
+        return filenames
+
+    return create
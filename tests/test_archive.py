@@ -0,0 +1,59 @@
+import io
+import json
+import tarfile
+import zipfile
+from datetime import datetime, timezone
+from ingestor.constants.date_source import DateSource
+from ingestor.constants.media_type import MediaType
+from ingestor.utils.archive import ArchiveReader
+
+
+def test_zip_members_are_read_in_storage_order_without_hidden_files(tmp_path):
+    archive = tmp_path / "export.zip"
+
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.writestr("Photos/b.jpg", b"b")
+        zip_file.writestr("Photos/a.jpg", b"a")
+        zip_file.writestr("__MACOSX/Photos/._a.jpg", b"x")
+        zip_file.writestr("Photos/.DS_Store", b"x")
+
+    with ArchiveReader(str(archive)) as reader:
+        members = [(member.name, stream.read()) for member, stream in reader.members()]
+
+    assert ArchiveReader.is_archive(str(archive))
+    assert members == [("Photos/b.jpg", b"b"), ("Photos/a.jpg", b"a")]
+
+
+def test_tar_members_are_streamed(tmp_path):
+    archive = tmp_path / "export.tar.gz"
+
+    with tarfile.open(archive, "w:gz") as tar_file:
+        info = tarfile.TarInfo("WhatsApp/IMG-1.jpg")
+        info.size = 4
+        info.mtime = 1600000000
+        tar_file.addfile(info, io.BytesIO(b"data"))
+
+    with ArchiveReader(str(archive)) as reader:
+        members = [(member, stream.read()) for member, stream in reader.members()]
+
+    assert [(member.name, member.size, data) for member, data in members] == [("WhatsApp/IMG-1.jpg", 4, b"data")]
+    assert members[0][0].mtime == datetime.fromtimestamp(1600000000)
+
+
+def test_takeout_metadata_is_matched_by_title():
+    data = json.dumps({"title": "IMG_1234.JPG", "photoTakenTime": {"timestamp": "1688205605"}})
+
+    key, date = ArchiveReader.parse_takeout_metadata("Takeout/Photos/IMG_1234.JPG.suppl.json", data.encode())
+
+    assert key == ArchiveReader.takeout_key("Takeout/Photos/IMG_1234.JPG")
+    assert date == datetime(2023, 7, 1, 10, 0, 5, tzinfo=timezone.utc)
+    assert ArchiveReader.parse_takeout_metadata("Takeout/albums.json", b'{"albums": []}') is None
+
+
+def test_header_date_of_truncated_member_is_unknown():
+    # an 'mdat' box larger than the header hides the 'moov' box behind it
+    header = b"\x00\x00\x00\x10ftypisom\x00\x00\x02\x00" + b"\x00\x10\x00\x00mdat" + bytes(64)
+
+    assert ArchiveReader.get_header_date(MediaType.VIDEO, header) is None
+    assert ArchiveReader.get_header_date(MediaType.IMAGE, b"\xff\xd8\xff\xe1\x00") is None
+    assert DateSource.TAKEOUT == "takeout"
@@ -0,0 +1,60 @@
+import errno
+import os
+import pytest
+from ingestor.utils.copy_engine import CopyEngine
+
+
+MTIME_NS = 1_688_205_600_123_456_789
+
+
+def test_copy_all_copies_content_and_timestamps(create_files):
+    filenames = create_files(8, size=1024)
+
+    for old_name in filenames:
+        os.utime(old_name, ns=(MTIME_NS, MTIME_NS))
+
+    engine = CopyEngine(jobs=4)
+    engine.copy_all(filenames)
+
+    for old_name, new_name in filenames.items():
+        with open(old_name, "rb") as source, open(new_name, "rb") as target:
+            assert source.read() == target.read()
+
+        assert os.stat(new_name).st_mtime_ns == MTIME_NS
+
+    assert engine.copied_files == 8
+    assert engine.copied_bytes == 8 * 1024
+
+
+def test_unsupported_mechanisms_fall_back_to_userspace_copy(create_files, monkeypatch):
+    def unsupported(source_fd, target_fd, size):
+        os.write(target_fd, b"partial")
+        raise OSError(errno.EOPNOTSUPP, "Operation not supported")
+
+    for mechanism in ("_reflink", "_copy_file_range", "_sendfile"):
+        monkeypatch.setattr(CopyEngine, mechanism, staticmethod(unsupported))
+
+    filenames = create_files(3)
+
+    engine = CopyEngine(jobs=1)
+    engine.copy_all(filenames)
+
+    for old_name, new_name in filenames.items():
+        with open(old_name, "rb") as source, open(new_name, "rb") as target:
+            assert source.read() == target.read()
+
+    assert {name for name, *_ in engine._unsupported} == {"reflink", "copy_file_range", "sendfile"}
+
+
+def test_existing_targets_are_never_overwritten(create_files):
+    filenames = create_files(2)
+    new_name = list(filenames.values())[1]
+
+    with open(new_name, "wb") as file_handle:
+        file_handle.write(b"existing")
+
+    with pytest.raises(FileExistsError):
+        CopyEngine(jobs=1).copy_all(filenames)
+
+    with open(new_name, "rb") as file_handle:
+        assert file_handle.read() == b"existing"
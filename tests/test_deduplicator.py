@@ -0,0 +1,51 @@
+import os
+from ingestor.utils.deduplicator import Deduplicator
+
+
+def create_file(tmp_path, name: str, content: bytes) -> str:
+    path = tmp_path / name
+    path.write_bytes(content)
+    return str(path)
+
+
+def sizes(*files: str) -> dict[str, int]:
+    return {file: os.stat(file).st_size for file in files}
+
+
+def test_duplicates_map_to_first_file(tmp_path):
+    first = create_file(tmp_path, "a.jpg", b"photo" * 100)
+    second = create_file(tmp_path, "b.jpg", b"photo" * 100)
+    third = create_file(tmp_path, "c.jpg", b"photo" * 100)
+    other = create_file(tmp_path, "d.jpg", b"other" * 100)
+
+    duplicates = Deduplicator(jobs=2).find_duplicates(sizes(first, second, third, other))
+
+    assert duplicates == {second: first, third: first}
+
+
+def test_unique_sizes_are_not_read(tmp_path):
+    first = create_file(tmp_path, "a.jpg", b"x" * 10)
+    second = create_file(tmp_path, "b.jpg", b"x" * 20)
+
+    deduplicator = Deduplicator()
+
+    assert deduplicator.find_duplicates(sizes(first, second)) == {}
+    assert deduplicator.read_bytes == 0
+
+
+def test_same_head_and_tail_with_different_middle(tmp_path):
+    edge = b"e" * Deduplicator.PARTIAL_SIZE
+    first = create_file(tmp_path, "a.jpg", edge + b"1" * 100 + edge)
+    second = create_file(tmp_path, "b.jpg", edge + b"2" * 100 + edge)
+
+    assert Deduplicator().find_duplicates(sizes(first, second)) == {}
+
+
+def test_existing_files_are_kept(tmp_path):
+    (tmp_path / "out").mkdir()
+    existing = create_file(tmp_path, "out/2023-01-01 10.00.00.jpg", b"photo" * 100)
+    candidate = create_file(tmp_path, "a.jpg", b"photo" * 100)
+
+    duplicates = Deduplicator().find_duplicates(sizes(candidate), sizes(existing))
+
+    assert duplicates == {candidate: existing}
@@ -0,0 +1,48 @@
+from os.path import realpath
+from ingestor.constants.media_type import MediaType
+from ingestor.utils.discovery import Discovery
+
+
+def create_tree(tmp_path):
+    for name in ("a.JPG", "b.heic", "c.mp4", "d.cr2", "notes.txt", "sub/e.jpg", ".hidden/f.jpg", "out/g.jpg"):
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"data")
+
+
+def test_files_are_sorted_by_media_type(tmp_path):
+    create_tree(tmp_path)
+
+    discovered = Discovery.scan(str(tmp_path))
+
+    assert discovered.of_type(MediaType.IMAGE) == [str(tmp_path / "a.JPG")]
+    assert discovered.of_type(MediaType.HEIC) == [str(tmp_path / "b.heic")]
+    assert discovered.of_type(MediaType.VIDEO) == [str(tmp_path / "c.mp4")]
+    assert discovered.of_type(MediaType.RAW) == [str(tmp_path / "d.cr2")]
+    assert discovered.stats[str(tmp_path / "c.mp4")].st_size == 4
+
+
+def test_recursive_scan_skips_hidden_and_excluded_directories(tmp_path):
+    create_tree(tmp_path)
+
+    discovered = Discovery.scan(
+        str(tmp_path), recursive=True, exclude_directories={realpath(tmp_path / "out")}
+    )
+
+    assert sorted(discovered.of_type(MediaType.IMAGE)) == [
+        str(tmp_path / "a.JPG"),
+        str(tmp_path / "sub" / "e.jpg"),
+    ]
+
+
+def test_recursive_scan_doesnt_follow_symlinked_directories(tmp_path):
+    create_tree(tmp_path)
+    (tmp_path / "sub" / "loop").symlink_to(tmp_path, target_is_directory=True)
+
+    discovered = Discovery.scan(str(tmp_path), recursive=True)
+
+    assert sorted(discovered.of_type(MediaType.IMAGE)) == [
+        str(tmp_path / "a.JPG"),
+        str(tmp_path / "out" / "g.jpg"),
+        str(tmp_path / "sub" / "e.jpg"),
+    ]
@@ -0,0 +1,111 @@
+import io
+import struct
+from datetime import datetime
+import pytest
+from ingestor.utils.exif import ExifReader, ExifError
+
+
+DATE = "2023:07:01 12:00:05"
+OFFSET = "+02:00"
+SUBSEC = "123"
+
+
+def ifd(byte_order: str, entries: list[tuple[int, int, int, bytes]], offset: int) -> bytes:
+    """Build an IFD at `offset`, values longer than 4 bytes are appended after it."""
+    data_offset = offset + 2 + len(entries) * 12 + 4
+    table = struct.pack(byte_order + "H", len(entries))
+    data = b""
+
+    for tag, value_type, count, value in entries:
+        if len(value) <= 4:
+            table += struct.pack(byte_order + "HHI", tag, value_type, count) + value.ljust(4, b"\x00")
+        else:
+            table += struct.pack(byte_order + "HHII", tag, value_type, count, data_offset + len(data))
+            data += value
+
+    return table + b"\x00\x00\x00\x00" + data
+
+
+def ascii_entry(tag: int, value: str) -> tuple[int, int, int, bytes]:
+    raw = value.encode() + b"\x00"
+    return tag, 2, len(raw), raw
+
+
+def tiff(byte_order: str = "<", exif_entries=None) -> bytes:
+    if exif_entries is None:
+        exif_entries = [
+            ascii_entry(ExifReader.TAG_DATETIMEORIGINAL, DATE),
+            ascii_entry(ExifReader.TAG_OFFSETTIMEORIGINAL, OFFSET),
+            ascii_entry(ExifReader.TAG_SUBSECTIMEORIGINAL, SUBSEC),
+        ]
+
+    header = (b"II*\x00" if byte_order == "<" else b"MM\x00*") + struct.pack(byte_order + "I", 8)
+    ifd0_entries = [(0x0112, 3, 1, struct.pack(byte_order + "H", 1))]
+    ifd0_size = len(ifd(byte_order, [*ifd0_entries, (0, 0, 0, b"")], 8))
+    exif_offset = 8 + ifd0_size
+    ifd0_entries.append(
+        (ExifReader.TAG_EXIF_IFD_POINTER, 4, 1, struct.pack(byte_order + "I", exif_offset))
+    )
+
+    return header + ifd(byte_order, ifd0_entries, 8) + ifd(byte_order, exif_entries, exif_offset)
+
+
+def jpeg(tiff_data: bytes) -> bytes:
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + bytes(9)
+    app1_payload = b"Exif\x00\x00" + tiff_data
+    app1 = b"\xff\xe1" + struct.pack(">H", len(app1_payload) + 2) + app1_payload
+    return b"\xff\xd8" + app0 + app1 + b"\xff\xda" + bytes(1024) + b"\xff\xd9"
+
+
+def read(data: bytes):
+    return ExifReader.read_date_tags(io.BytesIO(data))
+
+
+def test_jpeg_date_tags():
+    tags = read(jpeg(tiff()))
+
+    assert tags.date_time_original == datetime(2023, 7, 1, 12, 0, 5)
+    assert tags.offset_time_original == OFFSET
+    assert tags.subsec_time_original == SUBSEC
+
+
+@pytest.mark.parametrize("byte_order", ["<", ">"])
+def test_tiff_date_tags(byte_order):
+    tags = read(tiff(byte_order))
+
+    assert tags.date_time_original == datetime(2023, 7, 1, 12, 0, 5)
+    assert tags.offset_time_original == OFFSET
+
+
+def test_missing_date_time_original_returns_none():
+    data = tiff(exif_entries=[ascii_entry(ExifReader.TAG_OFFSETTIMEORIGINAL, OFFSET)])
+
+    assert read(jpeg(data)) is None
+
+
+def test_jpeg_without_exif_returns_none():
+    assert read(b"\xff\xd8\xff\xda" + bytes(16)) is None
+
+
+def test_unknown_format_raises():
+    with pytest.raises(ExifError):
+        read(b"\x89PNG\r\n\x1a\n" + bytes(16))
+
+
+def test_truncated_tiff_raises():
+    with pytest.raises(ExifError):
+        read(tiff()[:30])
+
+
+@pytest.mark.parametrize(
+    "pointer",
+    [
+        (ExifReader.TAG_EXIF_IFD_POINTER, 3, 1, struct.pack("<H", 26)),
+        ascii_entry(ExifReader.TAG_EXIF_IFD_POINTER, "26"),
+    ],
+)
+def test_exif_ifd_pointer_of_wrong_type_raises(pointer):
+    data = b"II*\x00" + struct.pack("<I", 8) + ifd("<", [pointer], 8)
+
+    with pytest.raises(ExifError):
+        read(jpeg(data))
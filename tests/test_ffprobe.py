@@ -0,0 +1,45 @@
+import json
+import stat
+from ingestor.utils.ffprobe import FfprobeRunner
+
+
+TAGS = {"creation_time": "2023-07-01T10:00:00.000000Z"}
+
+
+def create_executable(tmp_path, script: str) -> str:
+    path = tmp_path / "ffprobe"
+    path.write_text(f"#!/bin/sh\n{script}\n")
+    path.chmod(path.stat().st_mode | stat.S_IXUSR)
+    return str(path)
+
+
+def test_probe_all_returns_format_tags(tmp_path):
+    output = json.dumps({"format": {"tags": TAGS}})
+    executable = create_executable(tmp_path, f"echo '{output}'")
+
+    runner = FfprobeRunner(concurrency=2, timeout=5, executable=executable)
+    result = runner.probe_all(["a.mts", "b.mkv", "c.avi"])
+
+    assert result == {"a.mts": TAGS, "b.mkv": TAGS, "c.avi": TAGS}
+
+
+def test_failing_probe_returns_empty_tags(tmp_path):
+    executable = create_executable(tmp_path, "echo 'Invalid data' >&2; exit 1")
+
+    runner = FfprobeRunner(concurrency=2, timeout=5, executable=executable)
+
+    assert runner.probe_all(["corrupt.mts"]) == {"corrupt.mts": {}}
+
+
+def test_hanging_probe_times_out(tmp_path):
+    executable = create_executable(tmp_path, "exec sleep 10")
+
+    runner = FfprobeRunner(concurrency=2, timeout=0.2, executable=executable)
+
+    assert runner.probe_all(["hanging.mts"]) == {"hanging.mts": {}}
+
+
+def test_missing_executable_returns_empty_tags(tmp_path):
+    runner = FfprobeRunner(concurrency=1, timeout=5, executable=str(tmp_path / "missing"))
+
+    assert runner.probe_all(["a.mkv"]) == {"a.mkv": {}}
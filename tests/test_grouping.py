@@ -0,0 +1,21 @@
+from ingestor.utils.grouping import FileGrouper
+
+
+def test_live_photo_is_grouped_with_heic_as_primary():
+    groups = FileGrouper.group(
+        ["d/IMG_1.MOV", "d/IMG_1.HEIC", "d/IMG_1.AAE", "d/IMG_2.JPG", "e/IMG_1.MOV"]
+    )
+
+    assert groups == {"d/IMG_1.HEIC": ["d/IMG_1.MOV", "d/IMG_1.AAE"]}
+
+
+def test_jpeg_is_preferred_over_raw_and_sidecars_keep_both_extensions():
+    groups = FileGrouper.group(["d/IMG_3.CR2", "d/IMG_3.CR2.xmp", "d/img_3.jpg"])
+
+    assert groups == {"d/img_3.jpg": ["d/IMG_3.CR2", "d/IMG_3.CR2.xmp"]}
+    assert FileGrouper.suffix("d/IMG_3.CR2.xmp") == "CR2.xmp"
+    assert FileGrouper.suffix("d/IMG_3.CR2") == "CR2"
+
+
+def test_sidecars_without_media_file_are_not_grouped():
+    assert FileGrouper.group(["d/a.xmp", "d/a.aae", "d/2023.07.01.jpg", "d/2023.07.02.jpg"]) == {}
@@ -0,0 +1,29 @@
+from os import utime
+from ingestor.utils.heic import HeicConverter
+
+
+def create_conversion(tmp_path, jpg_data: bytes = b"jpeg", jpg_mtime_ns: int = 1_000_000_000):
+    heic_file = tmp_path / "a.heic"
+    jpg_file = tmp_path / "a.jpg"
+    heic_file.write_bytes(b"heic")
+    jpg_file.write_bytes(jpg_data)
+    utime(heic_file, ns=(1_000_000_000, 1_000_000_000))
+    utime(jpg_file, ns=(jpg_mtime_ns, jpg_mtime_ns))
+
+    return str(heic_file), str(jpg_file)
+
+
+def test_jpeg_with_the_modification_time_of_its_source_is_up_to_date(tmp_path):
+    assert HeicConverter.is_up_to_date(*create_conversion(tmp_path))
+
+
+def test_missing_empty_or_outdated_jpeg_is_converted_again(tmp_path):
+    heic_file, jpg_file = create_conversion(tmp_path, jpg_data=b"")
+
+    assert not HeicConverter.is_up_to_date(heic_file, jpg_file)
+    assert not HeicConverter.is_up_to_date(heic_file, str(tmp_path / "b.jpg"))
+
+    heic_file, jpg_file = create_conversion(tmp_path, jpg_mtime_ns=2_000_000_000)
+
+    assert not HeicConverter.is_up_to_date(heic_file, jpg_file)
+
@@ -0,0 +1,80 @@
+import io
+import struct
+from datetime import datetime
+import pytest
+from ingestor.utils.exif import ExifError, ExifReader
+from ingestor.utils.heif import HeifReader
+
+
+DATE = "2023:07:01 12:00:05"
+
+
+def box(box_type: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def full_box(box_type: bytes, version: int, payload: bytes) -> bytes:
+    return box(box_type, struct.pack(">B3x", version) + payload)
+
+
+def exif_item() -> bytes:
+    value = DATE.encode() + b"\x00"
+    exif_offset = 8 + 18
+    ifd0 = struct.pack("<HHHII", 1, ExifReader.TAG_EXIF_IFD_POINTER, 4, 1, exif_offset) + bytes(4)
+    exif_ifd = struct.pack("<HHHII", 1, ExifReader.TAG_DATETIMEORIGINAL, 2, len(value), exif_offset + 18) + bytes(4)
+    tiff = b"II*\x00" + struct.pack("<I", 8) + ifd0 + exif_ifd + value
+
+    # offset of the TIFF header behind the "Exif\0\0" prefix
+    return struct.pack(">I", 6) + b"Exif\x00\x00" + tiff
+
+
+def iinf(*item_types: bytes) -> bytes:
+    entries = b"".join(
+        full_box(b"infe", 2, struct.pack(">HH4s", item_id, 0, item_type) + b"\x00")
+        for item_id, item_type in enumerate(item_types, start=1)
+    )
+    return full_box(b"iinf", 0, struct.pack(">H", len(item_types)) + entries)
+
+
+def heif(in_idat: bool = False, item_types=(b"hvc1", b"Exif")) -> bytes:
+    item = exif_item()
+    ftyp = box(b"ftyp", b"heic\x00\x00\x00\x00mif1heic")
+    exif_id = item_types.index(b"Exif") + 1 if b"Exif" in item_types else 99
+
+    def meta(exif_offset: int) -> bytes:
+        if in_idat:
+            # version 1 with construction method 1, offsets relative to 'idat'
+            iloc = full_box(
+                b"iloc", 1, struct.pack(">BBH", 0x44, 0x00, 1)
+                + struct.pack(">HHHHII", exif_id, 1, 0, 1, 0, len(item))
+            )
+            children = iinf(*item_types) + iloc + box(b"idat", item)
+        else:
+            iloc = full_box(
+                b"iloc", 0, struct.pack(">BBH", 0x44, 0x00, 2)
+                + struct.pack(">HHHII", 1, 0, 1, 0, 100)
+                + struct.pack(">HHHII", exif_id, 0, 1, exif_offset, len(item))
+            )
+            children = iinf(*item_types) + iloc
+
+        return full_box(b"meta", 0, box(b"hdlr", bytes(24)) + children)
+
+    # the offset of the item depends on the size of 'meta', which doesn't
+    exif_offset = len(ftyp) + len(meta(0)) + 8
+    return ftyp + meta(exif_offset) + box(b"mdat", item + bytes(1 << 16))
+
+
+@pytest.mark.parametrize("in_idat", [False, True])
+def test_date_is_read_from_exif_item(in_idat):
+    tags = HeifReader.read_date_tags(io.BytesIO(heif(in_idat)))
+
+    assert tags.date_time_original == datetime(2023, 7, 1, 12, 0, 5)
+
+
+def test_missing_exif_item_returns_none():
+    assert HeifReader.read_date_tags(io.BytesIO(heif(item_types=(b"hvc1",)))) is None
+
+
+def test_non_heif_file_raises():
+    with pytest.raises(ExifError):
+        HeifReader.read_date_tags(io.BytesIO(b"\xff\xd8\xff\xe0" + bytes(64)))
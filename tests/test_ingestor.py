@@ -0,0 +1,243 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from os import remove, stat, utime
+from os.path import basename
+from shutil import copyfile
+import zipfile
+from zoneinfo import ZoneInfo
+import pytest
+from ingestor.constants.dedup_mode import DedupMode
+from ingestor.constants.defaults import IngestorDefaultSettings
+from ingestor.constants.heic_mode import HeicMode
+from ingestor.constants.ingesting_mode import IngestingMode
+from ingestor.constants.plan_action import PlanAction
+from ingestor.utils.heic import HeicConverter
+from ingestor.utils.ingestor import Ingestor
+from ingestor.utils.link_engine import LinkEngine
+from ingestor.utils.manifest import IngestSource
+from ingestor.utils.name_index import NameIndex
+from ingestor.utils.plan import PlanReader
+
+
+DATE = datetime(2023, 7, 1, 12, 0, 5, tzinfo=timezone.utc)
+NAME = "2023-07-01 12.00.05_J_H"
+
+# a JPEG without EXIF data is dated by its modification time
+JPEG = b"\xff\xd8\xff\xda" + bytes(64) + b"\xff\xd9"
+
+
+def create_file(path, data: bytes = JPEG, date: datetime = DATE):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    utime(path, (date.timestamp(), date.timestamp()))
+
+
+def create_ingestor(source, output, **kwargs) -> Ingestor:
+    settings = {
+        "sources": [
+            IngestSource(
+                directory=str(source), person_suffix="J_H", time_correction_offset=timedelta(0)
+            )
+        ],
+        "output_directory": str(output),
+        "keep_original_filename": False,
+        "date_pattern": IngestorDefaultSettings.DATE_PATTERN,
+        "heic_mode": HeicMode.CONVERT,
+        "timezone": ZoneInfo("UTC"),
+        "metadata_cache": False,
+        "metadata_cache_file": None,
+        "metadata_cache_max_entries": IngestorDefaultSettings.METADATA_CACHE_MAX_ENTRIES,
+        "jobs": 1,
+        "ffprobe_timeout": IngestorDefaultSettings.FFPROBE_TIMEOUT,
+        "heic_jobs": 1,
+        "transfer_jobs": 1,
+        "dedup_mode": DedupMode.OFF,
+        "journal": True,
+    }
+    settings.update(kwargs)
+
+    return Ingestor(**settings)
+
+
+def read_plan(plan_file) -> dict[str, tuple[PlanAction, str]]:
+    with PlanReader(str(plan_file)) as reader:
+        return {basename(entry.source): (entry.action, basename(entry.target)) for entry in reader}
+
+
+def test_grouped_heic_next_to_its_jpeg_is_converted_to_a_name_of_its_own(tmp_path):
+    source = tmp_path / "src"
+    output = tmp_path / "out"
+    plan_file = tmp_path / "plan.jsonl"
+    output.mkdir()
+
+    for name in ("IMG_1.JPG", "IMG_1.HEIC", "IMG_1.MOV"):
+        create_file(source / name)
+
+    create_ingestor(source, output, group_files=True, plan_file=str(plan_file)).execute(
+        IngestingMode.COPY
+    )
+
+    # the converted HEIC mustn't overwrite the JPEG on case-insensitive file systems
+    assert read_plan(plan_file) == {
+        "IMG_1.JPG": (PlanAction.TRANSFER, f"{NAME}.JPG"),
+        "IMG_1.MOV": (PlanAction.TRANSFER, f"{NAME}.MOV"),
+        "IMG_1.HEIC": (PlanAction.CONVERT, "2023-07-01 12.00.05_1_J_H.jpg"),
+    }
+
+
+def test_up_to_date_heic_conversions_are_skipped(tmp_path):
+    heic_file = tmp_path / "IMG_1.HEIC"
+    jpg_file = tmp_path / f"{NAME}.jpg"
+    create_file(heic_file)
+    create_file(jpg_file)
+
+    ingestor = create_ingestor(tmp_path, tmp_path)
+    ingestor._file_stats = {str(heic_file): stat(heic_file)}
+
+    # converting would need Pillow, which is only imported by the workers
+    ingestor._transfer(IngestingMode.COPY, {}, {str(heic_file): str(jpg_file)}, {}, None, None)
+
+    assert ingestor._stats.counters["heic conversions"] == 0
+    assert jpg_file.read_bytes() == JPEG
+
+
+def test_names_dont_depend_on_the_number_of_workers(tmp_path):
+    source = tmp_path / "src"
+
+    # every file is taken in the same second, so the names only differ in their counters
+    for i in range(24):
+        create_file(source / f"IMG_{i:02}.{'HEIC' if i % 3 else 'JPG'}")
+
+    filenames = [
+        create_ingestor(
+            source, tmp_path / "out", heic_mode=HeicMode.COPY, jobs=jobs
+        )._get_new_filenames(IngestingMode.COPY, None, NameIndex())
+        for jobs in (1, 4)
+    ]
+
+    assert len(set(filenames[0].values())) == 24
+    assert filenames[0] == filenames[1]
+
+
+def test_heic_conversions_are_left_out_of_the_device_check(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    create_file(source / "a.jpg")
+    create_file(source / "b.heic")
+    checked = []
+
+    monkeypatch.setattr(
+        LinkEngine,
+        "check_devices",
+        lambda self, filenames, output_directory, stats: checked.extend(map(basename, filenames)),
+    )
+
+    create_ingestor(source, tmp_path / "out").execute(IngestingMode.LINK, dry_run=True)
+
+    # converted files are written to the output directory, not linked
+    assert checked == ["a.jpg"]
+
+
+def list_output(output) -> dict[str, bytes]:
+    return {path.name: path.read_bytes() for path in output.iterdir() if not path.name.startswith(".")}
+
+
+def test_interrupted_run_is_resumed_with_the_planned_names(tmp_path, monkeypatch):
+    source = tmp_path / "src"
+    output = tmp_path / "out"
+    output.mkdir()
+    create_file(source / "a.jpg", JPEG + b"a", DATE.replace(second=0))
+    create_file(source / "b.jpg", JPEG + b"b", DATE.replace(second=1))
+
+    def interrupted_copy(filenames, jobs=1, on_done=None):
+        (old_name, new_name), (_, partial_name) = filenames.items()
+        copyfile(old_name, new_name)
+        on_done(old_name)
+
+        with open(partial_name, "wb") as file_handle:
+            file_handle.write(b"\xff\xd8")
+
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(Ingestor, "copy_all", staticmethod(interrupted_copy))
+
+    with pytest.raises(KeyboardInterrupt):
+        create_ingestor(source, output).execute(IngestingMode.COPY)
+
+    monkeypatch.undo()
+
+    # taken in the same second as the file whose transfer was interrupted
+    create_file(source / "c.jpg", JPEG + b"c", DATE.replace(second=1))
+    create_ingestor(source, output).execute(IngestingMode.COPY)
+
+    assert list_output(output) == {
+        "2023-07-01 12.00.00_J_H.jpg": JPEG + b"a",
+        "2023-07-01 12.00.01_J_H.jpg": JPEG + b"b",
+        "2023-07-01 12.00.01_1_J_H.jpg": JPEG + b"c",
+    }
+
+
+def test_applied_plan_transfers_unchanged_files(tmp_path):
+    source = tmp_path / "src"
+    output = tmp_path / "out"
+    plan_file = tmp_path / "plan.jsonl"
+    output.mkdir()
+    create_file(source / "a.jpg", JPEG + b"a", DATE.replace(second=0))
+    create_file(source / "b.jpg", JPEG + b"b", DATE.replace(second=1))
+
+    create_ingestor(source, output, plan_file=str(plan_file)).execute(IngestingMode.COPY)
+
+    assert list_output(output) == {}
+
+    # changed after planning
+    (source / "b.jpg").write_bytes(JPEG + b"changed")
+
+    create_ingestor(source, output).apply(str(plan_file))
+
+    assert list_output(output) == {"2023-07-01 12.00.00_J_H.jpg": JPEG + b"a"}
+
+
+def test_names_in_the_output_directory_are_never_overwritten(tmp_path):
+    source = tmp_path / "src"
+    output = tmp_path / "out"
+    create_file(source / "a.jpg", JPEG + b"a")
+    create_file(output / f"{NAME}.jpg", b"earlier run")
+
+    # without a journal only the listing of the output directory knows the name
+    create_ingestor(source, output, journal=False).execute(IngestingMode.COPY)
+
+    assert list_output(output) == {
+        f"{NAME}.jpg": b"earlier run",
+        "2023-07-01 12.00.05_1_J_H.jpg": JPEG + b"a",
+    }
+
+
+def test_archive_members_are_extracted_once(tmp_path, monkeypatch):
+    archive = tmp_path / "takeout.zip"
+    output = tmp_path / "out"
+    output.mkdir()
+
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        for name, data in (("a.jpg", JPEG + b"a"), ("b.heic", b"heic")):
+            # ZIP files store local modification times in steps of two seconds
+            date_time = DATE.replace(second=4).astimezone().timetuple()[:6]
+            zip_file.writestr(zipfile.ZipInfo(name, date_time), data)
+
+    @contextmanager
+    def converting(self, conversions, delete_source_files=False, on_done=None):
+        yield
+
+        # converting would need Pillow, which is only imported by the workers
+        for file, jpg_file in conversions.items():
+            copyfile(file, jpg_file)
+            remove(file)
+            on_done(file)
+
+    monkeypatch.setattr(HeicConverter, "converting", converting)
+
+    for _ in range(2):
+        create_ingestor(archive, output).execute(IngestingMode.COPY)
+
+    assert list_output(output) == {
+        "2023-07-01 12.00.04_J_H.jpg": JPEG + b"a",
+        "2023-07-01 12.00.04_1_J_H.jpg": b"heic",
+    }
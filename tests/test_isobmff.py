@@ -0,0 +1,92 @@
+import io
+import struct
+from datetime import datetime, timedelta, timezone
+import pytest
+from ingestor.constants.date_source import DateSource
+from ingestor.utils.isobmff import IsoBmffReader, IsoBmffError
+
+
+MVHD_DATE = datetime(2023, 7, 1, 10, 0, 0, tzinfo=timezone.utc)
+MVHD_SECONDS = int((MVHD_DATE - datetime(1904, 1, 1, tzinfo=timezone.utc)).total_seconds())
+QUICKTIME_DATE = "2023-07-01T12:00:05+0200"
+
+
+def box(box_type: bytes, payload: bytes = b"") -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def large_box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4sQ", 1, box_type, 16 + len(payload)) + payload
+
+
+def mvhd(seconds: int = MVHD_SECONDS, version: int = 0) -> bytes:
+    if version == 1:
+        return box(b"mvhd", struct.pack(">B3xQQIQ", 1, seconds, seconds, 1000, 0))
+    return box(b"mvhd", struct.pack(">B3xIIII", 0, seconds, seconds, 1000, 0))
+
+
+def quicktime_meta(value: str = QUICKTIME_DATE) -> bytes:
+    key_names = [b"com.apple.quicktime.make", IsoBmffReader.QUICKTIME_CREATION_DATE_KEY]
+    keys = box(
+        b"keys",
+        struct.pack(">4xI", len(key_names))
+        + b"".join(struct.pack(">I4s", 8 + len(k), b"mdta") + k for k in key_names),
+    )
+    data = box(b"data", struct.pack(">II", 1, 0) + value.encode())
+    ilst = box(
+        b"ilst",
+        box(struct.pack(">I", 1), box(b"data", struct.pack(">II", 1, 0) + b"Apple"))
+        + box(struct.pack(">I", 2), data),
+    )
+    return box(b"meta", box(b"hdlr", bytes(24)) + keys + ilst)
+
+
+def read(data: bytes):
+    return IsoBmffReader.read_creation_date(io.BytesIO(data))
+
+
+def test_mvhd_creation_time():
+    data = box(b"ftyp", b"isom") + box(b"moov", mvhd())
+
+    assert read(data) == (MVHD_DATE, DateSource.CREATION_TIME)
+
+
+def test_mvhd_version_1_creation_time():
+    data = box(b"ftyp", b"isom") + box(b"moov", mvhd(version=1))
+
+    assert read(data) == (MVHD_DATE, DateSource.CREATION_TIME)
+
+
+def test_quicktime_creation_date_is_preferred():
+    data = box(b"ftyp", b"qt  ") + box(b"moov", mvhd() + quicktime_meta())
+
+    date, source = read(data)
+
+    assert source == DateSource.QUICKTIME
+    assert date == datetime(2023, 7, 1, 12, 0, 5, tzinfo=timezone(timedelta(hours=2)))
+
+
+def test_moov_at_end_after_large_mdat():
+    data = box(b"ftyp", b"isom") + large_box(b"mdat", bytes(4096)) + box(b"moov", mvhd())
+
+    assert read(data) == (MVHD_DATE, DateSource.CREATION_TIME)
+
+
+def test_zero_creation_time_returns_none():
+    data = box(b"ftyp", b"isom") + box(b"moov", mvhd(seconds=0))
+
+    assert read(data) is None
+
+
+def test_non_isobmff_file_raises():
+    matroska_header = bytes.fromhex("1a45dfa3") + bytes(60)
+
+    with pytest.raises(IsoBmffError):
+        read(matroska_header)
+
+
+def test_truncated_box_raises():
+    data = box(b"ftyp", b"isom") + box(b"moov", mvhd())[:-4]
+
+    with pytest.raises(IsoBmffError):
+        read(data)
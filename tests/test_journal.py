@@ -0,0 +1,63 @@
+import os
+from ingestor.utils.journal import Journal
+
+
+def test_entries_survive_reload(tmp_path, create_files):
+    operations = create_files(2)
+    stats = {source: os.stat(source) for source in operations}
+    first, second = operations
+    journal_file = str(tmp_path / Journal.FILENAME)
+
+    journal = Journal(journal_file)
+    journal.plan(operations, stats, "copy")
+    journal.complete(first)
+    journal.close()
+
+    journal = Journal(journal_file)
+
+    assert journal.get(first, stats[first], "copy").completed
+    assert not journal.get(second, stats[second], "copy").completed
+    assert journal.get(second, stats[second], "copy").target == operations[second]
+    assert sorted(journal.targets()) == sorted(operations.values())
+
+
+def test_entries_of_changed_sources_or_other_modes_are_ignored(tmp_path, create_files):
+    operations = create_files(1)
+    stats = {source: os.stat(source) for source in operations}
+    (source,) = operations
+    journal_file = str(tmp_path / Journal.FILENAME)
+
+    journal = Journal(journal_file)
+    journal.plan(operations, stats, "copy")
+    journal.close()
+
+    with open(source, "ab") as file_handle:
+        file_handle.write(b"more")
+
+    journal = Journal(journal_file)
+
+    assert journal.get(source, stats[source], "move") is None
+    assert journal.get(source, os.stat(source), "copy") is None
+
+
+def test_torn_line_is_dropped(tmp_path, create_files):
+    operations = create_files(2)
+    stats = {source: os.stat(source) for source in operations}
+    first, second = operations
+    journal_file = str(tmp_path / Journal.FILENAME)
+
+    journal = Journal(journal_file)
+    journal.plan(operations, stats, "copy")
+    journal.close()
+
+    with open(journal_file, "a", encoding="utf-8") as file_handle:
+        file_handle.write('{"op": "do')
+
+    journal = Journal(journal_file)
+    journal.complete(second)
+    journal.close()
+
+    journal = Journal(journal_file)
+
+    assert not journal.get(first, stats[first], "copy").completed
+    assert journal.get(second, stats[second], "copy").completed
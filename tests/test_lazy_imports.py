@@ -0,0 +1,30 @@
+import subprocess
+import sys
+
+
+HEAVY_MODULES = ("PIL", "pillow_heif", "exifread")
+
+
+def imported_heavy_modules(code: str) -> list[str]:
+    process = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys\n{code}\n"
+            f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return process.stdout.split()
+
+
+def test_cli_module_does_not_import_heavy_dependencies():
+    assert imported_heavy_modules("import ingestor.main") == []
+
+
+def test_pipeline_modules_do_not_import_heavy_dependencies():
+    assert imported_heavy_modules(
+        "import ingestor.utils.ingestor, ingestor.utils.heic, ingestor.utils.filename"
+    ) == []
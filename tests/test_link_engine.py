@@ -0,0 +1,41 @@
+import os
+from types import SimpleNamespace
+import pytest
+from ingestor.constants.ingesting_mode import IngestingMode
+from ingestor.utils.link_engine import LinkEngine
+
+
+def test_link_all_creates_hard_links(create_files):
+    filenames = create_files(1)
+
+    LinkEngine(IngestingMode.LINK).link_all(filenames)
+
+    for old_name, new_name in filenames.items():
+        assert os.path.samefile(old_name, new_name)
+        assert not os.path.islink(new_name)
+
+
+def test_link_all_creates_absolute_symlinks(create_files):
+    filenames = create_files(1)
+
+    LinkEngine(IngestingMode.SYMLINK).link_all(filenames)
+
+    for old_name, new_name in filenames.items():
+        assert os.path.islink(new_name)
+        assert os.readlink(new_name) == os.path.abspath(old_name)
+
+
+def test_check_devices_rejects_cross_device_hard_links(tmp_path, create_files):
+    filenames = create_files(1)
+    output_device = os.stat(tmp_path / "out").st_dev
+    stats = {old_name: SimpleNamespace(st_dev=output_device + 1) for old_name in filenames}
+
+    with pytest.raises(ValueError):
+        LinkEngine(IngestingMode.LINK).check_devices(filenames, str(tmp_path / "out"), stats)
+
+    LinkEngine(IngestingMode.SYMLINK).check_devices(filenames, str(tmp_path / "out"), stats)
+
+
+def test_copy_modes_are_rejected():
+    with pytest.raises(ValueError):
+        LinkEngine(IngestingMode.COPY)
@@ -0,0 +1,66 @@
+import json
+from datetime import timedelta
+from os.path import join
+import pytest
+from ingestor.utils.manifest import Manifest
+
+
+DEFAULT_OFFSET = timedelta(hours=1)
+
+
+def write_manifest(tmp_path, content) -> str:
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text(json.dumps(content))
+    return str(manifest_file)
+
+
+def load(manifest_file: str):
+    return Manifest.load(
+        manifest_file,
+        person_suffix="J_H",
+        time_correction_offset=DEFAULT_OFFSET,
+        recursive=False,
+    )
+
+
+def test_load_sources_with_defaults(tmp_path):
+    manifest_file = write_manifest(
+        tmp_path,
+        {
+            "sources": [
+                {"directory": "julian"},
+                {
+                    "directory": "/data/anna/",
+                    "person_suffix": "A_B",
+                    "time_correction_offset": "-01:30:00",
+                    "recursive": True,
+                },
+            ]
+        },
+    )
+
+    first, second = load(manifest_file)
+
+    assert first.directory == join(str(tmp_path), "julian")
+    assert first.person_suffix == "J_H"
+    assert first.time_correction_offset == DEFAULT_OFFSET
+    assert not first.recursive
+
+    assert second.directory == "/data/anna"
+    assert second.person_suffix == "A_B"
+    assert second.time_correction_offset == -timedelta(hours=1, minutes=30)
+    assert second.recursive
+
+
+def test_source_without_directory_raises(tmp_path):
+    manifest_file = write_manifest(tmp_path, {"sources": [{"person_suffix": "A_B"}]})
+
+    with pytest.raises(ValueError):
+        load(manifest_file)
+
+
+def test_manifest_without_sources_raises(tmp_path):
+    manifest_file = write_manifest(tmp_path, [{"directory": "julian"}])
+
+    with pytest.raises(ValueError):
+        load(manifest_file)
@@ -0,0 +1,76 @@
+import os
+from datetime import datetime
+from ingestor.constants.date_source import DateSource
+from ingestor.utils.metadata_cache import MetadataCache
+
+
+DATE = datetime(2023, 7, 1, 12, 0, 0)
+
+
+def create_file(path, content=b"data"):
+    path.write_bytes(content)
+    return str(path)
+
+
+def test_cached_date_survives_reopening(tmp_path):
+    cache_file = str(tmp_path / MetadataCache.FILENAME)
+    file_path = create_file(tmp_path / "a.jpg")
+
+    cache = MetadataCache(cache_file, max_entries=10)
+    assert cache.get(file_path, os.stat(file_path)) is None
+    cache.put(file_path, os.stat(file_path), DATE, DateSource.EXIF)
+    cache.save()
+
+    cache = MetadataCache(cache_file, max_entries=10)
+
+    assert cache.get(file_path, os.stat(file_path)) == (DATE, DateSource.EXIF)
+    assert cache.hits == 1
+
+
+def test_changed_file_invalidates_entry(tmp_path):
+    cache_file = str(tmp_path / MetadataCache.FILENAME)
+    file_path = create_file(tmp_path / "a.jpg")
+
+    cache = MetadataCache(cache_file, max_entries=10)
+    cache.put(file_path, os.stat(file_path), DATE, DateSource.EXIF)
+    cache.save()
+
+    create_file(tmp_path / "a.jpg", b"changed content")
+    cache = MetadataCache(cache_file, max_entries=10)
+
+    assert cache.get(file_path, os.stat(file_path)) is None
+
+
+def test_save_evicts_entries_above_limit(tmp_path):
+    cache_file = str(tmp_path / MetadataCache.FILENAME)
+
+    for i in range(5):
+        file_path = create_file(tmp_path / f"{i}.jpg")
+        cache = MetadataCache(cache_file, max_entries=3)
+        cache.put(file_path, os.stat(file_path), DATE, DateSource.MTIME)
+        cache.save()
+
+    cache = MetadataCache(cache_file, max_entries=3)
+    remaining = [
+        i for i in range(5)
+        if cache.get(str(tmp_path / f"{i}.jpg"), os.stat(tmp_path / f"{i}.jpg"))
+    ]
+
+    assert remaining == [2, 3, 4]
+
+
+def test_default_cache_file_lies_in_the_user_cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    image = create_file(tmp_path / "a.jpg")
+    cache_file = MetadataCache.default_cache_file()
+
+    assert cache_file == str(tmp_path / "cache" / "ingestor" / MetadataCache.FILENAME)
+
+    # the directory is created on the first save
+    cache = MetadataCache(cache_file, max_entries=10)
+    cache.put(image, os.stat(image), DATE, DateSource.EXIF)
+    cache.save()
+
+    cache = MetadataCache(cache_file, max_entries=10)
+
+    assert cache.get(image, os.stat(image)) == (DATE, DateSource.EXIF)
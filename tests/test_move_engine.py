@@ -0,0 +1,31 @@
+import os
+from types import SimpleNamespace
+from ingestor.utils.move_engine import MoveEngine
+
+
+def assert_moved(filenames: dict[str, str]):
+    for i, (old_name, new_name) in enumerate(filenames.items()):
+        assert not os.path.exists(old_name)
+
+        with open(new_name, "rb") as target:
+            assert target.read() == bytes([i]) * 128
+
+
+def test_same_device_files_are_renamed(tmp_path, create_files):
+    filenames = create_files(3)
+    inodes = [os.stat(old_name).st_ino for old_name in filenames]
+
+    MoveEngine(jobs=2).move_all(filenames, str(tmp_path / "out"))
+
+    assert_moved(filenames)
+    assert [os.stat(new_name).st_ino for new_name in filenames.values()] == inodes
+
+
+def test_cross_device_files_are_copied_and_removed(tmp_path, create_files):
+    filenames = create_files(3)
+    output_device = os.stat(tmp_path / "out").st_dev
+    stats = {old_name: SimpleNamespace(st_dev=output_device + 1) for old_name in filenames}
+
+    MoveEngine(jobs=2).move_all(filenames, str(tmp_path / "out"), stats)
+
+    assert_moved(filenames)
@@ -0,0 +1,53 @@
+from ingestor.utils.name_index import NameIndex
+
+
+def render_for(base: str):
+    stem, extension = base.rsplit(".", 1)
+    return lambda counter: base if counter == 0 else f"{stem}_{counter}.{extension}"
+
+
+def test_claim_without_collision_returns_base_name():
+    index = NameIndex()
+
+    assert index.claim("a.jpg", render_for("a.jpg")) == "a.jpg"
+    assert index.claim("b.jpg", render_for("b.jpg")) == "b.jpg"
+    assert len(index) == 2
+
+
+def test_claim_with_collisions_increments_counter():
+    index = NameIndex()
+
+    names = [index.claim("a.jpg", render_for("a.jpg")) for _ in range(4)]
+
+    assert names == ["a.jpg", "a_1.jpg", "a_2.jpg", "a_3.jpg"]
+    assert index.collisions == 3
+
+
+def test_claim_skips_names_taken_by_other_bases():
+    index = NameIndex()
+    index.add("a_1.jpg")
+
+    assert index.claim("a.jpg", render_for("a.jpg")) == "a.jpg"
+    assert index.claim("a.jpg", render_for("a.jpg")) == "a_2.jpg"
+    assert "a_2.jpg" in index
+
+
+def test_claim_all_uses_first_counter_free_for_every_member():
+    index = NameIndex()
+    index.add("a_1.mov")
+
+    def render(counter: int) -> list[str]:
+        return [render_for("a.heic")(counter), render_for("a.mov")(counter)]
+
+    assert index.claim_all(["a.heic", "a.mov"], render) == ["a.heic", "a.mov"]
+    assert index.claim_all(["a.heic", "a.mov"], render) == ["a_2.heic", "a_2.mov"]
+    assert index.collisions == 1
+
+
+def test_names_differing_only_in_case_collide():
+    index = NameIndex()
+    index.add("a.JPG")
+
+    assert "A.jpg" in index
+    assert index.claim("a.jpg", render_for("a.jpg")) == "a_1.jpg"
+    assert sorted(index) == ["a.JPG", "a_1.jpg"]
@@ -0,0 +1,31 @@
+import os
+from ingestor.utils.output_index import OutputIndex
+
+
+def test_lists_output_directory(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"a")
+    (tmp_path / "b.mp4").write_bytes(b"b")
+
+    assert sorted(OutputIndex(str(tmp_path)).load()) == ["a.jpg", "b.mp4"]
+    assert OutputIndex(str(tmp_path / "missing")).load() == []
+
+
+def test_saved_names_are_used_while_directory_is_unchanged(tmp_path):
+    (tmp_path / "a.jpg").write_bytes(b"a")
+    index = OutputIndex(str(tmp_path), persist=True)
+
+    # names that aren't on disk prove the saved index was read
+    index.save(["a.jpg", "planned.jpg"])
+
+    assert sorted(index.load()) == ["a.jpg", "planned.jpg"]
+
+    (tmp_path / "c.jpg").write_bytes(b"c")
+    os.utime(tmp_path, ns=(0, os.stat(tmp_path).st_mtime_ns + 1))
+
+    assert sorted(index.load()) == [OutputIndex.FILENAME, "a.jpg", "c.jpg"]
+
+
+def test_names_are_not_saved_without_persist(tmp_path):
+    OutputIndex(str(tmp_path)).save(["a.jpg"])
+
+    assert not (tmp_path / OutputIndex.FILENAME).exists()
@@ -0,0 +1,65 @@
+from os.path import join
+import pytest
+from ingestor.constants.plan_action import PlanAction
+from ingestor.utils.plan import PlanEntry, PlanReader, PlanWriter
+
+
+def test_entries_round_trip(tmp_path):
+    plan_file = str(tmp_path / "plan.jsonl")
+    entries = [
+        PlanEntry(PlanAction.TRANSFER, "/in/a.jpg", "/out/2023-07-01 12.00.00_J_H.jpg", 16, 42, "2023-07-01T12:00:00+02:00", "exif"),
+        PlanEntry(PlanAction.CONVERT, "/in/b.heic", "/out/2023-07-01 12.00.01_J_H.jpg", 32, 43),
+        PlanEntry(PlanAction.LINK, "/out/2023-07-01 12.00.00_J_H.jpg", "/out/2023-07-01 12.00.02_J_H.jpg", 0, 0),
+    ]
+
+    with PlanWriter(plan_file, mode="copy", output_directory="/out") as writer:
+        for entry in entries:
+            writer.write(entry)
+
+    assert writer.entries == 3
+
+    with PlanReader(plan_file) as reader:
+        assert reader.mode == "copy"
+        assert reader.output_directory == "/out"
+
+        read = list(reader)
+
+    assert [repr(entry) for entry in read] == [repr(entry) for entry in entries]
+    assert read[1].action == PlanAction.CONVERT
+
+
+def test_relative_paths_are_written_as_absolute_paths(tmp_path, monkeypatch):
+    plan_file = str(tmp_path / "plan.jsonl")
+    monkeypatch.chdir(tmp_path)
+
+    with PlanWriter(plan_file, mode="copy", output_directory="out") as writer:
+        writer.write(PlanEntry(PlanAction.TRANSFER, "in/a.jpg", "out/a.jpg", 16, 42))
+
+    # applied from another working directory
+    monkeypatch.chdir("/")
+
+    with PlanReader(plan_file) as reader:
+        assert reader.output_directory == join(tmp_path, "out")
+
+        (entry,) = reader
+
+    assert (entry.source, entry.target) == (join(tmp_path, "in/a.jpg"), join(tmp_path, "out/a.jpg"))
+
+
+def test_entries_are_read_in_batches(tmp_path):
+    plan_file = str(tmp_path / "plan.jsonl")
+
+    with PlanWriter(plan_file, mode="move", output_directory="out") as writer:
+        for i in range(5):
+            writer.write(PlanEntry(PlanAction.TRANSFER, f"{i}.jpg", f"out/{i}.jpg", i, i))
+
+    with PlanReader(plan_file) as reader:
+        assert [len(batch) for batch in reader.batches(2)] == [2, 2, 1]
+
+
+def test_invalid_plan_is_rejected(tmp_path):
+    plan_file = tmp_path / "plan.jsonl"
+    plan_file.write_text('{"version": 0}\n')
+
+    with pytest.raises(ValueError):
+        PlanReader(str(plan_file))
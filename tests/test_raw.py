@@ -0,0 +1,64 @@
+import io
+import struct
+from datetime import datetime
+import pytest
+from ingestor.utils.exif import ExifError, ExifReader
+from ingestor.utils.raw import RawReader
+
+
+DATE = "2023:07:01 12:00:05"
+
+
+class CountingReader(io.BytesIO):
+    """Keeps track of the number of bytes read."""
+
+    bytes_read = 0
+
+    def read(self, size=-1):
+        data = super().read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def date_ifd(offset: int) -> bytes:
+    value = DATE.encode() + b"\x00"
+    entry = struct.pack("<HHII", ExifReader.TAG_DATETIMEORIGINAL, 2, len(value), offset + 18)
+    return struct.pack("<H", 1) + entry + bytes(4) + value
+
+
+def tiff_raw(magic: bytes = b"II*\x00", image_size: int = 1 << 20) -> bytes:
+    # IFD0 with the Exif IFD pointer, followed by the Exif IFD and the image data
+    exif_offset = 8 + 18
+    ifd0 = struct.pack("<H", 1) + struct.pack("<HHII", ExifReader.TAG_EXIF_IFD_POINTER, 4, 1, exif_offset) + bytes(4)
+    return magic + struct.pack("<I", 8) + ifd0 + date_ifd(exif_offset) + bytes(image_size)
+
+
+def box(box_type: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def cr3(image_size: int = 1 << 20) -> bytes:
+    cmt2 = b"II*\x00" + struct.pack("<I", 8) + date_ifd(8)
+    canon = box(b"uuid", RawReader.CANON_UUID + box(b"CMT1", bytes(16)) + box(b"CMT2", cmt2))
+    ftyp = box(b"ftyp", b"crx \x00\x00\x00\x01crx isom")
+    return ftyp + box(b"moov", canon) + box(b"mdat", bytes(image_size))
+
+
+@pytest.mark.parametrize("data", [tiff_raw(), tiff_raw(b"IIU\x00"), cr3()])
+def test_date_is_read_from_header_only(data):
+    file_handle = CountingReader(data)
+    tags = RawReader.read_date_tags(file_handle)
+
+    assert tags.date_time_original == datetime(2023, 7, 1, 12, 0, 5)
+    assert file_handle.bytes_read < 4096
+
+
+def test_cr3_without_canon_box_returns_none():
+    data = box(b"ftyp", b"crx \x00\x00\x00\x01") + box(b"moov", box(b"mvhd", bytes(100)))
+
+    assert RawReader.read_date_tags(io.BytesIO(data)) is None
+
+
+def test_unsupported_format_raises():
+    with pytest.raises(ExifError):
+        RawReader.read_date_tags(io.BytesIO(b"FUJIFILMCCD-RAW " + bytes(64)))
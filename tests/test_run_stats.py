@@ -0,0 +1,32 @@
+import json
+from ingestor.utils.run_stats import RunStats
+
+
+def test_stages_counters_and_latencies_are_reported(tmp_path):
+    stats = RunStats()
+
+    with stats.measure("transfer"):
+        stats.add_files("transfer", 2, 300)
+
+    stats.add_files("transfer", 1, 100)
+    stats.count("date source exif", 2)
+    stats.count("date source exif")
+    stats.add_latencies("ffprobe", [0.01 * i for i in range(1, 101)])
+
+    stats_file = tmp_path / "stats.json"
+    stats.write_json(str(stats_file))
+    report = json.loads(stats_file.read_text())
+
+    assert report["stages"]["transfer"]["files"] == 3
+    assert report["stages"]["transfer"]["bytes"] == 400
+    assert report["counters"] == {"date source exif": 3}
+    assert report["latencies"]["ffprobe"]["count"] == 100
+    assert abs(report["latencies"]["ffprobe"]["p50"] - 0.505) < 1e-9
+    assert report["latencies"]["ffprobe"]["max"] == 1.0
+
+
+def test_single_latency_is_its_own_percentile():
+    stats = RunStats()
+    stats.add_latencies("ffprobe", [0.5])
+
+    assert stats.to_dict()["latencies"]["ffprobe"]["p99"] == 0.5
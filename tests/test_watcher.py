@@ -0,0 +1,111 @@
+from datetime import timedelta
+from os import utime
+import pytest
+from ingestor.utils.manifest import IngestSource
+from ingestor.utils.watcher import Debouncer, InotifyWatcher, PollingWatcher
+
+
+def create_source(directory, recursive: bool = False) -> IngestSource:
+    return IngestSource(
+        directory=str(directory),
+        person_suffix="J_H",
+        time_correction_offset=timedelta(0),
+        recursive=recursive,
+    )
+
+
+def test_debouncer_releases_files_once_their_stat_settled(tmp_path):
+    file_path = tmp_path / "a.jpg"
+    file_path.write_bytes(b"a")
+    debouncer = Debouncer(settle_time=5)
+
+    debouncer.add(1, str(file_path))
+
+    # the first check only records the stat
+    assert debouncer.pop_settled(now=100) == {}
+    assert debouncer.pop_settled(now=104) == {}
+
+    settled = debouncer.pop_settled(now=105)
+
+    assert list(settled) == [str(file_path)]
+    assert settled[str(file_path)][0] == 1
+    assert settled[str(file_path)][1].st_size == 1
+    assert len(debouncer) == 0
+
+
+def test_debouncer_rearms_on_changes_and_drops_vanished_files(tmp_path):
+    growing = tmp_path / "a.mp4"
+    vanishing = tmp_path / "b.jpg"
+    growing.write_bytes(b"a")
+    vanishing.write_bytes(b"b")
+    debouncer = Debouncer(settle_time=5)
+
+    debouncer.add(0, str(growing))
+    debouncer.add(0, str(vanishing))
+    debouncer.pop_settled(now=100)
+
+    growing.write_bytes(b"ab")
+    vanishing.unlink()
+
+    assert debouncer.pop_settled(now=103) == {}
+    assert len(debouncer) == 1
+    assert debouncer.pop_settled(now=107) == {}
+    assert list(debouncer.pop_settled(now=108)) == [str(growing)]
+
+
+def test_polling_watcher_reports_new_and_changed_files(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "a.jpg").write_bytes(b"a")
+    (tmp_path / "b.jpg").write_bytes(b"b")
+    watcher = PollingWatcher([create_source(tmp_path, recursive=True)])
+
+    assert watcher.poll(timeout=0) == []
+
+    (tmp_path / "c.mp4").write_bytes(b"c")
+    (tmp_path / "sub" / "d.jpg").write_bytes(b"d")
+    (tmp_path / "notes.txt").write_bytes(b"e")
+    utime(tmp_path / "a.jpg", ns=(0, 1_000_000_000))
+
+    assert sorted(watcher.poll(timeout=0)) == [
+        (0, str(tmp_path / "a.jpg")),
+        (0, str(tmp_path / "c.mp4")),
+        (0, str(tmp_path / "sub" / "d.jpg")),
+    ]
+    assert watcher.poll(timeout=0) == []
+
+
+def create_inotify_watcher(sources: list[IngestSource]) -> InotifyWatcher:
+    try:
+        InotifyWatcher([]).close()
+    except OSError:
+        pytest.skip("inotify isn't available")
+
+    return InotifyWatcher(sources)
+
+
+def test_inotify_watcher_doesnt_follow_symlinked_directories(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "sub" / "loop").symlink_to(tmp_path, target_is_directory=True)
+
+    watcher = create_inotify_watcher([create_source(tmp_path, recursive=True)])
+
+    try:
+        watched = sorted(directory for _, directory in watcher._watches.values())
+    finally:
+        watcher.close()
+
+    assert watched == [str(tmp_path), str(tmp_path / "sub")]
+
+
+def test_inotify_watcher_reports_written_files(tmp_path):
+    watcher = create_inotify_watcher([create_source(tmp_path)])
+
+    try:
+        (tmp_path / "a.jpg").write_bytes(b"a")
+        (tmp_path / ".b.jpg").write_bytes(b"b")
+
+        changed = set(watcher.poll(timeout=1))
+    finally:
+        watcher.close()
+
+    assert changed == {(0, str(tmp_path / "a.jpg"))}